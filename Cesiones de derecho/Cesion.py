@@ -1,9 +1,16 @@
 import pdfplumber
 import re
+import sys
+import argparse
 import pandas as pd
 from pathlib import Path
 import csv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from comun.cache_texto import CacheTexto, SIN_CACHE
+from comun.campos import Campo, Extractor
+from comun.manifiesto import Manifiesto, combinar, leer_tabla
+
 # ======================================
 # CONFIG
 # ======================================
@@ -25,59 +32,102 @@ def limpiar_texto(valor):
     )
 
 
-def extraer_texto(pdf_path):
-    texto = ""
+def extraer_paginas(pdf_path):
     with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            t = page.extract_text()
-            if t:
-                texto += t + " "
-    return texto
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def unir_paginas(paginas):
+    return "".join(t + " " for t in paginas if t)
+
+
+def extraer_texto(pdf_path, cache=SIN_CACHE):
+    return unir_paginas(cache.paginas(pdf_path, "pdfplumber", {}, extraer_paginas))
+
+
+def campo(nombre, patron):
+    return Campo(nombre, patron, re.IGNORECASE | re.DOTALL, post=limpiar_texto)
+
+
+CAMPOS_CONTRATO = Extractor([
+    campo("tipo_documento", r"(CONTRATO DE CESIÓN DE DERECHOS PATRIMONIALES)"),
+    campo("fecha_documento", r"(\d{1,2}/[A-Za-z]+/\d{4})"),
+    campo("institucion", r"(CORPORACIÓN UNIVERSITARIA MINUTO DE DIOS\s*–?\s*UNIMINUTO)"),
+    campo("autor", r"por la otra,\s+([A-ZÁÉÍÓÚÑ\s]+),\s+mayor de edad"),
+    campo("cedula_autor", r"c[eé]dula de ciudadanía No\.?\s*([\d\.]+)"),
+    campo("titulo_obra", r"capítulo denominado\s+“([^”]+)”"),
+    campo("libro", r"del libro\s+“([^”]+)”"),
+    campo("vigencia", r"VIGENCIA[:\s]+El presente contrato de cesión se extenderá por\s+([^\.]+)"),
+])
 
 
-def buscar(regex, texto, group=1):
-    match = re.search(regex, texto, re.IGNORECASE | re.DOTALL)
-    return limpiar_texto(match.group(group)) if match else None
+def procesar_pdf(pdf_path, cache=SIN_CACHE):
+    return procesar_texto(extraer_texto(pdf_path, cache), pdf_path.name)
 
 
-def procesar_pdf(pdf_path):
-    texto = extraer_texto(pdf_path)
+def procesar_texto(texto, archivo):
+    v = CAMPOS_CONTRATO.extraer(texto)
 
     return {
-        "archivo": pdf_path.name,
-        "tipo_documento": buscar(r"(CONTRATO DE CESIÓN DE DERECHOS PATRIMONIALES)", texto),
-        "fecha_documento": buscar(r"(\d{1,2}/[A-Za-z]+/\d{4})", texto),
-        "institucion": buscar(r"(CORPORACIÓN UNIVERSITARIA MINUTO DE DIOS\s*–?\s*UNIMINUTO)", texto),
-        "autor": buscar(r"por la otra,\s+([A-ZÁÉÍÓÚÑ\s]+),\s+mayor de edad", texto),
-        "cedula_autor": buscar(r"c[eé]dula de ciudadanía No\.?\s*([\d\.]+)", texto),
-        "titulo_obra": buscar(r"capítulo denominado\s+“([^”]+)”", texto),
-        "libro": buscar(r"del libro\s+“([^”]+)”", texto),
+        "archivo": archivo,
+        "tipo_documento": v["tipo_documento"],
+        "fecha_documento": v["fecha_documento"],
+        "institucion": v["institucion"],
+        "autor": v["autor"],
+        "cedula_autor": v["cedula_autor"],
+        "titulo_obra": v["titulo_obra"],
+        "libro": v["libro"],
         "derechos_patrimoniales": "Cedidos",
         "derechos_morales": "No cedidos",
         "exclusividad": "Sí",
         "ambito": "Internacional",
-        "vigencia": buscar(
-            r"VIGENCIA[:\s]+El presente contrato de cesión se extenderá por\s+([^\.]+)",
-            texto
-        )
+        "vigencia": v["vigencia"],
     }
 
+
+def guardar_csv(df, ruta):
+    df.to_csv(
+        ruta,
+        index=False,
+        encoding="utf-8-sig",
+        quoting=csv.QUOTE_ALL
+    )
+
 # ======================================
 # PROCESO
 # ======================================
-registros = []
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", type=Path, default=CARPETA_PDFS, help="Carpeta con los contratos en PDF")
+    ap.add_argument("--out", default=SALIDA_CSV, help="Ruta del CSV de salida")
+    CacheTexto.agregar_argumentos(ap)
+    Manifiesto.agregar_argumentos(ap)
+    args = ap.parse_args()
+    cache = CacheTexto.desde_args(args)
+    manifiesto = Manifiesto.desde_args(args, args.out, args.dir)
+
+    cambios = manifiesto.clasificar(sorted(args.dir.glob("*.pdf")))
+    print(cambios.resumen())
+
+    registros = []
+
+    for pdf in cambios.pendientes:
+        print(f"📄 Procesando {pdf.name}")
+        registros.append(procesar_pdf(pdf, cache))
+        manifiesto.registrar(pdf)
+
+    df = pd.DataFrame(registros)
+    if manifiesto.incremental:
+        df = combinar(leer_tabla(args.out), df, "archivo", cambios.conservar, cambios.orden)
+
+    guardar_csv(df, args.out)
+    manifiesto.guardar()
 
-for pdf in CARPETA_PDFS.glob("*.pdf"):
-    print(f"📄 Procesando {pdf.name}")
-    registros.append(procesar_pdf(pdf))
+    print(cache.resumen())
+    print(CAMPOS_CONTRATO.resumen())
+    print(f"\n✅ CSV limpio y correcto generado: {args.out}")
 
-df = pd.DataFrame(registros)
 
-df.to_csv(
-    SALIDA_CSV,
-    index=False,
-    encoding="utf-8-sig",
-    quoting=csv.QUOTE_ALL
-)
+if __name__ == "__main__":
+    main()
 
-print(f"\n✅ CSV limpio y correcto generado: {SALIDA_CSV}")
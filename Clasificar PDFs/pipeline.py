@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Procesa en una sola pasada una carpeta mixta de PDFs (p. ej. lo que llega al
+buzón editorial): abre cada PDF una vez, lo clasifica por las huellas de sus
+primeras páginas y entrega el texto ya extraído al extractor que corresponde.
+
+  "ISSN asignado"      -> certificado ISSN   (Publicaciones_seriadas/seriadas.py)
+  "Título Original"    -> certificado DNDA   (extraer informacion DNDA-/DNDA.py)
+  "CONTRATO DE CESIÓN" -> cesión de derechos (Cesiones de derecho/Cesion.py)
+  "ISBN"               -> libro              (Extraer informacion libros-/extraer.py)
+
+Escribe una salida por tipo (con el mismo formato que el script original) y
+clasificacion.csv con el tipo asignado a cada PDF. Las huellas se buscan en
+ese orden en la primera página; si no aparece ninguna, en las siguientes
+(hasta PAGINAS_HUELLA). Si la primera página no tiene capa de texto se le
+aplica OCR para poder clasificarla.
+
+El texto pasa por la caché compartida (comun/cache_texto.py) con las mismas
+claves que los scripts individuales, así que lo que lee uno lo aprovecha el otro.
+El archivo se lee del disco una sola vez; los extractores reciben esos bytes o
+los documentos ya abiertos, nunca la ruta para abrirla de nuevo. Los
+certificados ISSN se siguen leyendo con PyPDF2, que es el texto sobre el que
+está calibrado su parser (un rótulo por línea; con el texto de pdfplumber no
+acierta ninguno de los certificados de ejemplo).
+
+Uso:
+  python pipeline.py --dir "C:/buzon"
+  python pipeline.py --dir "C:/buzon" --out-dir "salidas" --no-cache
+"""
+
+import io
+import os
+import re
+import sys
+import argparse
+from functools import partial
+
+import pandas as pd
+import pdfplumber
+import pypdfium2 as pdfium
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.cache_texto import CacheTexto, SIN_CACHE
+from comun.scripts import cargar_script
+
+seriadas = cargar_script("Publicaciones_seriadas/seriadas.py")
+DNDA = cargar_script("extraer informacion DNDA-/DNDA.py")
+Cesion = cargar_script("Cesiones de derecho/Cesion.py")
+extraer = cargar_script("Extraer informacion libros-/extraer.py")
+
+PAGINAS_HUELLA = 3  # páginas iniciales en las que se buscan las huellas
+
+# En orden de prioridad: un certificado o contrato puede citar un ISBN
+HUELLAS = [
+    ("issn", re.compile(r"ISSN\s*asignado", re.IGNORECASE)),
+    ("dnda", re.compile(r"T[ií]tulo\s*Original", re.IGNORECASE)),
+    ("cesion", re.compile(r"CONTRATO\s*DE\s*CESI[OÓ]N", re.IGNORECASE)),
+    ("libro", re.compile(r"\bISBN\b", re.IGNORECASE)),
+]
+
+SALIDAS = {
+    "issn": "issn_certificados.xlsx",
+    "dnda": "autores_DNDA.xlsx",
+    "cesion": "sesiones_derecho_extraidas.csv",
+    "libro": "catalografia.xlsx",
+}
+RESUMEN = "clasificacion.csv"
+
+
+# -------------------- Lectura --------------------
+
+class DocumentoPDF:
+    """
+    Un PDF leído del disco una sola vez y abierto con pdfplumber; cada página
+    se lee a lo sumo una vez. Los extractores que necesitan otro lector
+    (pypdfium2, PyPDF2) lo abren sobre los mismos bytes.
+    """
+
+    def __init__(self, ruta, cache=SIN_CACHE):
+        self.ruta = ruta
+        self.cache = cache
+        with open(ruta, "rb") as f:
+            self.datos = f.read()
+        self.pdf = pdfplumber.open(io.BytesIO(self.datos))
+        self.num_paginas = len(self.pdf.pages)
+        self._leidas = {}
+        self._pdfium = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.pdf.close()
+        if self._pdfium is not None:
+            self._pdfium.close()
+
+    def pdfium(self):
+        if self._pdfium is None:
+            self._pdfium = pdfium.PdfDocument(self.datos)
+        return self._pdfium
+
+    def _extraer(self, n):
+        if n not in self._leidas:
+            self._leidas[n] = self.pdf.pages[n].extract_text() or ""
+        return self._leidas[n]
+
+    def texto(self, n):
+        return self.cache.pagina(self.ruta, "pdfplumber", {}, n, self._extraer)
+
+    def todas(self):
+        # misma clave que paginas_pdfplumber/extraer_paginas en DNDA.py y Cesion.py
+        return list(self.cache.paginas(self.ruta, "pdfplumber", {},
+                                       lambda _: [self._extraer(n) for n in range(self.num_paginas)]))
+
+
+def clasificar(doc, ocr=True):
+    """
+    Devuelve (tipo, {página: texto OCR}) según las huellas de las primeras
+    páginas, o (None, ...) si no coincide ninguna.
+    """
+    ocr_hecho = {}
+    for n in range(min(PAGINAS_HUELLA, doc.num_paginas)):
+        texto = doc.texto(n)
+        if n == 0 and ocr and len(texto.strip()) < DNDA.MIN_CARACTERES_PAGINA:
+            # primera página escaneada (típico de los certificados DNDA)
+            texto = doc.cache.pagina(doc.ruta, "tesseract", DNDA.AJUSTES_OCR, 0,
+                                     partial(DNDA.ocr_pagina, doc.ruta))
+            ocr_hecho[0] = texto
+        for tipo, huella in HUELLAS:
+            if huella.search(texto):
+                return tipo, ocr_hecho
+    return None, ocr_hecho
+
+
+# -------------------- Extractores por tipo --------------------
+
+def filas_issn(doc, clave, args, ocr_hecho):
+    row = seriadas.parse_lines(seriadas.extract_lines(doc.ruta, doc.cache, io.BytesIO(doc.datos)))
+    row["archivo"] = clave
+    return [row]
+
+
+def filas_dnda(doc, clave, args, ocr_hecho):
+    paginas = doc.todas()
+    for n, texto in ocr_hecho.items():
+        paginas[n] = texto
+    DNDA.completar_ocr(doc.ruta, paginas, doc.cache, args.ocr_hilos)
+    return DNDA.datos_de_texto(DNDA.limpiar_texto("\n".join(paginas)), clave)
+
+
+def filas_cesion(doc, clave, args, ocr_hecho):
+    return [Cesion.procesar_texto(Cesion.unir_paginas(doc.todas()), clave)]
+
+
+def filas_libro(doc, clave, args, ocr_hecho):
+    info = extraer.extraer_libro(doc.ruta, doc.cache, plumber=doc.pdf, pdfium=doc.pdfium())
+    info["Archivo"] = clave
+    return [info]
+
+
+EXTRACTORES = {
+    "issn": filas_issn,
+    "dnda": filas_dnda,
+    "cesion": filas_cesion,
+    "libro": filas_libro,
+}
+
+
+def guardar(tipo, filas, ruta):
+    if tipo == "issn":
+        seriadas.order_columns(pd.DataFrame(filas)).to_excel(ruta, index=False)
+    elif tipo == "dnda":
+        pd.DataFrame(filas, columns=DNDA.COLUMNAS).to_excel(ruta, index=False)
+    elif tipo == "cesion":
+        Cesion.guardar_csv(pd.DataFrame(filas), ruta)
+    else:
+        pd.DataFrame(filas).to_excel(ruta, index=False)
+
+
+# -------------------- CLI --------------------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", required=True, help="Carpeta con PDFs de cualquier tipo (recursivo)")
+    ap.add_argument("--out-dir", default=".", help="Carpeta donde se escriben las salidas por tipo")
+    ap.add_argument("--ocr-hilos", type=int, default=DNDA.OCR_HILOS,
+                    help="Páginas escaneadas procesadas con OCR a la vez (por defecto, núcleos)")
+    ap.add_argument("--sin-ocr", action="store_true",
+                    help="No aplica OCR a la primera página para clasificar PDFs escaneados")
+    CacheTexto.agregar_argumentos(ap)
+    args = ap.parse_args()
+    cache = CacheTexto.desde_args(args)
+
+    if not os.path.isdir(args.dir):
+        raise SystemExit(f"❌ Carpeta no encontrada: {args.dir}")
+    pdfs = list(seriadas.iter_pdfs(args.dir))
+    if not pdfs:
+        raise SystemExit(f"❌ No se encontraron PDFs en {args.dir}")
+    print(f"Procesando {len(pdfs)} PDF(s) desde {args.dir}...\n")
+
+    filas = {tipo: [] for tipo in EXTRACTORES}
+    resumen = []
+    for ruta in pdfs:
+        clave = os.path.relpath(ruta, args.dir).replace(os.sep, "/")
+        fila = {"archivo": clave, "tipo": None, "paginas": None, "filas": 0, "error": None}
+        try:
+            with DocumentoPDF(ruta, cache) as doc:
+                fila["paginas"] = doc.num_paginas
+                tipo, ocr_hecho = clasificar(doc, ocr=not args.sin_ocr)
+                fila["tipo"] = tipo
+                if tipo:
+                    nuevas = EXTRACTORES[tipo](doc, clave, args, ocr_hecho)
+                    filas[tipo].extend(nuevas)
+                    fila["filas"] = len(nuevas)
+            print(f"{'✅' if tipo else '❔'} {clave}: {tipo or 'sin clasificar'}")
+        except Exception as e:
+            fila["error"] = str(e) or type(e).__name__
+            print(f"⚠️ Error procesando {clave}: {fila['error']}")
+        resumen.append(fila)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    print()
+    for tipo, nombre in SALIDAS.items():
+        if filas[tipo]:
+            ruta = os.path.join(args.out_dir, nombre)
+            guardar(tipo, filas[tipo], ruta)
+            print(f"✅ {tipo}: {len(filas[tipo])} fila(s) -> {ruta}")
+    ruta_resumen = os.path.join(args.out_dir, RESUMEN)
+    Cesion.guardar_csv(pd.DataFrame(resumen), ruta_resumen)
+
+    sin_tipo = sum(1 for f in resumen if f["tipo"] is None and f["error"] is None)
+    errores = sum(1 for f in resumen if f["error"])
+    print(f"\n{sin_tipo} sin clasificar, {errores} con error (detalle en {ruta_resumen})")
+    print(cache.resumen())
+
+
+if __name__ == "__main__":
+    main()
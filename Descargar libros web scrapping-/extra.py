@@ -1,62 +1,242 @@
 import os
-import requests
+import re
+import sys
+import argparse
+import threading
 import pandas as pd
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.bitacora import Bitacora
+from comun.descargas import Descargador, Tarea, validar_pdf
+from comun.dspace import ClienteDSpace
 
 # --- Configuración ---
 excel_file = r"C:\Users\andres.guerra.d\Downloads\scripts\Extraccion libros informacion\links.xlsx"
 output_dir = "pdfs"
 
-os.makedirs(output_dir, exist_ok=True)
-df = pd.read_excel(excel_file)
 
-options = webdriver.ChromeOptions()
-options.add_argument("--headless=new")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
+def nombre_seguro(nombre, uuid=None):
+    """Nombre de archivo válido en Windows a partir del nombre del bitstream (con el uuid como prefijo si se da)."""
+    nombre = re.sub(r'[\\/:*?"<>|\r\n]+', "_", nombre).strip(" .") or "sin_nombre.pdf"
+    return f"{uuid[:8]}_{nombre}" if uuid else nombre
 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
 
-for i, row in df.iterrows():
-    titulo = row[" Título del libro"]
-    url = row[" URL repositorio"].strip()
-    print(f"🔎 Procesando [{i+1}/{len(df)}]: {titulo}")
+class NombresArchivo:
+    """
+    Nombre de cada bitstream en la carpeta: el nombre limpio, como siempre (así
+    se reconocen los PDFs de corridas anteriores), y con el uuid como prefijo
+    solo si ese nombre ya es de otro bitstream de la corrida o de una fila
+    hecha antes: dos ítems con un "libro.pdf" no se pisan.
+    """
 
-    try:
-        driver.get(url)
+    def __init__(self, ocupados=()):
+        self._duenos = {n.lower(): None for n in ocupados}  # Windows no distingue mayúsculas
+
+    def __call__(self, nombre, uuid):
+        limpio = nombre_seguro(nombre)
+        dueno = self._duenos.setdefault(limpio.lower(), uuid)
+        return limpio if dueno == uuid else nombre_seguro(nombre, uuid)
+
+
+def reportar(descargador, anotadas=()):
+    """Espera las descargas encoladas (y que su fila quede en la bitácora) e imprime cómo terminó cada una."""
+    resultados = descargador.resultados()
+    for anotada in anotadas:
+        anotada.wait()  # el callback corre después de que result() ya volvió
+    for r in resultados:
+        print("   " + r.resumen())
+    errores = sum(not r.ok for r in resultados)
+    print(f"📦 {len(resultados) - errores}/{len(resultados)} archivos listos, {errores} con error")
 
-        # Esperar hasta 20s a que aparezcan links de bitstreams con download
+
+def registrar_al_terminar(bitacora, url, futuros):
+    """
+    Anota la fila en la bitácora cuando terminan todas sus descargas (con
+    error si alguna falló). Devuelve un Event que se activa ya anotada.
+    """
+    anotada = threading.Event()
+    if not futuros:
+        bitacora.registrar(url, {"archivos": []})
+        anotada.set()
+        return anotada
+    faltan = [len(futuros)]
+    lock = threading.Lock()
+
+    def listo(_):
+        with lock:
+            faltan[0] -= 1
+            if faltan[0]:
+                return
+        resultados = [f.result() for f in futuros]
+        errores = [r.error for r in resultados if not r.ok]
         try:
-            links = WebDriverWait(driver, 20).until(
-                EC.presence_of_all_elements_located(
-                    (By.XPATH, "//a[contains(@href, '/bitstreams/') and contains(@href, '/download')]")
-                )
-            )
-        except:
-            print(f"⚠️ No se encontró PDF en: {url}")
-            continue
+            if errores:
+                bitacora.registrar(url, error="; ".join(errores))
+            else:
+                bitacora.registrar(url, {"archivos": [os.path.basename(r.tarea.destino) for r in resultados]})
+        finally:
+            anotada.set()
+
+    for f in futuros:
+        f.add_done_callback(listo)
+    return anotada
+
+
+def filas_pendientes(df, bitacora):
+    """
+    (i, titulo, url) de las filas que no terminaron bien en una corrida
+    anterior, y los nombres de archivo de las que sí. Una URL repetida en el
+    Excel se procesa una sola vez.
+    """
+    filas, vistas, ocupados = [], set(), []
+    hechas = repetidas = 0
+    for i, row in df.iterrows():
+        url = str(row[" URL repositorio"]).strip()
+        if bitacora.hecha(url):
+            hechas += 1
+            ocupados.extend(bitacora.datos(url).get("archivos", []))
+        elif url in vistas:
+            repetidas += 1
+        else:
+            vistas.add(url)
+            filas.append((i, row[" Título del libro"], url))
+    if hechas:
+        print(f"⏭️ {hechas} filas ya descargadas en una corrida anterior")
+    if repetidas:
+        print(f"⏭️ {repetidas} filas repiten una URL de otra fila")
+    return filas, NombresArchivo(ocupados)
+
+
+# --- Modo API: DSpace 7 REST, sin navegador ---
+def descargar_api(df, output_dir, bitacora, api_base=None, hilos=4):
+    # una sola sesión para la API y las descargas; los PDFs bajan en paralelo
+    # mientras se siguen resolviendo los ítems siguientes
+    descargador = Descargador(hilos=hilos)
+    sesion = descargador.sesion
+    clientes = {}
+    filas, nombres = filas_pendientes(df, bitacora)
+    anotadas = []
+
+    for i, titulo, url in filas:
+        print(f"🔎 Procesando [{i+1}/{len(df)}]: {titulo}")
+
+        try:
+            if api_base:
+                cliente = clientes.setdefault(api_base, ClienteDSpace(api_base, sesion))
+            else:
+                cliente = ClienteDSpace.desde_url_item(url, sesion=sesion)
+                cliente = clientes.setdefault(cliente.api, cliente)
+
+            bitstreams = cliente.bitstreams(cliente.resolver_item(url))
+            if not bitstreams:
+                print(f"⚠️ No se encontró PDF en: {url}")
+
+            futuros = []
+            for b in bitstreams:
+                pdf_name = nombres(b.nombre, b.uuid)
+                print(f"   ⬇️ En cola: {pdf_name}")
+                futuros.append(descargador.enviar(Tarea(
+                    b.url_contenido, os.path.join(output_dir, pdf_name), bytes=b.bytes,
+                    md5=b.checksum if (b.algoritmo or "").upper() == "MD5" else None,
+                    validar=validar_pdf if pdf_name.lower().endswith(".pdf") else None,
+                    cabeceras={"Accept": "*/*"},
+                )))
+            anotadas.append(registrar_al_terminar(bitacora, url, futuros))
+
+        except Exception as e:
+            print(f"❌ Error con {url}: {e}")
+            bitacora.registrar(url, error=e)
+
+    reportar(descargador, anotadas)
+    descargador.cerrar()
 
-        for link in links:
-            pdf_url = link.get_attribute("href")
-            pdf_name = link.text.strip() or pdf_url.split("/")[-2] + ".pdf"
-            pdf_path = os.path.join(output_dir, pdf_name)
 
-            print(f"   ⬇️ Descargando: {pdf_name}")
+# --- Modo navegador: Selenium, espera a que Angular pinte los enlaces ---
+def descargar_navegador(df, output_dir, bitacora, hilos=4):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    descargador = Descargador(hilos=hilos)
+    filas, nombres = filas_pendientes(df, bitacora)
+    anotadas = []
+
+    for i, titulo, url in filas:
+        print(f"🔎 Procesando [{i+1}/{len(df)}]: {titulo}")
+
+        try:
+            driver.get(url)
+
+            # Esperar hasta 20s a que aparezcan links de bitstreams con download
             try:
-                r = requests.get(pdf_url, timeout=30)
-                r.raise_for_status()
-                with open(pdf_path, "wb") as f:
-                    f.write(r.content)
-            except Exception as e:
-                print(f"   ❌ Error al descargar {pdf_url}: {e}")
-
-    except Exception as e:
-        print(f"❌ Error con {url}: {e}")
-
-driver.quit()
-print("✅ Proceso terminado. PDFs guardados en:", output_dir)
+                links = WebDriverWait(driver, 20).until(
+                    EC.presence_of_all_elements_located(
+                        (By.XPATH, "//a[contains(@href, '/bitstreams/') and contains(@href, '/download')]")
+                    )
+                )
+            except:
+                # sin enlaces tras 20 s puede ser una página lenta: se reintenta en la próxima corrida
+                print(f"⚠️ No se encontró PDF en: {url}")
+                bitacora.registrar(url, error="sin enlaces de descarga")
+                continue
+
+            futuros = []
+            for link in links:
+                pdf_url = link.get_attribute("href")
+                uuid = pdf_url.split("/")[-2]   # …/bitstreams/<uuid>/download
+                pdf_name = nombres(link.text.strip() or uuid + ".pdf", uuid)
+                pdf_path = os.path.join(output_dir, pdf_name)
+
+                print(f"   ⬇️ En cola: {pdf_name}")
+                futuros.append(descargador.enviar(Tarea(pdf_url, pdf_path, validar=validar_pdf)))
+            anotadas.append(registrar_al_terminar(bitacora, url, futuros))
+
+        except Exception as e:
+            print(f"❌ Error con {url}: {e}")
+            bitacora.registrar(url, error=e)
+
+    driver.quit()
+    reportar(descargador, anotadas)
+    descargador.cerrar()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--excel", default=excel_file, help="Excel con las columnas ' Título del libro' y ' URL repositorio'")
+    ap.add_argument("--out", default=output_dir, help="Carpeta donde se guardan los PDFs")
+    ap.add_argument("--modo", choices=["api", "navegador"], default="api",
+                    help="api: REST de DSpace 7 (rápido); navegador: Selenium con Chrome headless")
+    ap.add_argument("--api-base",
+                    help="URL de la API (p. ej. http://127.0.0.1:8765/server/api para el mock); "
+                         "por defecto se deduce de cada URL del Excel")
+    ap.add_argument("--hilos", type=int, default=4, help="Descargas simultáneas")
+    Bitacora.agregar_argumentos(ap)
+    args = ap.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    df = pd.read_excel(args.excel)
+    bitacora = Bitacora.desde_args(args, args.out.rstrip("/\\"))
+
+    try:
+        if args.modo == "api":
+            descargar_api(df, args.out, bitacora, args.api_base, args.hilos)
+        else:
+            descargar_navegador(df, args.out, bitacora, args.hilos)
+    finally:
+        bitacora.cerrar()
+    print(f"🗒️ {bitacora.resumen()}")
+
+    print("✅ Proceso terminado. PDFs guardados en:", args.out)
+
+
+if __name__ == "__main__":
+    main()
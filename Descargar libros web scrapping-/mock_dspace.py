@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor DSpace 7 simulado para probar extra.py sin tocar el repositorio real.
+
+Implementa solo lo que usa comun/dspace.py:
+
+  GET /server/api/pid/find?id=hdl:<handle>          -> 302 al ítem
+  GET /server/api/core/items/<uuid>                 -> ítem (con dc.subject y dc.identifier.uri)
+  GET /server/api/core/items/<uuid>/bundles         -> ORIGINAL, THUMBNAIL, LICENSE
+  GET /server/api/core/bundles/<uuid>/bitstreams    -> bitstreams (paginados, HAL)
+  GET /server/api/core/bitstreams/<uuid>/content    -> el PDF (admite Range, If-Range,
+                                                       If-None-Match y HEAD)
+
+Cualquier handle o UUID existe: el ítem, sus archivos y el contenido se
+derivan del identificador, así que se puede usar el links.xlsx real apuntando
+--api-base al mock. Los PDFs son bytes de relleno con cabecera %PDF y %%EOF.
+Con --cortes se corta a la mitad una fracción de las descargas, para probar la
+reanudación de comun/descargas.py.
+
+Uso:
+  python mock_dspace.py --puerto 8765 --latencia 50
+  python extra.py --excel links.xlsx --api-base http://127.0.0.1:8765/server/api --out pdfs_mock
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API = "/server/api"
+ESPACIO = uuid.UUID("6f1c3a52-5d0e-4a8e-9a3e-1d2b7c0e9f10")  # para uuid5 deterministas
+TEMAS = ["Educación", "Pedagogía", "Desarrollo social", "Comunicación", "Ingeniería",
+         "Psicología", "Administración", "Teología", "Innovación social", "Ciencias humanas"]
+
+
+class Repositorio:
+    """Ítems generados a partir de su identificador (siempre los mismos para el mismo id)."""
+
+    def __init__(self, max_archivos=3, kb=256, sin_archivos=0.1, semilla=0):
+        self.max_archivos = max_archivos
+        self.kb = kb
+        self.sin_archivos = sin_archivos
+        self.semilla = semilla
+        self.bundles = {}     # uuid bundle -> (uuid ítem, nombre)
+        self.bitstreams = {}  # uuid bitstream -> dict
+        self._contenidos = {}
+
+    def _rng(self, *partes):
+        return random.Random("|".join([str(self.semilla)] + [str(p) for p in partes]))
+
+    def uuid_de_handle(self, handle):
+        return str(uuid.uuid5(ESPACIO, "hdl:" + handle))
+
+    def item(self, uuid_item):
+        rng = self._rng(uuid_item)
+        handle = f"10656/{rng.randint(1000, 99999)}"
+        temas = rng.sample(TEMAS, rng.randint(0, 4))
+        uris = [f"https://hdl.handle.net/{handle}"]
+        if rng.random() < 0.6:
+            uris.append(f"https://doi.org/10.26620/uniminuto.{rng.randint(100, 999)}.{uuid_item[:4]}")
+
+        def valores(lista):
+            return [{"value": v, "language": "spa", "authority": None, "confidence": -1, "place": i}
+                    for i, v in enumerate(lista)]
+
+        return {
+            "id": uuid_item, "uuid": uuid_item, "type": "item",
+            "name": f"Libro {uuid_item[:8]}",
+            "handle": handle,
+            "inArchive": True, "discoverable": True, "withdrawn": False,
+            "metadata": {
+                "dc.title": valores([f"Libro {uuid_item[:8]}"]),
+                "dc.subject": valores(temas),
+                "dc.identifier.uri": valores(uris),
+            },
+        }
+
+    def lista_bundles(self, uuid_item):
+        salida = []
+        for nombre in ("ORIGINAL", "THUMBNAIL", "LICENSE"):
+            uuid_bundle = str(uuid.uuid5(ESPACIO, f"{uuid_item}:{nombre}"))
+            self.bundles[uuid_bundle] = (uuid_item, nombre)
+            salida.append({"uuid": uuid_bundle, "id": uuid_bundle, "name": nombre, "type": "bundle"})
+        return salida
+
+    def lista_bitstreams(self, uuid_bundle):
+        uuid_item, nombre = self.bundles[uuid_bundle]
+        rng = self._rng(uuid_item, nombre)
+        if nombre == "ORIGINAL":
+            n = 0 if rng.random() < self.sin_archivos else rng.randint(1, self.max_archivos)
+            extension = ".pdf"
+        else:
+            n, extension = 1, (".jpg" if nombre == "THUMBNAIL" else ".txt")
+        salida = []
+        for i in range(n):
+            uuid_bs = str(uuid.uuid5(ESPACIO, f"{uuid_bundle}:{i}"))
+            contenido = self.contenido(uuid_bs)
+            bs = {
+                "uuid": uuid_bs, "id": uuid_bs, "type": "bitstream",
+                "name": f"{uuid_item[:8]}_{i + 1}{extension}" if nombre != "LICENSE" else "license.txt",
+                "sizeBytes": len(contenido), "bundleName": nombre,
+                "checkSum": {"checkSumAlgorithm": "MD5", "value": hashlib.md5(contenido).hexdigest()},
+            }
+            self.bitstreams[uuid_bs] = bs
+            salida.append(bs)
+        return salida
+
+    def contenido(self, uuid_bs):
+        if uuid_bs not in self._contenidos:
+            rng = self._rng(uuid_bs)
+            tam = max(1, int(self.kb * rng.uniform(0.5, 1.5))) * 1024
+            cuerpo = rng.randbytes(tam) if hasattr(rng, "randbytes") else bytes(rng.getrandbits(8) for _ in range(tam))
+            self._contenidos[uuid_bs] = b"%PDF-1.4\n%" + cuerpo + b"\n%%EOF\n"
+        return self._contenidos[uuid_bs]
+
+
+def paginar(elementos, clave, url_base, params):
+    """Respuesta HAL con _embedded, page y _links.next como la de DSpace."""
+    pagina = int(params.get("page", ["0"])[0])
+    tamano = int(params.get("size", ["20"])[0])
+    total = len(elementos)
+    trozo = elementos[pagina * tamano:(pagina + 1) * tamano]
+    for e in trozo:
+        e.setdefault("_links", {})["self"] = {"href": f"{url_base}/{e['uuid']}"}
+    enlaces = {"self": {"href": f"{url_base}?page={pagina}&size={tamano}"}}
+    if (pagina + 1) * tamano < total:
+        enlaces["next"] = {"href": f"{url_base}?page={pagina + 1}&size={tamano}"}
+    return {
+        "_embedded": {clave: trozo},
+        "_links": enlaces,
+        "page": {"size": tamano, "totalElements": total,
+                 "totalPages": (total + tamano - 1) // tamano if tamano else 0, "number": pagina},
+    }
+
+
+class Manejador(BaseHTTPRequestHandler):
+    repo: Repositorio = None
+    latencia = 0.0
+    verboso = False
+    cortes = 0.0
+    _azar = random.Random(0)
+    _lock = threading.Lock()
+
+    def log_message(self, formato, *args):
+        if self.verboso:
+            super().log_message(formato, *args)
+
+    def _origen(self):
+        return f"http://{self.headers.get('Host', '%s:%d' % self.server.server_address[:2])}"
+
+    def _json(self, datos, estado=200):
+        cuerpo = json.dumps(datos).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/hal+json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, estado, mensaje):
+        self._json({"status": estado, "message": mensaje}, estado)
+
+    def do_HEAD(self):
+        self.do_GET(cuerpo=False)
+
+    def do_GET(self, cuerpo=True):
+        if self.latencia:
+            time.sleep(self.latencia)
+        partes = urlsplit(self.path)
+        params = parse_qs(partes.query)
+        ruta = partes.path.rstrip("/")
+        api = self._origen() + API
+        segmentos = ruta[len(API):].strip("/").split("/") if ruta.startswith(API) else []
+
+        if segmentos == ["pid", "find"]:
+            ident = params.get("id", [""])[0]
+            handle = ident[4:] if ident.startswith("hdl:") else ident
+            if not handle:
+                return self._error(400, "Falta id")
+            self.send_response(302)
+            self.send_header("Location", f"{api}/core/items/{self.repo.uuid_de_handle(handle)}")
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+
+        if len(segmentos) >= 3 and segmentos[:2] == ["core", "items"]:
+            uuid_item = segmentos[2]
+            if len(segmentos) == 3:
+                item = self.repo.item(uuid_item)
+                item["_links"] = {"self": {"href": f"{api}/core/items/{uuid_item}"},
+                                  "bundles": {"href": f"{api}/core/items/{uuid_item}/bundles"}}
+                return self._json(item)
+            if segmentos[3:] == ["bundles"]:
+                bundles = self.repo.lista_bundles(uuid_item)
+                for b in bundles:
+                    b["_links"] = {"bitstreams": {"href": f"{api}/core/bundles/{b['uuid']}/bitstreams"}}
+                return self._json(paginar(bundles, "bundles", f"{api}/core/items/{uuid_item}/bundles", params))
+
+        if len(segmentos) == 4 and segmentos[:2] == ["core", "bundles"] and segmentos[3] == "bitstreams":
+            if segmentos[2] not in self.repo.bundles:
+                return self._error(404, "Bundle no encontrado")
+            bitstreams = [dict(b) for b in self.repo.lista_bitstreams(segmentos[2])]
+            for b in bitstreams:
+                b["_links"] = {"content": {"href": f"{api}/core/bitstreams/{b['uuid']}/content"}}
+            return self._json(paginar(bitstreams, "bitstreams", f"{api}/core/bundles/{segmentos[2]}/bitstreams",
+                                      params))
+
+        if len(segmentos) == 4 and segmentos[:2] == ["core", "bitstreams"] and segmentos[3] == "content":
+            bs = self.repo.bitstreams.get(segmentos[2])
+            if bs is None:
+                return self._error(404, "Bitstream no encontrado")
+            return self._contenido(bs, cuerpo)
+
+        self._error(404, f"Ruta no soportada por el mock: {ruta}")
+
+    def _contenido(self, bs, cuerpo=True):
+        contenido = self.repo.contenido(bs["uuid"])
+        etag = f'"{bs["checkSum"]["value"]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            return self.end_headers()
+
+        inicio, total = 0, len(contenido)
+        rango = self.headers.get("Range", "")
+        if rango.startswith("bytes=") and self.headers.get("If-Range", etag) == etag:
+            desde = rango[6:].split("-")[0]
+            inicio = int(desde) if desde.isdigit() else 0
+            if inicio >= total:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{total}")
+                self.send_header("Content-Length", "0")
+                return self.end_headers()
+        parte = contenido[inicio:]
+
+        self.send_response(206 if inicio else 200)
+        self.send_header("Content-Type", "application/pdf" if bs["name"].endswith(".pdf") else "application/octet-stream")
+        self.send_header("Content-Length", str(len(parte)))
+        if inicio:
+            self.send_header("Content-Range", f"bytes {inicio}-{total - 1}/{total}")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Disposition", f'attachment; filename="{bs["name"]}"')
+        self.send_header("ETag", etag)
+        self.end_headers()
+        if not cuerpo:
+            return
+        with self._lock:
+            cortar = self._azar.random() < self.cortes
+        if cortar:
+            # conexión que se cae a mitad de la transferencia
+            self.wfile.write(parte[:len(parte) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(parte)
+
+
+def crear_servidor(puerto=8765, latencia_ms=0, cortes=0.0, **opciones_repo):
+    manejador = type("ManejadorDSpace", (Manejador,), {
+        "repo": Repositorio(**opciones_repo), "latencia": latencia_ms / 1000, "cortes": cortes,
+    })
+    return ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--puerto", type=int, default=8765)
+    ap.add_argument("--latencia", type=float, default=0, help="Milisegundos de espera por petición")
+    ap.add_argument("--kb", type=int, default=256, help="Tamaño medio de cada PDF en KB")
+    ap.add_argument("--max-archivos", type=int, default=3, help="Máximo de PDFs por ítem")
+    ap.add_argument("--sin-archivos", type=float, default=0.1, help="Fracción de ítems sin PDF")
+    ap.add_argument("--cortes", type=float, default=0.0,
+                    help="Fracción de descargas que se cortan a la mitad (prueba de reanudación)")
+    ap.add_argument("--verboso", action="store_true", help="Muestra cada petición")
+    args = ap.parse_args()
+
+    Manejador.verboso = args.verboso
+    servidor = crear_servidor(args.puerto, args.latencia, args.cortes, max_archivos=args.max_archivos,
+                              kb=args.kb, sin_archivos=args.sin_archivos)
+    print(f"🧪 DSpace simulado en http://127.0.0.1:{args.puerto}{API} (Ctrl+C para terminar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
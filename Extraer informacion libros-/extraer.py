@@ -1,93 +1,221 @@
 import pdfplumber
+import pypdfium2 as pdfium  # viene con pdfplumber; texto rápido para el sondeo
 import re
 import os
+import sys
+import argparse
 import pandas as pd
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.cache_texto import CacheTexto, SIN_CACHE
+from comun.campos import Campo, Extractor
+from comun.manifiesto import Manifiesto, combinar, leer_tabla
+
 # --- CONFIGURACIÓN ---
 carpeta_pdfs = r"C:\Users\andres.guerra.d\Downloads\scripts\Extraer informacion libros\pdfs"
 salida_excel = r"C:\Users\andres.guerra.d\Downloads\scripts\Extraer informacion libros\catalografia.xlsx"
+max_paginas = 10      # ventana por defecto si el sondeo no encuentra la ficha
+paginas_inicio = 20   # páginas iniciales que se sondean buscando la ficha catalográfica
+paginas_final = 4     # ... y páginas finales (algunos libros la ponen en el colofón)
 
-# --- FUNCIÓN DE EXTRACCIÓN ---
-def extraer_info(texto):
-    # Normalizar espacios
-    texto = re.sub(r"\s+", " ", texto)
+# Marcas de la ficha catalográfica (página de créditos)
+MARCAS_FICHA = re.compile(r"ISBN|palabras\s+clave|catalogaci[oó]n|ficha\s+catalogr", re.IGNORECASE)
 
-    data = {
-        "ISBN": None,
-        "e-ISBN": None,
-        "Palabras clave": None,
-        "Proyecto": None,
-        "Código Proyecto": None,
-        "Financiador": None,
-        "Grupo de investigación": None,
-    }
+# --- CAMPOS DE LA FICHA ---
+ESPACIOS = re.compile(r"\s+")
+CLAVE_NUMERADA = re.compile(r"\d+\.\s*([^0-9]+?)(?=\s*\d+\.|$)")
+FIN_BLOQUE_CLAVES = re.compile(r"\s(?:I\.\s|e?-?ISBN|CDD|Clasificaci[oó]n|Cataloga)", re.IGNORECASE)
 
-    # --- Captura todos los posibles ISBNs en el texto ---
-    isbn_matches = re.findall(r"(?:e-ISBN|ISBN(?: electrónico)?)[:\s-]*([\d\- ]{10,20})", texto, re.IGNORECASE)
 
-    if isbn_matches:
-        # Limpiar números (quitar espacios internos)
-        isbn_matches = [num.replace(" ", "") for num in isbn_matches]
+def palabras_numeradas(bloque):
+    claves = CLAVE_NUMERADA.findall(bloque)
+    return " | ".join([c.strip(" -:;") for c in claves]) if claves else None
 
-        if len(isbn_matches) >= 1:
-            data["ISBN"] = isbn_matches[0]
-        if len(isbn_matches) >= 2:
-            data["e-ISBN"] = isbn_matches[1]
 
-    # Palabras clave (líneas numeradas tipo 1., 2., etc.)
-    claves = re.findall(r"\d+\.\s*([^0-9]+?)(?=\s*\d+\.|$)", texto)
-    if claves:
-        data["Palabras clave"] = " | ".join([c.strip(" -:;") for c in claves])
+def bloque_claves(bloque):
+    # solo el bloque que sigue al rótulo, hasta la siguiente sección de la ficha
+    return palabras_numeradas(FIN_BLOQUE_CLAVES.split(bloque, maxsplit=1)[0])
 
-    # Proyecto (con o sin comillas)
-    proyecto_match = re.search(
-        r"resultado de la investigaci[oó]n\s*(“([^”]+)”|([^.,]+))",
-        texto,
-        re.IGNORECASE
-    )
-    if proyecto_match:
-        data["Proyecto"] = proyecto_match.group(2) or proyecto_match.group(3)
-
-    # Código
-    codigo_match = re.search(r"c[oó]digo[:\s]*([A-Z0-9\-]+)", texto, re.IGNORECASE)
-    if codigo_match:
-        data["Código Proyecto"] = codigo_match.group(1)
 
+CAMPOS_FICHA = Extractor([
+    # --- Todos los posibles ISBNs en el texto (sin espacios internos) ---
+    Campo("ISBN", r"(?:e-ISBN|ISBN(?: electrónico)?)[:\s-]*([\d\- ]{10,20})", re.IGNORECASE, todos=True,
+          post=lambda nums: [num.replace(" ", "") for num in nums]),
+    # Palabras clave (líneas numeradas tipo 1., 2., etc.) tras el rótulo
+    Campo("Palabras clave", r"palabras\s+clave[:\s]*(.{0,600})", re.IGNORECASE | re.DOTALL, post=bloque_claves),
+    # Proyecto (con o sin comillas)
+    Campo("Proyecto", r"resultado de la investigaci[oó]n\s*(“([^”]+)”|([^.,]+))", re.IGNORECASE, grupo=(2, 3)),
+    Campo("Código Proyecto", r"c[oó]digo[:\s]*([A-Z0-9\-]+)", re.IGNORECASE),
     # Financiador (financiado / financiada por)
-    financiador_match = re.search(r"financiad[ao] por\s*([^.,]+)", texto, re.IGNORECASE)
-    if financiador_match:
-        data["Financiador"] = financiador_match.group(1).strip()
+    Campo("Financiador", r"financiad[ao] por\s*([^.,]+)", re.IGNORECASE, post=str.strip),
+    Campo("Grupo de investigación", r"(grupo[s]? de investigaci[oó]n[^.,]+)", re.IGNORECASE, post=str.strip),
+])
+
 
-    # Grupo de investigación
-    grupo_match = re.search(r"(grupo[s]? de investigaci[oó]n[^.,]+)", texto, re.IGNORECASE)
-    if grupo_match:
-        data["Grupo de investigación"] = grupo_match.group(1).strip()
+# --- FUNCIÓN DE EXTRACCIÓN ---
+def extraer_info(texto):
+    # Normalizar espacios
+    texto = ESPACIOS.sub(" ", texto)
+    r = CAMPOS_FICHA.evaluar(texto)
+    v = r.valores
 
+    isbns = v["ISBN"] or []
+    data = {
+        "ISBN": isbns[0] if len(isbns) >= 1 else None,
+        "e-ISBN": isbns[1] if len(isbns) >= 2 else None,
+        # sin rótulo, las líneas numeradas de toda la ventana
+        "Palabras clave": v["Palabras clave"] if "Palabras clave" in r.encontrados else palabras_numeradas(texto),
+        "Proyecto": v["Proyecto"],
+        "Código Proyecto": v["Código Proyecto"],
+        "Financiador": v["Financiador"],
+        "Grupo de investigación": v["Grupo de investigación"],
+    }
     return data
 
-# --- PROCESAR TODOS LOS PDFs ---
-registros = []
 
-for archivo in os.listdir(carpeta_pdfs):
-    if archivo.lower().endswith(".pdf"):
-        ruta = os.path.join(carpeta_pdfs, archivo)
+# --- LECTURA DEL PDF ---
+class LibroPDF:
+    """
+    Abre el PDF de forma perezosa: pypdfium2 para el sondeo y pdfplumber para
+    las páginas que realmente se analizan. Todo pasa por la caché de texto.
+    Si se pasan `plumber` o `pdfium` (documentos ya abiertos) se reutilizan y
+    no se cierran.
+    """
+
+    def __init__(self, ruta, cache=SIN_CACHE, plumber=None, pdfium=None):
+        self.ruta = ruta
+        self.cache = cache
+        self._pdfium = pdfium
+        self._pdfium_propio = pdfium is None
+        self._plumber = plumber
+        self._plumber_propio = plumber is None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        if self._pdfium is not None and self._pdfium_propio:
+            self._pdfium.close()
+        if self._plumber is not None and self._plumber_propio:
+            self._plumber.close()
+
+    def _doc_pdfium(self):
+        if self._pdfium is None:
+            self._pdfium = pdfium.PdfDocument(self.ruta)
+        return self._pdfium
+
+    def num_paginas(self):
+        return self.cache.num_paginas(self.ruta, "pypdfium2", {}, lambda: len(self._doc_pdfium()))
+
+    def _sondeo(self, n):
+        page = self._doc_pdfium()[n]
+        textpage = page.get_textpage()
+        try:
+            return textpage.get_text_range()
+        finally:
+            textpage.close()
+            page.close()
+
+    def _pagina_plumber(self, n):
+        if self._plumber is None:
+            self._plumber = pdfplumber.open(self.ruta)
+        return self._plumber.pages[n].extract_text() or ""
+
+    def texto_sondeo(self, n):
+        return self.cache.pagina(self.ruta, "pypdfium2", {}, n, self._sondeo)
+
+    def texto(self, n):
+        return self.cache.pagina(self.ruta, "pdfplumber", {}, n, self._pagina_plumber)
+
+
+def ventana_ficha(libro):
+    """
+    Sondea las primeras y últimas páginas y devuelve las que tienen marcas de
+    ficha catalográfica (más la página siguiente), de la más a la menos marcada.
+    Si no hay marcas, la ventana es la de siempre: las primeras max_paginas.
+    """
+    total = libro.num_paginas()
+    candidatas = sorted(set(range(min(paginas_inicio, total))) |
+                        set(range(max(0, total - paginas_final), total)))
+    puntaje = {}
+    for n in candidatas:
+        marcas = {m.group(0).lower() for m in MARCAS_FICHA.finditer(libro.texto_sondeo(n))}
+        if marcas:
+            puntaje[n] = len(marcas)
+    if not puntaje:
+        return list(range(min(max_paginas, total)))
+    ventana = []
+    for n in sorted(puntaje, key=lambda n: (-puntaje[n], n)):
+        for m in (n, n + 1):
+            if m < total and m not in ventana:
+                ventana.append(m)
+    return ventana
+
+
+def extraer_libro(ruta, cache=SIN_CACHE, plumber=None, pdfium=None):
+    """
+    Analiza solo la ventana de la ficha. Cada página nueva se revisa sola y se
+    para cuando ya aparecieron todos los campos (y dos ISBN: el impreso y el
+    e-ISBN); al final se extrae una sola vez sobre el texto reunido (en orden
+    de página), para los campos que quedan partidos entre dos páginas.
+    """
+    todos = {c.nombre for c in CAMPOS_FICHA.campos}
+    with LibroPDF(ruta, cache, plumber, pdfium) as libro:
+        leidas = {}
+        hallados = set()
+        isbns = 0
+        for n in ventana_ficha(libro):
+            leidas[n] = libro.texto(n)
+            r = CAMPOS_FICHA.evaluar(ESPACIOS.sub(" ", leidas[n]), contar=False)
+            hallados |= r.encontrados
+            isbns += len(r.valores["ISBN"] or [])
+            if hallados == todos and isbns >= 2:
+                break
+        return extraer_info(" ".join(leidas[k] for k in sorted(leidas)))
+
+
+# --- PROCESAR TODOS LOS PDFs ---
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default=carpeta_pdfs, help="Carpeta con los libros en PDF")
+    ap.add_argument("--out", default=salida_excel, help="Ruta del Excel de salida")
+    CacheTexto.agregar_argumentos(ap)
+    Manifiesto.agregar_argumentos(ap)
+    args = ap.parse_args()
+    cache = CacheTexto.desde_args(args)
+    manifiesto = Manifiesto.desde_args(args, args.out, args.dir)
+
+    pdfs = [os.path.join(args.dir, a) for a in sorted(os.listdir(args.dir)) if a.lower().endswith(".pdf")]
+    cambios = manifiesto.clasificar(pdfs)
+    print(cambios.resumen())
+
+    registros = []
+
+    for ruta in cambios.pendientes:
+        archivo = os.path.basename(ruta)
         print(f"\n📖 Procesando: {archivo}")
 
         try:
-            texto_total = ""
-            with pdfplumber.open(ruta) as pdf:
-                for page in pdf.pages[:10]:  # primeras 10 páginas
-                    texto_total += page.extract_text() or ""
-
-            info = extraer_info(texto_total)
+            info = extraer_libro(ruta, cache)
             info["Archivo"] = archivo
             registros.append(info)
+            manifiesto.registrar(ruta)
 
         except Exception as e:
             print(f"⚠️ Error leyendo {archivo}: {e}")
 
-# --- EXPORTAR A EXCEL ---
-df = pd.DataFrame(registros)
-df.to_excel(salida_excel, index=False)
+    # --- EXPORTAR A EXCEL ---
+    df = pd.DataFrame(registros)
+    if manifiesto.incremental:
+        df = combinar(leer_tabla(args.out), df, "Archivo", cambios.conservar, cambios.orden)
+    df.to_excel(args.out, index=False)
+    manifiesto.guardar()
+
+    print(cache.resumen())
+    print(CAMPOS_FICHA.resumen())
+    print(f"\n✅ Proceso terminado. Archivo generado en: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
 
-print(f"\n✅ Proceso terminado. Archivo generado en: {salida_excel}")
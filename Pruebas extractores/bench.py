@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark y verificación contra salidas esperadas (golden) de los extractores
+de PDFs:
+
+  seriadas -> Publicaciones_seriadas/seriadas.py      extract_from_pdf
+  cesion   -> Cesiones de derecho/Cesion.py           procesar_pdf
+  dnda     -> extraer informacion DNDA-/DNDA.py       extraer_datos
+  libro    -> Extraer informacion libros-/extraer.py  extraer_libro (ventana + extraer_info)
+
+Cada extractor corre en su propio proceso (así el pico de memoria es solo
+suyo) sobre los PDFs incluidos en el repositorio más un corpus sintético
+(corpus_sintetico.py), sin caché de texto. Informa documentos/s, páginas/s y
+pico de RSS, y compara cada salida con golden/<extractor>.json. Termina con
+código 1 si algún documento difiere, para correrlo antes de un lote grande.
+
+Uso:
+  python bench.py                              # todos los extractores, 10 sintéticos por tipo
+  python bench.py --solo seriadas,libro --sinteticos 50 --repeticiones 3
+  python bench.py --actualizar-golden          # después de un cambio intencional en la salida
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from comun.scripts import RAIZ, cargar_script
+import corpus_sintetico
+
+CARPETA_GOLDEN = Path(__file__).resolve().parent / "golden"
+MAX_DIFERENCIAS = 20  # diferencias que se muestran por extractor
+
+
+@dataclass
+class Objetivo:
+    script: str                            # ruta relativa a la raíz del repositorio
+    incluidos: List[str]                   # globs (relativos a la raíz) de PDFs incluidos
+    sintetico: str                         # tipo en corpus_sintetico.TIPOS
+    llamar: Callable[[Any, str], Any]      # (módulo, ruta) -> salida
+
+
+EXTRACTORES: Dict[str, Objetivo] = {
+    "seriadas": Objetivo("Publicaciones_seriadas/seriadas.py", ["Publicaciones_seriadas/PDF's/*.pdf"], "issn",
+                         lambda m, ruta: m.extract_from_pdf(ruta)),
+    "cesion": Objetivo("Cesiones de derecho/Cesion.py", ["Cesiones de derecho/**/*.pdf"], "cesion",
+                       lambda m, ruta: m.procesar_pdf(Path(ruta))),
+    "dnda": Objetivo("extraer informacion DNDA-/DNDA.py", ["extraer informacion DNDA-/**/*.pdf"], "dnda",
+                     lambda m, ruta: m.extraer_datos(ruta, ocr_hilos=1)),
+    "libro": Objetivo("Extraer informacion libros-/extraer.py", ["Extraer informacion libros-/**/*.pdf"], "libro",
+                      lambda m, ruta: m.extraer_libro(ruta)),
+}
+
+
+# -------------------- Medición (proceso hijo) --------------------
+
+def rss_pico_mb() -> Optional[float]:
+    """Pico de memoria residente del proceso actual, si la plataforma lo informa."""
+    try:
+        import resource
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / 1024 / 1024 if sys.platform == "darwin" else pico / 1024  # bytes en macOS, KB en Linux
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows: peak_wset
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / 1024 / 1024
+    except ImportError:
+        return None
+
+
+def normalizar(salida: Any) -> Any:
+    """Salida comparable con el JSON guardado (tuplas -> listas, tipos raros -> str)."""
+    return json.loads(json.dumps(salida, ensure_ascii=False, default=str))
+
+
+def correr(nombre: str, docs: List[Tuple[str, str]], repeticiones: int) -> Dict[str, Any]:
+    """Corre un extractor sobre docs [(clave, ruta)] y devuelve tiempos, salidas y pico de RSS."""
+    objetivo = EXTRACTORES[nombre]
+    modulo = cargar_script(objetivo.script)
+    salidas: Dict[str, Any] = {}
+    mejor = float("inf")
+    for _ in range(max(1, repeticiones)):
+        t0 = time.perf_counter()
+        for clave, ruta in docs:
+            try:
+                salidas[clave] = objetivo.llamar(modulo, ruta)
+            except Exception as e:
+                salidas[clave] = {"error": str(e) or type(e).__name__}
+        mejor = min(mejor, time.perf_counter() - t0)
+    return {"segundos": mejor, "salidas": normalizar(salidas), "rss_mb": rss_pico_mb()}
+
+
+# -------------------- Corpus --------------------
+
+def contar_paginas(ruta) -> int:
+    import pypdfium2 as pdfium  # viene con pdfplumber
+    doc = pdfium.PdfDocument(str(ruta))
+    try:
+        return len(doc)
+    finally:
+        doc.close()
+
+
+def documentos(nombre: str, sinteticos: Dict[str, List[Path]], base_sinteticos: Path,
+               con_incluidos: bool) -> List[Tuple[str, str]]:
+    """[(clave, ruta)]: clave relativa a la raíz para los incluidos y 'sintetico/...' para los generados."""
+    objetivo = EXTRACTORES[nombre]
+    docs = []
+    if con_incluidos:
+        vistos = set()
+        for patron in objetivo.incluidos:
+            for ruta in sorted(RAIZ.glob(patron)):
+                if ruta not in vistos:
+                    vistos.add(ruta)
+                    docs.append((ruta.relative_to(RAIZ).as_posix(), str(ruta)))
+    for ruta in sinteticos.get(objetivo.sintetico, []):
+        docs.append(("sintetico/" + ruta.relative_to(base_sinteticos).as_posix(), str(ruta)))
+    return docs
+
+
+# -------------------- Golden --------------------
+
+def ruta_golden(nombre: str) -> Path:
+    return CARPETA_GOLDEN / f"{nombre}.json"
+
+
+def leer_golden(nombre: str) -> Dict[str, Any]:
+    ruta = ruta_golden(nombre)
+    return json.loads(ruta.read_text(encoding="utf-8")) if ruta.exists() else {}
+
+
+def guardar_golden(nombre: str, salidas: Dict[str, Any]) -> None:
+    # conserva lo que no se corrió esta vez (p. ej. con menos sintéticos)
+    golden = leer_golden(nombre)
+    golden.update(salidas)
+    CARPETA_GOLDEN.mkdir(parents=True, exist_ok=True)
+    ruta_golden(nombre).write_text(
+        json.dumps(dict(sorted(golden.items())), ensure_ascii=False, indent=1) + "\n", encoding="utf-8")
+
+
+def diferencias(esperado: Any, obtenido: Any) -> List[Tuple[str, Any, Any]]:
+    """[(campo, esperado, obtenido)]; compara campo a campo en dicts y en listas de dicts."""
+    if isinstance(esperado, list) and isinstance(obtenido, list) and len(esperado) == len(obtenido):
+        difs = []
+        for i, (e, o) in enumerate(zip(esperado, obtenido)):
+            difs += [(f"[{i}].{c}", ve, vo) for c, ve, vo in diferencias(e, o)]
+        return difs
+    if isinstance(esperado, dict) and isinstance(obtenido, dict):
+        return [(c, esperado.get(c), obtenido.get(c)) for c in sorted(set(esperado) | set(obtenido))
+                if esperado.get(c) != obtenido.get(c)]
+    return [] if esperado == obtenido else [("", esperado, obtenido)]
+
+
+# -------------------- CLI --------------------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--solo", help=f"Extractores separados por coma ({','.join(EXTRACTORES)})")
+    ap.add_argument("--sinteticos", type=int, default=10, help="Documentos sintéticos por tipo (0 = ninguno)")
+    ap.add_argument("--semilla", type=int, default=0, help="Semilla del corpus sintético")
+    ap.add_argument("--corpus", help="Carpeta donde dejar el corpus sintético (por defecto, temporal)")
+    ap.add_argument("--sin-incluidos", action="store_true", help="No usa los PDFs incluidos en el repositorio")
+    ap.add_argument("--repeticiones", type=int, default=1, help="Corridas por extractor (se toma la mejor)")
+    ap.add_argument("--actualizar-golden", action="store_true",
+                    help="Guarda las salidas actuales como esperadas en lugar de compararlas")
+    args = ap.parse_args()
+
+    nombres = args.solo.split(",") if args.solo else list(EXTRACTORES)
+    desconocidos = [n for n in nombres if n not in EXTRACTORES]
+    if desconocidos:
+        raise SystemExit(f"❌ Extractores desconocidos: {desconocidos}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(args.corpus or tmp)
+        tipos = [EXTRACTORES[n].sintetico for n in nombres]
+        sinteticos = corpus_sintetico.generar(base, args.sinteticos, args.semilla, tipos) if args.sinteticos else {}
+
+        filas = []
+        total_difs = 0
+        for nombre in nombres:
+            docs = documentos(nombre, sinteticos, base, not args.sin_incluidos)
+            if not docs:
+                print(f"⚠️ {nombre}: sin documentos")
+                continue
+            paginas = sum(contar_paginas(ruta) for _, ruta in docs)
+            print(f"⏱️ {nombre}: {len(docs)} documento(s), {paginas} página(s)...")
+            # un proceso nuevo por extractor: el pico de RSS no se mezcla con los demás
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as ex:
+                r = ex.submit(correr, nombre, docs, args.repeticiones).result()
+
+            if args.actualizar_golden:
+                guardar_golden(nombre, r["salidas"])
+                estado = "golden actualizado"
+            else:
+                golden = leer_golden(nombre)
+                sin_golden = [c for c in r["salidas"] if c not in golden]
+                difs = [(c, campo, e, o) for c, salida in r["salidas"].items() if c in golden
+                        for campo, e, o in diferencias(golden[c], salida)]
+                docs_mal = len({c for c, *_ in difs})
+                total_difs += docs_mal
+                estado = f"{len(r['salidas']) - len(sin_golden) - docs_mal}/{len(r['salidas']) - len(sin_golden)} iguales"
+                if sin_golden:
+                    estado += f", {len(sin_golden)} sin golden"
+                for c, campo, e, o in difs[:MAX_DIFERENCIAS]:
+                    print(f"   ❌ {c} | {campo} | esperado {e!r} → obtenido {o!r}")
+                if len(difs) > MAX_DIFERENCIAS:
+                    print(f"   ... y {len(difs) - MAX_DIFERENCIAS} diferencia(s) más")
+
+            s = r["segundos"]
+            filas.append((nombre, len(docs), paginas, s, len(docs) / s if s else 0, paginas / s if s else 0,
+                          r["rss_mb"], estado))
+
+    print(f"\n{'extractor':<10} {'docs':>5} {'págs':>6} {'s':>8} {'docs/s':>8} {'págs/s':>8} {'RSS MB':>7}  golden")
+    for nombre, n, p, s, dps, pps, rss, estado in filas:
+        rss_txt = f"{rss:7.0f}" if rss is not None else f"{'-':>7}"
+        print(f"{nombre:<10} {n:>5} {p:>6} {s:>8.2f} {dps:>8.1f} {pps:>8.1f} {rss_txt}  {estado}")
+
+    if total_difs:
+        print(f"\n❌ {total_difs} documento(s) con salida distinta a la esperada")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
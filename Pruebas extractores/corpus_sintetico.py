@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generador de un corpus sintético de PDFs para medir los extractores.
+
+Escribe PDFs mínimos a mano (sintaxis PDF, fuente Helvetica con
+WinAnsiEncoding), sin dependencias. Cada tipo imita la estructura de los
+documentos reales que procesa su script:
+
+  issn   -> certificado ISSN (rótulos y, al final del flujo, los valores,
+            como los entrega PyPDF2 en los certificados reales)
+  dnda   -> certificado de registro DNDA con 1 a 4 autores
+  cesion -> contrato de cesión de derechos patrimoniales
+  libro  -> libro de 30 a 120 páginas con la ficha catalográfica en las primeras
+
+Con la misma semilla genera exactamente los mismos bytes, así que las salidas
+esperadas (golden) de los documentos sintéticos son estables.
+
+Uso:
+  python corpus_sintetico.py --out corpus --n 20 --semilla 0
+"""
+
+import argparse
+import random
+import textwrap
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+Linea = Tuple[float, float, str]  # (x, y, texto)
+Pagina = List[Linea]
+
+NOMBRES = ["JUAN", "ANA", "CARLOS", "MARÍA", "LUISA", "ANDRÉS", "CAMILO", "SOFÍA", "JULIÁN", "VALENTINA",
+           "DIEGO", "PAULA", "SERGIO", "NATALIA", "JORGE", "ÁNGELA"]
+APELLIDOS = ["PÉREZ", "GÓMEZ", "RODRÍGUEZ", "MARTÍNEZ", "LÓPEZ", "GARCÍA", "HERNÁNDEZ", "DÍAZ", "TORRES",
+             "RAMÍREZ", "VARGAS", "CASTRO", "MUÑOZ", "ROJAS", "ORTIZ", "SUÁREZ"]
+CIUDADES = ["Bogotá", "Medellín", "Cali", "Barranquilla", "Bucaramanga", "Tunja", "Pereira", "Neiva"]
+TEMAS = ["educación", "pedagogía", "investigación", "innovación social", "agroecología", "psicología",
+         "ingeniería", "comunicación", "desarrollo sostenible", "teología", "salud pública", "territorio"]
+PALABRAS = ("el la de en y los para con una por que se del como su las más sobre entre desde proceso "
+            "comunidad estudio análisis resultados práctica formación docentes estudiantes región "
+            "política social cultural experiencia propuesta modelo campo datos enfoque").split()
+MESES = ["enero", "febrero", "marzo", "abril", "mayo", "junio", "julio", "agosto", "septiembre",
+         "octubre", "noviembre", "diciembre"]
+PERIODICIDADES = ["Anual", "Semestral", "Trimestral", "Mensual", "Irregular", "Otro"]
+SOPORTES = ["Recursos electrónicos en línea", "Impreso", "En línea"]
+EDITOR = "CORPORACIÓN UNIVERSITARIA MINUTO DE DIOS-UNIMINUTO"
+
+ANCHO_PAGINA, ALTO_PAGINA = 612, 792
+INTERLINEADO = 14
+
+
+# -------------------- Escritura del PDF --------------------
+
+def _cadena(texto: str) -> bytes:
+    b = texto.encode("cp1252", errors="replace")
+    return b"(" + b.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _contenido(pagina: Pagina) -> bytes:
+    partes = [b"BT /F1 10 Tf"]
+    for x, y, texto in pagina:
+        partes.append(b"1 0 0 1 %.1f %.1f Tm %s Tj" % (x, y, _cadena(texto)))
+    partes.append(b"ET")
+    return b"\n".join(partes)
+
+
+def escribir_pdf(ruta: Path, paginas: List[Pagina]) -> None:
+    """PDF 1.4 con una fuente Type1 estándar y un flujo de contenido por página."""
+    objetos: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # Pages, se completa al final
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    hijos = []
+    for pagina in paginas:
+        flujo = _contenido(pagina)
+        objetos.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(flujo), flujo))
+        objetos.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 3 0 R >> >> "
+                       b"/Contents %d 0 R >>" % (ANCHO_PAGINA, ALTO_PAGINA, len(objetos)))
+        hijos.append(b"%d 0 R" % len(objetos))
+    objetos[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(hijos), len(hijos))
+
+    salida = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    posiciones = []
+    for n, obj in enumerate(objetos, start=1):
+        posiciones.append(len(salida))
+        salida += b"%d 0 obj\n%s\nendobj\n" % (n, obj)
+    xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for pos in posiciones:
+        salida += b"%010d 00000 n \n" % pos
+    salida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, xref)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    ruta.write_bytes(bytes(salida))
+
+
+def columna(lineas: List[str], x: float = 56, y: float = 750) -> Pagina:
+    return [(x, y - i * INTERLINEADO, ln) for i, ln in enumerate(lineas)]
+
+
+def paginar(lineas: List[str], por_pagina: int = 48) -> List[Pagina]:
+    return [columna(lineas[i:i + por_pagina]) for i in range(0, len(lineas), por_pagina)] or [[]]
+
+
+def envolver(texto: str, ancho: int = 95) -> List[str]:
+    return textwrap.wrap(texto, ancho)
+
+
+# -------------------- Contenido aleatorio --------------------
+
+def persona(rng: random.Random) -> str:
+    return f"{rng.choice(NOMBRES)} {rng.choice(NOMBRES)} {rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+
+
+def frase(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choice(PALABRAS) for _ in range(n))
+
+
+def parrafos(rng: random.Random, n_lineas: int) -> List[str]:
+    lineas: List[str] = []
+    while len(lineas) < n_lineas:
+        lineas += envolver(frase(rng, rng.randint(40, 90)).capitalize() + ".") + [""]
+    return lineas[:n_lineas]
+
+
+def titulo(rng: random.Random) -> str:
+    return f"{rng.choice(['Revista', 'Memorias', 'Cuadernos', 'Boletín'])} de {rng.choice(TEMAS)}".capitalize()
+
+
+def issn_con_verificacion(rng: random.Random) -> str:
+    d = [rng.randint(0, 9) for _ in range(7)]
+    resto = (11 - sum(x * (8 - i) for i, x in enumerate(d)) % 11) % 11
+    control = "X" if resto == 10 else str(resto)
+    s = "".join(map(str, d)) + control
+    return f"{s[:4]}-{s[4:]}"
+
+
+def isbn13(rng: random.Random) -> str:
+    d = [9, 7, 8, 9, 5, 8] + [rng.randint(0, 9) for _ in range(6)]
+    control = (10 - sum(x * (3 if i % 2 else 1) for i, x in enumerate(d)) % 10) % 10
+    s = "".join(map(str, d)) + str(control)
+    return f"{s[:3]}-{s[3:6]}-{s[6:9]}-{s[9:12]}-{s[12]}"
+
+
+# -------------------- Tipos de documento --------------------
+
+def certificado_issn(rng: random.Random) -> List[Pagina]:
+    rotulos = ["CERTIFICADO ISSN  Página 1 de 1", "EL CENTRO NACIONAL DE ISSN",
+               "BIBLIOTECA NACIONAL DE COLOMBIA", "CERTIFICA:",
+               "Que una vez consultado en nuestras bases de datos, encontramos que la",
+               "publicación seriada cuyos datos son:", "ISSN asignado:", "Título:", "Título abreviado:",
+               "Editor:", "Periodicidad:", "Soporte:", "Fecha de asignación:",
+               "Se encuentra registrada en el Centro Nacional de ISSN - Biblioteca Nacional de Colombia.",
+               "La presente certificación se expide en Bogotá, a los ____ de ___________ de ____, a",
+               "solicitud del interesado."]
+    t = titulo(rng)
+    valores = [str(rng.randint(1, 28)), rng.choice(MESES).capitalize(), issn_con_verificacion(rng), t,
+               f"{t.split()[0][:3]}. {t.split()[-1][:4]}.", EDITOR, rng.choice(PERIODICIDADES),
+               rng.choice(SOPORTES), f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2005, 2024)} 12:00",
+               str(rng.randint(2020, 2025))]
+    pagina = columna(rotulos)
+    # los valores se dibujan después de los rótulos (así quedan en el flujo de los certificados reales)
+    pagina += [(250, 650 - i * INTERLINEADO, v) for i, v in enumerate(valores)]
+    return [pagina]
+
+
+def certificado_dnda(rng: random.Random) -> List[Pagina]:
+    lineas = ["REPÚBLICA DE COLOMBIA", "MINISTERIO DEL INTERIOR", "DIRECCIÓN NACIONAL DE DERECHO DE AUTOR",
+              "CERTIFICADO DE REGISTRO DE OBRA LITERARIA", f"Libro - Tomo - Partida 10-{rng.randint(100, 999)}-{rng.randint(10, 99)}",
+              "Título Original", f"{frase(rng, 4).capitalize()} en {rng.choice(TEMAS)}",
+              "Año de Creación", str(rng.randint(2010, 2024)), "AMBITO", "Nacional", ""]
+    for _ in range(rng.randint(1, 4)):
+        lineas += ["AUTOR", "Nombres y Apellidos", persona(rng), "No de identificación",
+                   f"C.C. {rng.randint(10_000_000, 1_099_999_999)}", "Nacional de", "Colombia",
+                   "Ciudad", rng.choice(CIUDADES), ""]
+    lineas += envolver("La Dirección Nacional de Derecho de Autor certifica que la obra descrita fue "
+                       "inscrita en el Registro Nacional de Derecho de Autor. " + frase(rng, 60))
+    return paginar(lineas, por_pagina=30)
+
+
+def contrato_cesion(rng: random.Random) -> List[Pagina]:
+    autor = persona(rng)
+    capitulo, libro_ = frase(rng, 6).capitalize(), f"{frase(rng, 3).capitalize()} de {rng.choice(TEMAS)}"
+    texto = (
+        "Entre los suscritos a saber, la CORPORACIÓN UNIVERSITARIA MINUTO DE DIOS – UNIMINUTO, Institución "
+        "Universitaria de Educación Superior, privada, de utilidad común, sin ánimo de lucro, quien para los "
+        "efectos del presente documento se denominará UNIMINUTO por una parte, y por la otra, "
+        f"{autor}, mayor de edad, identificado con cédula de ciudadanía No. "
+        f"{rng.randint(10, 99)}.{rng.randint(100, 999)}.{rng.randint(100, 999)} de Bogotá D.C., quien en "
+        "adelante se denominará EL AUTOR. " + frase(rng, 80) + ". PRIMERA. OBJETO: EL AUTOR cede a favor de "
+        f"UNIMINUTO los derechos patrimoniales del capítulo denominado “{capitulo}” del libro “{libro_}”. "
+        + frase(rng, 120) + ". VIGENCIA: El presente contrato de cesión se extenderá por el máximo término "
+        "legal hasta que la obra pase al dominio público. " + frase(rng, 60) +
+        f". Para constancia se firma el {rng.randint(1, 28)}/{rng.choice(MESES).capitalize()}/{rng.randint(2019, 2024)}."
+    )
+    lineas = ["CONTRATO DE CESIÓN DE DERECHOS PATRIMONIALES DE AUTOR EXTERNO", ""] + envolver(texto)
+    return paginar(lineas)
+
+
+def libro(rng: random.Random) -> List[Pagina]:
+    total = rng.randint(30, 120)
+    ficha = rng.randint(1, 4)
+    titulo_libro = f"{frase(rng, 3).capitalize()} en {rng.choice(TEMAS)}"
+    autor = persona(rng).title()
+    claves = rng.sample(TEMAS, 3)
+    paginas: List[Pagina] = []
+    for n in range(total):
+        if n == 0:
+            paginas.append(columna([titulo_libro.upper(), "", autor], y=500))
+        elif n == ficha:
+            paginas.append(columna([
+                "Catalogación en la publicación - Biblioteca Nacional de Colombia", "",
+                f"{autor}", f"{titulo_libro} / {autor}. -- Bogotá : UNIMINUTO, {rng.randint(2015, 2024)}.",
+                f"{rng.randint(90, 300)} páginas.", f"ISBN: {isbn13(rng)}", f"e-ISBN: {isbn13(rng)}",
+                "Palabras clave: " + " ".join(f"{i}. {c}" for i, c in enumerate(claves, start=1)),
+                f"I. Título  II. {autor}", f"CDD {rng.randint(100, 999)}", "",
+                f"Este libro es resultado de la investigación “{frase(rng, 5).capitalize()}”, "
+                f"código: PRY-{rng.randint(1000, 9999)},",
+                f"financiado por {rng.choice(['Minciencias', 'UNIMINUTO', 'la Gobernación'])}. "
+                f"Grupo de investigación {rng.choice(TEMAS).capitalize()}.",
+            ]))
+        else:
+            paginas.append(columna(parrafos(rng, 46)))
+    return paginas
+
+
+TIPOS = {
+    "issn": certificado_issn,
+    "dnda": certificado_dnda,
+    "cesion": contrato_cesion,
+    "libro": libro,
+}
+
+
+def generar(destino, n: int = 10, semilla: int = 0, tipos=None) -> Dict[str, List[Path]]:
+    """Escribe `n` documentos de cada tipo en destino/<tipo>/ y devuelve sus rutas."""
+    destino = Path(destino)
+    rutas: Dict[str, List[Path]] = {}
+    for tipo in tipos or TIPOS:
+        rng = random.Random(f"{semilla}-{tipo}")
+        rutas[tipo] = []
+        for i in range(n):
+            ruta = destino / tipo / f"{tipo}_{i:03d}.pdf"
+            escribir_pdf(ruta, TIPOS[tipo](rng))
+            rutas[tipo].append(ruta)
+    return rutas
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out", default="corpus_sintetico", help="Carpeta de salida")
+    ap.add_argument("--n", type=int, default=10, help="Documentos por tipo")
+    ap.add_argument("--semilla", type=int, default=0)
+    args = ap.parse_args()
+    rutas = generar(args.out, args.n, args.semilla)
+    for tipo, lista in rutas.items():
+        print(f"✅ {tipo}: {len(lista)} PDF(s) en {Path(args.out) / tipo}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark del parser de certificados ISSN.
+
+Compara el parser de una pasada (seriadas.parse_lines) con el parser anterior
+(cadena de scan_forward que reiniciaba desde lines.index(valor)) sobre los
+mismos PDFs: el texto se extrae una sola vez y solo se mide el parseo.
+
+Uso:
+  python bench_parser.py                       # usa la carpeta PDF's/ junto al script
+  python bench_parser.py --dir "C:/ruta" --repeat 200 --detalle
+"""
+
+import os, argparse, time
+from typing import List, Dict, Callable, Optional
+
+from seriadas import (
+    iter_pdfs, extract_lines, parse_lines, parse_certificate_date, issn_checksum_ok, is_issn,
+    is_titulo, is_titulo_abreviado, is_editor, is_periodicidad, is_soporte, is_fecha_asignacion, LABELS,
+)
+from comun.cache_texto import CacheTexto
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "PDF's")
+
+CAMPOS = ["ISSN asignado", "issn_valido", "Título", "Título abreviado", "Editor",
+          "Periodicidad", "Soporte", "Fecha de asignación", "Fecha del certificado"]
+
+# -------------------- Parser anterior (referencia) --------------------
+
+def next_nonempty(lines: List[str], k: int) -> Optional[int]:
+    n = len(lines)
+    k += 1
+    while k < n and lines[k].strip() == "":
+        k += 1
+    return k if k < n else None
+
+def scan_forward(lines: List[str], start_idx: int, validator: Callable[[str], bool], max_lookahead: int = 8) -> Optional[str]:
+    idx = start_idx
+    steps = 0
+    while steps < max_lookahead:
+        idx = next_nonempty(lines, idx)
+        if idx is None:
+            return None
+        cand = lines[idx].strip()
+        if cand.lower() in LABELS:
+            steps += 1
+            continue
+        if cand.startswith("http") or "mailto:" in cand:
+            steps += 1
+            continue
+        if validator(cand):
+            return cand
+        steps += 1
+    return None
+
+def parse_lines_legacy(lines: List[str]) -> Dict[str, str]:
+    issn_idx = None
+    issn_val = None
+    for i, ln in enumerate(lines):
+        if is_issn(ln):
+            issn_idx = i
+            issn_val = ln.strip()
+    data: Dict[str, str] = {}
+    if issn_val:
+        data["ISSN asignado"] = issn_val
+        data["issn_valido"] = issn_checksum_ok(issn_val)
+    else:
+        data["issn_valido"] = False
+    start = issn_idx if issn_idx is not None else -1
+
+    titulo = scan_forward(lines, start, is_titulo, max_lookahead=10)
+    if titulo: data["Título"] = titulo
+    tit_ab = scan_forward(lines, start if titulo is None else lines.index(titulo), is_titulo_abreviado, max_lookahead=10)
+    if tit_ab: data["Título abreviado"] = tit_ab
+    editor = scan_forward(lines, start if tit_ab is None else lines.index(tit_ab), is_editor, max_lookahead=12)
+    if editor: data["Editor"] = editor
+    per = scan_forward(lines, start if editor is None else lines.index(editor), is_periodicidad, max_lookahead=12)
+    if per: data["Periodicidad"] = per
+    sop = scan_forward(lines, start if per is None else lines.index(per), is_soporte, max_lookahead=12)
+    if sop: data["Soporte"] = sop
+    f_asig = scan_forward(lines, start if sop is None else lines.index(sop), is_fecha_asignacion, max_lookahead=15)
+    if f_asig: data["Fecha de asignación"] = f_asig
+
+    data["Fecha del certificado"] = parse_certificate_date(lines)
+    return data
+
+# -------------------- Medición --------------------
+
+def medir(parser: Callable[[List[str]], Dict[str, str]], docs: List[List[str]], repeat: int) -> float:
+    """Mejor tiempo (s) de `repeat` corridas sobre todo el corpus."""
+    mejor = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for lines in docs:
+            parser(lines)
+        mejor = min(mejor, time.perf_counter() - t0)
+    return mejor
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default=DEFAULT_DIR, help="Carpeta con certificados ISSN en PDF")
+    ap.add_argument("--repeat", type=int, default=50, help="Repeticiones por parser (se toma la mejor)")
+    ap.add_argument("--detalle", action="store_true", help="Muestra cada campo en que difieren")
+    CacheTexto.agregar_argumentos(ap)
+    args = ap.parse_args()
+    cache = CacheTexto.desde_args(args)
+
+    pdfs = list(iter_pdfs(args.dir))
+    if not pdfs:
+        raise SystemExit(f"❌ No se encontraron PDFs en {args.dir}")
+    print(f"Extrayendo texto de {len(pdfs)} PDF(s)...")
+    docs = [extract_lines(p, cache) for p in pdfs]
+    n_lineas = sum(len(d) for d in docs)
+
+    t_old = medir(parse_lines_legacy, docs, args.repeat)
+    t_new = medir(parse_lines, docs, args.repeat)
+    print(f"\nCorpus: {len(docs)} documentos, {n_lineas} líneas")
+    print(f"  anterior (scan_forward): {t_old / len(docs) * 1e6:9.1f} µs/doc")
+    print(f"  una pasada (parse_lines): {t_new / len(docs) * 1e6:8.1f} µs/doc")
+    print(f"  aceleración: x{t_old / t_new:.2f}" if t_new else "")
+
+    # Concordancia de campos
+    iguales = {c: 0 for c in CAMPOS}
+    diferencias = []
+    for path, lines in zip(pdfs, docs):
+        old, new = parse_lines_legacy(lines), parse_lines(lines)
+        for c in CAMPOS:
+            if old.get(c) == new.get(c):
+                iguales[c] += 1
+            else:
+                diferencias.append((os.path.basename(path), c, old.get(c), new.get(c)))
+    print("\nConcordancia por campo:")
+    for c in CAMPOS:
+        print(f"  {c:<24} {iguales[c]:>4}/{len(docs)}")
+    if args.detalle and diferencias:
+        print("\nDiferencias (archivo | campo | anterior → nuevo):")
+        for archivo, c, old, new in diferencias:
+            print(f"  {archivo} | {c} | {old!r} → {new!r}")
+
+if __name__ == "__main__":
+    main()
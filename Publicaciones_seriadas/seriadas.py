@@ -8,18 +8,27 @@ Evita corrimientos validando cada campo por tipo antes de asignarlo.
 - No confía en posiciones fijas: valida formato de cada campo.
 - Exporta a Excel (.xlsx) y opcionalmente JSON.
 - Valida checksum del ISSN (issn_valido).
+- Registra la línea de la que salió cada campo (columna "lineas").
 
 Uso:
   python seriadas.py                      # usa DEFAULT_DIR
   python seriadas.py --dir "C:/ruta"      # usa la carpeta indicada
   python seriadas.py --dir "C:/ruta" --out "salida.xlsx" --json
+  python seriadas.py --dir "C:/ruta" --workers 8   # en paralelo (0 = todos los núcleos)
+  python seriadas.py --dir "C:/ruta" --no-cache    # ignora la caché de texto extraído
+  python seriadas.py --dir "C:/ruta" --incremental # solo PDFs nuevos o modificados
 """
 
-import os, re, argparse
-from typing import List, Dict, Iterable, Callable, Optional
+import os, re, sys, json, argparse
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Iterable, Tuple
 from PyPDF2 import PdfReader
 import pandas as pd
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.cache_texto import CacheTexto, SIN_CACHE
+from comun.manifiesto import Manifiesto, combinar, leer_tabla
+
 # 📂 Carpeta por defecto (ajusta a tu ruta)
 DEFAULT_DIR = r"C:\Users\andres.guerra.d\Downloads\scripts\Publicaciones_seriadas\PDF's"
 
@@ -30,8 +39,10 @@ PERIODICIDAD = {
     "bienal","otro","desconocido"
 }
 
+ISSN_RE = re.compile(r"\d{4}-\d{3}[\dX]|\d{4}-\d{4}")
+
 def is_issn(s: str) -> bool:
-    return bool(re.fullmatch(r"\d{4}-\d{3}[\dX]|\d{4}-\d{4}", s.strip()))
+    return bool(ISSN_RE.fullmatch(s.strip()))
 
 def issn_checksum_ok(issn: str) -> bool:
     s = issn.upper().replace("-", "").replace(" ", "")
@@ -84,143 +95,178 @@ def is_titulo(s: str) -> bool:
 
 # -------------------- Lectura y helpers --------------------
 
-def extract_lines(path: str) -> List[str]:
-    r = PdfReader(path)
+def extract_pages(path) -> List[str]:
+    r = PdfReader(path)  # ruta o archivo ya abierto (BytesIO)
+    return [page.extract_text() or "" for page in r.pages]
+
+def extract_lines(path: str, cache: CacheTexto = SIN_CACHE, source=None) -> List[str]:
+    # source: el PDF ya leído (p. ej. BytesIO) para no abrirlo otra vez; path sigue siendo la clave de la caché
     lines=[]
-    for page in r.pages:
-        t = page.extract_text() or ""
+    for t in cache.paginas(path, "PyPDF2", {}, lambda p: extract_pages(p if source is None else source)):
         for ln in t.replace("\r","\n").split("\n"):
             lines.append(ln.strip())
     return [ln for ln in lines]  # preserva vacías (para navegación), pero ya strip
 
 def iter_pdfs(directory: str) -> Iterable[str]:
-    for root, _, files in os.walk(directory):
-        for fn in files:
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()  # orden estable entre corridas y sistemas de archivos
+        for fn in sorted(files):
             if fn.lower().endswith(".pdf"):
                 yield os.path.join(root, fn)
 
-def next_nonempty(lines: List[str], k: int) -> Optional[int]:
-    n = len(lines)
-    k += 1
-    while k < n and lines[k].strip() == "":
-        k += 1
-    return k if k < n else None
-
 # -------------------- Parser tolerante --------------------
 
-def scan_forward(lines: List[str], start_idx: int, validator: Callable[[str], bool], max_lookahead: int = 8) -> Optional[str]:
+# Rótulos del cuerpo del certificado que nunca son valores
+LABELS = {
+    "certifica:", "publicación seriada cuyos datos son:", "issn asignado:", "título:", "título abreviado:",
+    "editor:", "periodicidad:", "soporte:", "fecha de asignación:",
+}
+
+# Campos en el orden en que aparecen después del ISSN: (campo, validador, máx. líneas a revisar)
+FIELDS = [
+    ("Título", is_titulo, 10),
+    ("Título abreviado", is_titulo_abreviado, 10),
+    ("Editor", is_editor, 12),
+    ("Periodicidad", is_periodicidad, 12),
+    ("Soporte", is_soporte, 12),
+    ("Fecha de asignación", is_fecha_asignacion, 15),
+]
+
+def is_label(s: str) -> bool:
+    return s.lower() in LABELS or s.startswith("http") or "mailto:" in s
+
+def parse_fields(lines: List[str]) -> Tuple[Dict[str, str], Dict[str, int]]:
     """
-    Busca hacia adelante hasta max_lookahead líneas no vacías que cumplan el validador.
-    Si no encuentra, devuelve None (no desplaza otros campos).
+    Asigna los campos en una pasada hacia adelante desde el ISSN.
+    Cada campo revisa como mucho su `max_lookahead` de líneas no vacías a partir del
+    último campo encontrado; si no aparece, queda vacío y el siguiente campo arranca
+    desde ese mismo punto, sin desplazar a los demás.
+    Espera las líneas ya con strip, como las entrega extract_lines.
+    Devuelve los valores y la línea (desde 0) de la que salió cada uno.
     """
-    idx = start_idx
-    steps = 0
-    while steps < max_lookahead:
-        idx = next_nonempty(lines, idx)
-        if idx is None:
-            return None
-        cand = lines[idx].strip()
-        # cortar si encontramos otro rótulo común del cuerpo que no son valores
-        if cand.lower() in {"certifica:", "publicación seriada cuyos datos son:", "issn asignado:", "título:", "título abreviado:", "editor:", "periodicidad:", "soporte:", "fecha de asignación:"}:
-            steps += 1
-            continue
-        if cand.startswith("http") or "mailto:" in cand:
+    data: Dict[str, str] = {}
+    pos: Dict[str, int] = {}
+    n = len(lines)
+
+    # 1) ISSN: se conserva el último de la lista, como siempre
+    issn_match = ISSN_RE.fullmatch
+    start = 0
+    for i in range(n - 1, -1, -1):
+        if lines[i] and issn_match(lines[i]):
+            data["ISSN asignado"] = lines[i]
+            data["issn_valido"] = issn_checksum_ok(lines[i])
+            pos["ISSN asignado"] = i
+            start = i + 1
+            break
+    else:
+        data["issn_valido"] = False  # seguirá vacío si no hay ISSN
+
+    # 2) Campos en orden, cada uno con su validador; si uno no aparece, el siguiente
+    #    arranca desde el mismo ancla
+    for name, validator, max_lookahead in FIELDS:
+        i, steps = start, 0
+        while i < n and steps < max_lookahead:
+            cand = lines[i]
+            i += 1
+            if not cand:
+                continue
             steps += 1
-            continue
-        if validator(cand):
-            return cand
-        steps += 1
-    return None
+            if validator(cand) and not is_label(cand):
+                data[name] = cand
+                pos[name] = i - 1
+                start = i
+                break
+    return data, pos
+
+MONTHS = {
+    "enero":"01","febrero":"02","marzo":"03","abril":"04","mayo":"05","junio":"06",
+    "julio":"07","agosto":"08","septiembre":"09","setiembre":"09","octubre":"10",
+    "noviembre":"11","diciembre":"12",
+}
+CERT_DATE_RE = re.compile(r"a los\s+(\d{1,2})\s+de\s+([A-Za-zÁÉÍÓÚáéíóúñÑ]+)\s+de\s+(\d{4})", re.IGNORECASE)
+DAY_MONTH_RE = re.compile(r"\b(\d{1,2})\s+([A-Za-zÁÉÍÓÚáéíóúñÑ]+)\b")
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
 
 def parse_certificate_date(lines: List[str]) -> str:
     # Busca "a los DD de MES de YYYY"
     joined = " ".join([ln for ln in lines if ln]).strip()
-    m = re.search(r"a los\s+(\d{1,2})\s+de\s+([A-Za-zÁÉÍÓÚáéíóúñÑ]+)\s+de\s+(\d{4})", joined, flags=re.IGNORECASE)
-    MONTHS = {
-        "enero":"01","febrero":"02","marzo":"03","abril":"04","mayo":"05","junio":"06",
-        "julio":"07","agosto":"08","septiembre":"09","setiembre":"09","octubre":"10",
-        "noviembre":"11","diciembre":"12",
-        "Enero":"01","Febrero":"02","Marzo":"03","Abril":"04","Mayo":"05","Junio":"06",
-        "Julio":"07","Agosto":"08","Septiembre":"09","Setiembre":"09","Octubre":"10",
-        "Noviembre":"11","Diciembre":"12"
-    }
+    m = CERT_DATE_RE.search(joined)
     if m:
         d, mon, y = m.groups()
-        mn = MONTHS.get(mon, MONTHS.get(mon.lower(), ""))
+        mn = MONTHS.get(mon.lower(), "")
         if mn:
             return f"{y}-{mn}-{int(d):02d}"
     # Fallback: “DD Mes” + “YYYY” en otro lado (toma los últimos)
     dm = None
     for ln in lines:
-        m2 = re.search(r"\b(\d{1,2})\s+([A-Za-zÁÉÍÓÚáéíóúñÑ]+)\b", ln)
+        m2 = DAY_MONTH_RE.search(ln)
         if m2:
             d, mon = m2.groups()
-            mn = MONTHS.get(mon, MONTHS.get(mon.lower(), ""))
+            mn = MONTHS.get(mon.lower(), "")
             if mn:
                 dm = (int(d), mn)
+    if not dm:
+        return ""
     y = None
     for ln in reversed(lines):
-        m3 = re.search(r"\b(19|20)\d{2}\b", ln)
+        m3 = YEAR_RE.search(ln)
         if m3:
             y = m3.group(0); break
-    if dm and y:
+    if y:
         return f"{y}-{dm[1]}-{dm[0]:02d}"
     return ""
 
-def extract_from_pdf(path: str) -> Dict[str, str]:
+def parse_lines(lines: List[str]) -> Dict[str, str]:
+    data, pos = parse_fields(lines)
+    # Fecha del certificado (independiente)
+    data["Fecha del certificado"] = parse_certificate_date(lines)
+    # Línea (desde 1) de la que salió cada campo, para revisar asignaciones dudosas
+    data["lineas"] = json.dumps({k: v + 1 for k, v in pos.items()}, ensure_ascii=False)
+    return data
+
+def extract_from_pdf(path: str, cache: CacheTexto = SIN_CACHE) -> Dict[str, str]:
     try:
-        lines = extract_lines(path)
-
-        # 1) ISSN (en cualquier parte)
-        issn_idx = None
-        issn_val = None
-        for i, ln in enumerate(lines):
-            if is_issn(ln):
-                issn_idx = i
-                issn_val = ln.strip()
-        data: Dict[str, str] = {}
-        if issn_val:
-            data["ISSN asignado"] = issn_val
-            data["issn_valido"] = issn_checksum_ok(issn_val)
-        else:
-            data["issn_valido"] = False  # seguirá vacío si no hay ISSN
-
-        # 2) Desde ISSN (si existe) buscar cada campo con su validador individual
-        start = issn_idx if issn_idx is not None else -1
-
-        # Título
-        titulo = scan_forward(lines, start, is_titulo, max_lookahead=10)
-        if titulo: data["Título"] = titulo
-
-        # Título abreviado
-        tit_ab = scan_forward(lines, start if titulo is None else lines.index(titulo), is_titulo_abreviado, max_lookahead=10)
-        if tit_ab: data["Título abreviado"] = tit_ab
-
-        # Editor
-        editor = scan_forward(lines, start if tit_ab is None else lines.index(tit_ab), is_editor, max_lookahead=12)
-        if editor: data["Editor"] = editor
-
-        # Periodicidad
-        per = scan_forward(lines, start if editor is None else lines.index(editor), is_periodicidad, max_lookahead=12)
-        if per: data["Periodicidad"] = per
-
-        # Soporte
-        sop = scan_forward(lines, start if per is None else lines.index(per), is_soporte, max_lookahead=12)
-        if sop: data["Soporte"] = sop
-
-        # Fecha de asignación
-        f_asig = scan_forward(lines, start if sop is None else lines.index(sop), is_fecha_asignacion, max_lookahead=15)
-        if f_asig: data["Fecha de asignación"] = f_asig
-
-        # 3) Fecha del certificado (independiente)
-        data["Fecha del certificado"] = parse_certificate_date(lines)
-
-        # 4) Contexto
+        data = parse_lines(extract_lines(path, cache))
         data["archivo"] = os.path.basename(path)
         return data
     except Exception as e:
         return {"archivo": os.path.basename(path), "error": str(e)}
 
+# -------------------- Procesamiento por lotes --------------------
+
+def _extract_in_worker(path: str, cache: CacheTexto) -> Dict[str, str]:
+    # cada tarea recibe su propia copia de la caché; los procesos del pool no
+    # corren atexit, así que se cierra aquí para guardar las horas de uso
+    try:
+        return extract_from_pdf(path, cache)
+    finally:
+        cache.cerrar()
+
+def extract_all(pdfs: List[str], workers: int = 1, cache: CacheTexto = SIN_CACHE) -> List[Dict[str, str]]:
+    """
+    Aplica extract_from_pdf a cada PDF. Con workers > 1 reparte el trabajo en un
+    pool de procesos (PyPDF2 es CPU puro, los hilos no escalan por el GIL).
+    El resultado conserva el orden de `pdfs`.
+    """
+    if workers <= 1 or len(pdfs) <= 1:
+        return [extract_from_pdf(p, cache) for p in pdfs]
+    rows: List[Dict[str, str]] = []
+    with ProcessPoolExecutor(max_workers=min(workers, len(pdfs))) as ex:
+        futures = [ex.submit(_extract_in_worker, p, cache) for p in pdfs]
+        for p, fut in zip(pdfs, futures):
+            try:
+                rows.append(fut.result())
+            except Exception as e:  # p. ej. un proceso hijo que murió (BrokenProcessPool)
+                rows.append({"archivo": os.path.basename(p), "error": str(e) or type(e).__name__})
+    return rows
+
+COLUMNS = ["archivo","ISSN asignado","issn_valido","Título","Título abreviado","Editor",
+           "Periodicidad","Soporte","Fecha de asignación","Fecha del certificado","lineas","error"]
+
+def order_columns(df: pd.DataFrame) -> pd.DataFrame:
+    cols = [c for c in COLUMNS if c in df.columns] + [c for c in df.columns if c not in COLUMNS]
+    return df[cols]
+
 # -------------------- CLI --------------------
 
 def main():
@@ -228,7 +274,12 @@ def main():
     ap.add_argument("--dir", help="Carpeta con PDFs (recursivo). Si se omite, usa DEFAULT_DIR.")
     ap.add_argument("--out", default="issn_certificados.xlsx", help="Ruta de salida Excel (.xlsx)")
     ap.add_argument("--json", action="store_true", help="Además del Excel, exporta JSON")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="Procesos en paralelo (1 = secuencial, 0 = todos los núcleos)")
+    CacheTexto.agregar_argumentos(ap)
+    Manifiesto.agregar_argumentos(ap)
     args = ap.parse_args()
+    cache = CacheTexto.desde_args(args)
 
     target_dir = args.dir or DEFAULT_DIR
     if not os.path.isdir(target_dir):
@@ -238,15 +289,26 @@ def main():
     if not pdfs:
         raise SystemExit(f"❌ No se encontraron PDFs en {target_dir}")
 
-    print(f"Procesando {len(pdfs)} PDF(s) desde {target_dir}...\n")
-    rows = [extract_from_pdf(p) for p in pdfs]
+    manifiesto = Manifiesto.desde_args(args, args.out, target_dir)
+    cambios = manifiesto.clasificar(pdfs)
+    print(cambios.resumen())
+
+    workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+    print(f"Procesando {len(cambios.pendientes)} PDF(s) desde {target_dir} con {workers} proceso(s)...\n")
+    rows = extract_all(cambios.pendientes, workers, cache)
+    if workers <= 1:  # con procesos hijos los contadores quedan en cada hijo
+        print(cache.resumen())
+    for p, row in zip(cambios.pendientes, rows):
+        row["archivo"] = manifiesto.clave(p)  # ruta relativa: la carpeta es recursiva
+        if "error" not in row:
+            manifiesto.registrar(p)
 
     df = pd.DataFrame(rows)
-    ordered = ["archivo","ISSN asignado","issn_valido","Título","Título abreviado","Editor",
-               "Periodicidad","Soporte","Fecha de asignación","Fecha del certificado","error"]
-    cols = [c for c in ordered if c in df.columns] + [c for c in df.columns if c not in ordered]
-    df = df[cols]
+    if manifiesto.incremental:
+        df = combinar(leer_tabla(args.out), df, "archivo", cambios.conservar, cambios.orden)
+    df = order_columns(df)
     df.to_excel(args.out, index=False)
+    manifiesto.guardar()
     print(f"\n✅ Excel guardado en: {args.out}")
 
     if args.json:
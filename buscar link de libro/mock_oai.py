@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Endpoint OAI-PMH simulado para probar search.py (comun/oai.py) sin cosechar
+el repositorio real.
+
+  GET ?verb=Identify                                   -> granularity YYYY-MM-DDThh:mm:ssZ
+  GET ?verb=ListRecords&metadataPrefix=oai_dc[&from=]  -> registros oai_dc por páginas
+  GET ?verb=ListRecords&resumptionToken=<token>        -> página siguiente
+
+Los títulos salen de links.xlsx (--excel), con variaciones de mayúsculas,
+tildes y subtítulo como en el repositorio, más --relleno registros inventados
+para que el índice tenga un tamaño realista. Un 2 % de los registros aparece
+como borrado (status="deleted"). --cambios N hace que N registros tengan
+datestamp de "ahora" para probar la cosecha incremental con from=. --saturado
+responde 503 + Retry-After a una de cada N peticiones.
+
+Uso:
+  python mock_oai.py --puerto 8780 --relleno 20000
+  python search.py --oai http://127.0.0.1:8780/server/oai/request --bd /tmp/oai.sqlite
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+POR_PAGINA = 100
+PALABRAS = ("gestión educación territorio memoria conflicto paz comunidad innovación social desarrollo "
+            "aprendizaje pedagogía ambiental sostenible salud mental familia derechos humanos economía "
+            "solidaria investigación acción participativa jóvenes rural urbano cultura ciudadanía").split()
+FORMATO = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def registros_simulados(titulos, relleno, cambios):
+    """[(identificador, datestamp, titulo, handle, borrado)] deterministas."""
+    rng = random.Random(7)
+    base = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    todos = []
+    for titulo in titulos:
+        # el repositorio a veces cambia mayúsculas o junta el subtítulo con ":"
+        if rng.random() < 0.3:
+            titulo = titulo.upper() if rng.random() < 0.5 else titulo.lower()
+        todos.append(titulo)
+    for _ in range(relleno):
+        todos.append(" ".join(rng.choice(PALABRAS) for _ in range(rng.randint(3, 10))).capitalize())
+    rng.shuffle(todos)
+
+    salida = []
+    ahora = datetime.now(timezone.utc)
+    for n, titulo in enumerate(todos, 1):
+        fecha = base + timedelta(minutes=rng.randint(0, 2_000_000))
+        salida.append([f"oai:repository.uniminuto.edu:10656/{n}", fecha, titulo, f"10656/{n}",
+                       rng.random() < 0.02])
+    for registro in rng.sample(salida, min(cambios, len(salida))):
+        registro[1] = ahora
+    salida.sort(key=lambda r: r[1])
+    return [(i, f.strftime(FORMATO), t, h, b) for i, f, t, h, b in salida]
+
+
+def xml_registro(identificador, datestamp, titulo, handle, borrado):
+    if borrado:
+        return (f'<record><header status="deleted"><identifier>{identificador}</identifier>'
+                f'<datestamp>{datestamp}</datestamp></header></record>')
+    return (
+        f"<record><header><identifier>{identificador}</identifier><datestamp>{datestamp}</datestamp></header>"
+        f'<metadata><oai_dc:dc xmlns:oai_dc="http://www.openarchives.org/OAI/2.0/oai_dc/" '
+        f'xmlns:dc="http://purl.org/dc/elements/1.1/">'
+        f"<dc:title>{escape(titulo)}</dc:title>"
+        f"<dc:identifier>https://hdl.handle.net/{handle}</dc:identifier>"
+        f"<dc:type>Book</dc:type></oai_dc:dc></metadata></record>"
+    )
+
+
+class Manejador(BaseHTTPRequestHandler):
+    registros = []
+    latencia = 0.0
+    saturado = 0
+    verboso = False
+    contador = Counter()
+    _lock = threading.Lock()
+
+    def log_message(self, formato, *args):
+        if self.verboso:
+            super().log_message(formato, *args)
+
+    def _xml(self, cuerpo, params, estado=200, cabeceras=None):
+        verbo = escape(params.get("verb", [""])[0])
+        texto = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">'
+            f"<responseDate>{datetime.now(timezone.utc).strftime(FORMATO)}</responseDate>"
+            f'<request verb="{verbo}">http://127.0.0.1/server/oai/request</request>{cuerpo}</OAI-PMH>'
+        ).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "text/xml;charset=UTF-8")
+        self.send_header("Content-Length", str(len(texto)))
+        for k, v in (cabeceras or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(texto)
+
+    def _error(self, params, codigo, mensaje):
+        self.contador[codigo] += 1
+        return self._xml(f'<error code="{codigo}">{escape(mensaje)}</error>', params)
+
+    def do_GET(self):
+        if self.latencia:
+            time.sleep(self.latencia)
+        params = parse_qs(urlsplit(self.path).query)
+        verbo = params.get("verb", [""])[0]
+        with self._lock:
+            self.contador["peticiones"] += 1
+            saturar = self.saturado and self.contador["peticiones"] % self.saturado == 0
+        if saturar:
+            self.contador[503] += 1
+            self.send_response(503)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            return self.end_headers()
+
+        if verbo == "Identify":
+            return self._xml("<Identify><repositoryName>Repositorio simulado</repositoryName>"
+                             "<protocolVersion>2.0</protocolVersion>"
+                             "<granularity>YYYY-MM-DDThh:mm:ssZ</granularity></Identify>", params)
+        if verbo != "ListRecords":
+            return self._error(params, "badVerb", f"Verbo no soportado por el mock: {verbo}")
+
+        token = params.get("resumptionToken", [None])[0]
+        if token:
+            try:
+                desde, inicio = token.split("|")
+                inicio = int(inicio)
+            except ValueError:
+                return self._error(params, "badResumptionToken", token)
+        else:
+            if params.get("metadataPrefix", [""])[0] != "oai_dc":
+                return self._error(params, "cannotDisseminateFormat", "Solo oai_dc")
+            desde, inicio = params.get("from", [""])[0], 0
+
+        seleccion = [r for r in self.registros if r[1] >= desde] if desde else self.registros
+        if not seleccion:
+            return self._error(params, "noRecordsMatch", "No hay registros")
+        pagina = seleccion[inicio:inicio + POR_PAGINA]
+        self.contador["paginas"] += 1
+        self.contador["registros"] += len(pagina)
+        siguiente = inicio + POR_PAGINA
+        token_xml = (f'<resumptionToken completeListSize="{len(seleccion)}" cursor="{inicio}">'
+                     f"{desde}|{siguiente}</resumptionToken>" if siguiente < len(seleccion)
+                     else f'<resumptionToken completeListSize="{len(seleccion)}" cursor="{inicio}"/>')
+        self._xml("<ListRecords>" + "".join(xml_registro(*r) for r in pagina) + token_xml + "</ListRecords>",
+                  params)
+
+
+def crear_servidor(puerto=8780, latencia_ms=0, titulos=(), relleno=5000, cambios=0, saturado=0):
+    manejador = type("ManejadorOAI", (Manejador,), {
+        "registros": registros_simulados(list(titulos), relleno, cambios),
+        "latencia": latencia_ms / 1000, "saturado": saturado, "contador": Counter(),
+    })
+    return ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--puerto", type=int, default=8780)
+    ap.add_argument("--latencia", type=float, default=0, help="Milisegundos de espera por petición")
+    ap.add_argument("--excel", default="links.xlsx", help="Excel de donde salen los títulos reales")
+    ap.add_argument("--relleno", type=int, default=5000, help="Registros inventados además de los del Excel")
+    ap.add_argument("--cambios", type=int, default=0, help="Registros con datestamp de ahora (cosecha incremental)")
+    ap.add_argument("--saturado", type=int, default=0, help="Responder 503 + Retry-After a una de cada N peticiones")
+    ap.add_argument("--verboso", action="store_true", help="Muestra cada petición")
+    args = ap.parse_args()
+
+    titulos = []
+    try:
+        import pandas as pd
+        df = pd.read_excel(args.excel)
+        df.columns = df.columns.str.strip()
+        for _, fila in df.iterrows():
+            titulo, subtitulo = str(fila["Título del libro"]).strip(), str(fila.get("Subtitulo", "")).strip()
+            con_sub = subtitulo and subtitulo.lower() not in ("no aplica", "nan")
+            titulos.append(f"{titulo}: {subtitulo}" if con_sub else titulo)
+    except (OSError, ImportError, KeyError) as e:
+        print(f"⚠️ Sin títulos de {args.excel} ({e}); solo registros inventados")
+
+    Manejador.verboso = args.verboso
+    servidor = crear_servidor(args.puerto, args.latencia, titulos, args.relleno, args.cambios, args.saturado)
+    print(f"🧪 OAI-PMH simulado en http://127.0.0.1:{args.puerto}/server/oai/request "
+          f"({len(servidor.RequestHandlerClass.registros)} registros; Ctrl+C para terminar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("📊", dict(servidor.RequestHandlerClass.contador))
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,72 @@
 import pandas as pd
+import argparse
+import os
+import sys
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 from difflib import SequenceMatcher
 
-# --- 1. Cargar Excel ---
-df = pd.read_excel("links.xlsx")
-df.columns = df.columns.str.strip()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.bitacora import Bitacora
+from comun.oai import IndiceOAI, RUTA_DEFECTO, ErrorOAI
 
-# --- 2. Configuración de Selenium ---
-options = webdriver.ChromeOptions()
-options.add_argument("--start-maximized")
-options.add_argument("--disable-blink-features=AutomationControlled")
+# -------------------------------------------------
+# Configuración
+# -------------------------------------------------
+
+EXCEL_IN = "links.xlsx"
+EXCEL_OUT = "links_actualizados.xlsx"
+OAI = "https://repository.uniminuto.edu/server/oai/request"
+UMBRAL = 0.7   # similitud mínima para aceptar un título del repositorio
 
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
 
 def similar(a, b):
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
-def buscar_libro(titulo):
+
+# -------------------------------------------------
+# Modo local: índice OAI-PMH cosechado (sin red por cada libro)
+# -------------------------------------------------
+
+def buscar_libro(titulo, indice, subtitulo=None, umbral=UMBRAL):
+    """
+    URL del ítem del repositorio cuyo título más se parece, o "no encontrado".
+    En el repositorio el subtítulo suele ir pegado al título ("Título: subtítulo"),
+    así que se prueba con y sin él y gana la mejor similitud.
+    """
+    titulo = str(titulo)
+    consultas = [titulo]
+    if subtitulo and subtitulo.strip().lower() not in ("no aplica", "nan", ""):
+        consultas.append(f"{titulo}: {subtitulo}")
+
+    mejor = (0.0, None, None)
+    for consulta in consultas:
+        for candidato in indice.buscar(consulta, limite=1):
+            mejor = max(mejor, candidato, key=lambda c: c[0])
+    score, titulo_repo, url = mejor
+    if titulo_repo:
+        print(f"🔎 Comparando: {titulo} ↔ {titulo_repo} (score {score:.2f})")
+    return url if score > umbral and url else "no encontrado"
+
+
+# -------------------------------------------------
+# Modo google: búsqueda con Selenium (lento; Google bloquea tras pocas decenas)
+# -------------------------------------------------
+
+def abrir_navegador():
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    return webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+
+def buscar_libro_google(titulo, driver, umbral=UMBRAL):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+
     try:
         # Ir a Google
         driver.get("https://www.google.com/")
@@ -47,7 +92,7 @@ def buscar_libro(titulo):
                     score = similar(titulo, titulo_repo)
                     print(f"🔎 Comparando: {titulo} ↔ {titulo_repo} (score {score:.2f})")
 
-                    if score > 0.7:  # umbral de similitud
+                    if score > umbral:
                         return driver.current_url
                 except:
                     continue
@@ -56,16 +101,91 @@ def buscar_libro(titulo):
         print(f"❌ Error con {titulo}: {e}")
         return "no encontrado"
 
-# --- 3. Iterar libros ---
-for idx, row in df.iterrows():
-    if pd.isna(row["URL repositorio"]) or row["URL repositorio"] == "":
-        titulo = row["Título del libro"]
-        print(f"🔎 Buscando: {titulo}")
-        url = buscar_libro(titulo)
-        df.at[idx, "URL repositorio"] = url
-        print(f"✅ {titulo} -> {url}")
 
-# --- 4. Guardar resultados ---
-df.to_excel("links_actualizados.xlsx", index=False)
+# -------------------------------------------------
+# Proceso principal
+# -------------------------------------------------
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--excel", default=EXCEL_IN, help="Excel con 'Título del libro' y 'URL repositorio'")
+    ap.add_argument("--salida", default=EXCEL_OUT)
+    ap.add_argument("--modo", choices=["local", "google"], default="local",
+                    help="local: índice OAI-PMH del repositorio (milisegundos por libro); google: Selenium")
+    ap.add_argument("--oai", default=OAI, help="Endpoint OAI-PMH del repositorio")
+    ap.add_argument("--set", dest="conjunto", help="setSpec OAI para cosechar solo una colección")
+    ap.add_argument("--bd", default=RUTA_DEFECTO, help=f"Archivo SQLite del índice (por defecto {RUTA_DEFECTO})")
+    ap.add_argument("--sin-cosecha", action="store_true",
+                    help="Usar el índice tal como está, sin pedir al repositorio los registros nuevos")
+    ap.add_argument("--completa", action="store_true", help="Volver a cosechar todo el repositorio")
+    ap.add_argument("--umbral", type=float, default=UMBRAL, help="Similitud mínima para aceptar un título")
+    Bitacora.agregar_argumentos(ap)
+    args = ap.parse_args()
+
+    # --- 1. Cargar Excel ---
+    df = pd.read_excel(args.excel)
+    df.columns = df.columns.str.strip()
+    df["URL repositorio"] = df["URL repositorio"].astype(object)
+
+    # --- 2. Preparar el buscador ---
+    if args.modo == "local":
+        indice = IndiceOAI(args.bd)
+        if not args.sin_cosecha:
+            print(f"🌾 Cosechando {args.oai} ({'completa' if args.completa else 'incremental'})...")
+            inicio = time.time()
+            try:
+                nuevos, borrados = indice.cosechar(args.oai, args.conjunto, completa=args.completa)
+                print(f"   {nuevos} registros nuevos o cambiados, {borrados} borrados "
+                      f"en {time.time() - inicio:.1f} s")
+            except (ErrorOAI, OSError) as e:
+                # sin repositorio se sigue con lo ya cosechado
+                print(f"⚠️ No se pudo cosechar ({e}); se usa el índice existente")
+        print(f"📚 Índice local: {indice.total()} registros ({args.bd})")
+        if not indice.total():
+            sys.exit("❌ El índice está vacío: ejecute sin --sin-cosecha o revise --oai")
+        buscar = lambda fila: buscar_libro(fila["Título del libro"], indice, str(fila.get("Subtitulo", "")),
+                                           args.umbral)
+    else:
+        driver = abrir_navegador()
+        buscar = lambda fila: buscar_libro_google(fila["Título del libro"], driver, args.umbral)
+
+    # --- 3. Iterar libros (los ya resueltos en una corrida anterior salen de la bitácora) ---
+    bitacora = Bitacora.desde_args(args, args.salida)
+    inicio, buscados = time.time(), 0
+    for idx, row in df.iterrows():
+        if pd.isna(row["URL repositorio"]) or row["URL repositorio"] == "":
+            titulo = row["Título del libro"]
+            clave = f"{titulo}|{row.get('Subtitulo', '')}"
+            hecha = bitacora.datos(clave)
+            if hecha is not None:
+                df.at[idx, "URL repositorio"] = hecha["url"]
+                continue
+            print(f"🔎 Buscando: {titulo}")
+            url = buscar(row)
+            df.at[idx, "URL repositorio"] = url
+            if not url.startswith("http"):
+                # "no encontrado" no es definitivo: en Google puede ser un bloqueo y en modo local
+                # la próxima cosecha puede traer el título (y buscarlo de nuevo toma milisegundos)
+                bitacora.registrar(clave, error=url)
+            else:
+                bitacora.registrar(clave, {"url": url})
+            buscados += 1
+            print(f"✅ {titulo} -> {url}")
+    bitacora.cerrar()
+
+    encontrados = int((df["URL repositorio"].astype(str).str.startswith("http")).sum())
+    print(f"\n📊 {buscados} libros buscados en {time.time() - inicio:.2f} s; "
+          f"{encontrados} de {len(df)} con URL")
+    print(f"🗒️ {bitacora.resumen()}")
+
+    # --- 4. Guardar resultados ---
+    df.to_excel(args.salida, index=False)
+
+    if args.modo == "local":
+        indice.cerrar()
+    else:
+        driver.quit()
+
 
-driver.quit()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,9 @@
+"""
+Utilidades compartidas por los scripts del repositorio.
+
+Cada script vive en su propia carpeta (con espacios en el nombre), así que para
+usar estos módulos se agrega la raíz del repositorio al sys.path:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from comun.cache_texto import CacheTexto
+"""
@@ -0,0 +1,320 @@
+"""
+Registro de autores: las filas de autor de todas las salidas del repositorio
+(certificados DNDA, cesiones, perfiles, Scholar, Scopus) en una base SQLite,
+unidas por cédula y con la procedencia de cada dato.
+
+- normalizar_id(): "CC 79.528.190", "C.C.79528190", 79528190.0 -> "79528190".
+- clave_nombre(): nombre sin tildes, en minúsculas y con las palabras
+  ordenadas; "BARÓN GIL ORLANDO" y "Orlando Barón Gil" dan la misma clave.
+- Cada fila de cada fuente se guarda tal cual (fuente, fila, datos) con
+  índices por cédula y por clave de nombre, así que una búsqueda no recorre
+  los archivos. Una fuente solo se vuelve a cargar si su archivo cambió.
+- autores(): una fila por persona. Las filas con cédula se agrupan por
+  cédula; las que no la tienen se unen a la cédula que lleve exactamente el
+  mismo nombre en otra fuente, o quedan como autor sin cédula.
+
+    registro = RegistroAutores("autores.sqlite")
+    registro.cargar(Fuente("scopus", "scopus.xlsx", cedula="Cédula",
+                           nombre="Nombre Apellido", campos={"scopus": "Scopus"}))
+    registro.buscar("CC 79.528.190")   # [{"Cédula": "79528190", "Nombre": ..., "Fuentes": ...}]
+"""
+
+import json
+import math
+import numbers
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+# Campos del registro: nombre interno -> columna en la salida. El orden es el de la salida.
+CAMPOS = {
+    "correo": "Correo electrónico",
+    "telefono": "Teléfono",
+    "nacionalidad": "Nacionalidad",
+    "ciudad": "Ciudad",
+    "rectoria": "Rectoría",
+    "rol": "Rol",
+    "filiacion": "Filiación institucional",
+    "scholar": "Google Scholar",
+    "foto": "Foto",
+    "scopus": "Scopus",
+    "documentos_scopus": "Documentos en Scopus",
+    "citas_scopus": "Citaciones en Scopus",
+    "h_scopus": "Índice H Scopus",
+}
+
+# uno o varios rótulos seguidos: "CC No. 79.528.190", "Cédula de ciudadanía No. 1.023.456"
+_PREFIJO_ID = re.compile(
+    r"^(?:(?:C\.?\s*C\.?|C\.?\s*E\.?|T\.?\s*I\.?|NIT|PASAPORTE|C[EÉ]DULA(?:\s+DE\s+CIUDADAN[IÍ]A)?|N[oOº°]\.?)"
+    r"[\s:.#-]*)+", re.IGNORECASE)
+_RE_ID = re.compile(r"[0-9A-Z]*\d[0-9A-Z]*")
+MIN_DIGITOS_ID = 5   # con menos no es una cédula sino un número suelto de la hoja
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    id      INTEGER PRIMARY KEY,
+    fuente  TEXT NOT NULL,
+    fila    INTEGER NOT NULL,     -- fila del archivo como se ve en Excel (1 = encabezado)
+    cedula  TEXT,                 -- normalizar_id()
+    nombre  TEXT,
+    clave   TEXT,                 -- clave_nombre(nombre)
+    datos   TEXT NOT NULL         -- JSON {campo: valor}, más "obra"
+);
+CREATE INDEX IF NOT EXISTS ix_registros_cedula ON registros (cedula);
+CREATE INDEX IF NOT EXISTS ix_registros_clave ON registros (clave);
+CREATE INDEX IF NOT EXISTS ix_registros_fuente ON registros (fuente);
+CREATE TABLE IF NOT EXISTS fuentes (
+    fuente   TEXT PRIMARY KEY,
+    ruta     TEXT NOT NULL,
+    bytes    INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    filas    INTEGER NOT NULL,
+    fecha    REAL NOT NULL
+);
+"""
+
+
+def normalizar_id(valor) -> Optional[str]:
+    """Número de identificación sin prefijo (CC, C.C., Cédula...), puntos ni espacios, o None."""
+    if valor is None or isinstance(valor, bool):
+        return None
+    if isinstance(valor, numbers.Integral):
+        texto = str(int(valor))
+    elif isinstance(valor, numbers.Real):
+        if math.isnan(valor) or not float(valor).is_integer():
+            return None
+        texto = str(int(valor))
+    else:
+        texto = str(valor).strip()
+        if re.fullmatch(r"\d+\.0", texto):   # número leído como texto desde Excel
+            texto = texto[:-2]
+        texto = _PREFIJO_ID.sub("", texto)
+        texto = re.sub(r"[\s.,'-]", "", texto).upper()
+    if not _RE_ID.fullmatch(texto) or sum(c.isdigit() for c in texto) < MIN_DIGITOS_ID:
+        return None
+    return texto
+
+
+def plegar(texto: str) -> str:
+    """Minúsculas y sin tildes (la ñ queda como n)."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    return "".join(c for c in texto if not unicodedata.combining(c)).lower()
+
+
+def palabras_nombre(texto: str) -> List[str]:
+    return re.findall(r"[a-z]+", plegar(texto))
+
+
+def clave_nombre(texto: str) -> Optional[str]:
+    """Palabras del nombre plegadas y ordenadas: no importa si van primero nombres o apellidos."""
+    palabras = palabras_nombre(texto)
+    return " ".join(sorted(palabras)) if palabras else None
+
+
+def _texto(valor) -> Optional[str]:
+    """Valor de una celda como texto limpio, o None si está vacía."""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)):
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor)
+    texto = re.sub(r"\s+", " ", str(valor)).strip()
+    return texto or None
+
+
+@dataclass
+class Fuente:
+    """
+    Un archivo de autores y cómo se leen sus columnas. `nombre` puede ser una
+    columna o varias que se unen (Nombres + Apellidos); `campos` lleva cada
+    campo de CAMPOS a su columna en el archivo; `obra` son columnas con títulos.
+    """
+    fuente: str
+    ruta: str
+    cedula: Optional[str] = None
+    nombre: Sequence[str] = ()
+    campos: Dict[str, str] = field(default_factory=dict)
+    obra: Sequence[str] = ()
+
+    def __post_init__(self):
+        if isinstance(self.nombre, str):
+            self.nombre = (self.nombre,)
+        if isinstance(self.obra, str):
+            self.obra = (self.obra,)
+
+    def leer(self) -> pd.DataFrame:
+        if str(self.ruta).lower().endswith(".csv"):
+            # Cesion.py escribió con "," y versiones anteriores con ";": se detecta el separador
+            return pd.read_csv(self.ruta, sep=None, engine="python", dtype=object, encoding="utf-8-sig")
+        return pd.read_excel(self.ruta, dtype=object)
+
+    def filas(self, df: pd.DataFrame) -> List[Tuple]:
+        """(fila, cedula, nombre, clave, datos JSON) por cada fila con cédula o nombre."""
+        df = df.rename(columns=lambda c: str(c).strip())
+        faltan = [c for c in [self.cedula, *self.nombre] if c and c not in df.columns]
+        if faltan:
+            raise KeyError(f"{self.ruta}: faltan las columnas {faltan}")
+        # los campos y obras son opcionales: una versión anterior del archivo puede no traerlos
+        campos = {campo: col for campo, col in self.campos.items() if col in df.columns}
+        obra = [col for col in self.obra if col in df.columns]
+
+        # cada columna se convierte de una vez; el recorrido final solo arma las tuplas
+        vacia = [None] * len(df)
+        cedulas = df[self.cedula].map(normalizar_id).tolist() if self.cedula else vacia
+        partes = [df[col].map(_texto).tolist() for col in self.nombre]
+        nombres = [" ".join(v for v in p if v) or None for p in zip(*partes)] if partes else vacia
+        valores = {campo: df[col].map(_texto).tolist() for campo, col in campos.items()}
+        obras = list(zip(*(df[col].map(_texto).tolist() for col in obra))) if obra else None
+
+        salida = []
+        for i, (pos, cedula, nombre) in enumerate(zip(df.index, cedulas, nombres)):
+            clave = clave_nombre(nombre) if nombre else None
+            if not cedula and not clave:
+                continue
+            datos = {campo: lista[i] for campo, lista in valores.items() if lista[i] is not None}
+            if obras is not None:
+                titulos = [t for t in dict.fromkeys(obras[i]) if t]
+                if titulos:
+                    datos["obra"] = titulos
+            salida.append((int(pos) + 2, cedula, nombre, clave, json.dumps(datos, ensure_ascii=False)))
+        return salida
+
+
+class RegistroAutores:
+    def __init__(self, ruta, prioridad: Sequence[str] = ()):
+        """`prioridad`: orden de las fuentes al elegir el nombre y los campos de cada autor."""
+        self.ruta = str(ruta)
+        Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(self.ruta, timeout=60)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.executescript(_ESQUEMA)
+        self.prioridad = list(prioridad)
+
+    def cerrar(self) -> None:
+        self.con.close()
+
+    def total(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM registros").fetchone()[0]
+
+    # ---------- carga ----------
+
+    def cargar(self, fuente: Fuente, forzar: bool = False) -> Optional[int]:
+        """
+        Reemplaza las filas de la fuente si su archivo cambió (tamaño o mtime)
+        desde la última carga. Devuelve cuántas filas cargó, o None si no hizo falta.
+        """
+        st = os.stat(fuente.ruta)
+        previa = self.con.execute("SELECT ruta, bytes, mtime_ns FROM fuentes WHERE fuente = ?",
+                                  (fuente.fuente,)).fetchone()
+        if not forzar and previa == (os.path.abspath(fuente.ruta), st.st_size, st.st_mtime_ns):
+            return None
+        filas = fuente.filas(fuente.leer())
+        with self.con:
+            self.con.execute("DELETE FROM registros WHERE fuente = ?", (fuente.fuente,))
+            self.con.executemany(
+                "INSERT INTO registros (fuente, fila, cedula, nombre, clave, datos) VALUES (?, ?, ?, ?, ?, ?)",
+                ((fuente.fuente, *f) for f in filas))
+            self.con.execute("INSERT OR REPLACE INTO fuentes VALUES (?, ?, ?, ?, ?, ?)",
+                             (fuente.fuente, os.path.abspath(fuente.ruta), st.st_size, st.st_mtime_ns,
+                              len(filas), time.time()))
+        return len(filas)
+
+    def fuentes(self) -> List[Tuple[str, str, int, float]]:
+        """(fuente, ruta, filas, fecha de carga) de lo que hay en la base."""
+        return self.con.execute("SELECT fuente, ruta, filas, fecha FROM fuentes ORDER BY fuente").fetchall()
+
+    # ---------- consulta ----------
+
+    def _filas(self, where: str = "", params: Iterable = ()) -> List[tuple]:
+        return self.con.execute(f"SELECT fuente, fila, cedula, nombre, clave, datos FROM registros {where} "
+                                f"ORDER BY fuente, fila", tuple(params)).fetchall()
+
+    def registros(self) -> pd.DataFrame:
+        """Todas las filas cargadas con su procedencia (fuente y fila del archivo)."""
+        filas = [(f, n, c, nom, *(json.loads(d).get(k) for k in CAMPOS))
+                 for f, n, c, nom, _, d in self._filas()]
+        return pd.DataFrame(filas, columns=["Fuente", "Fila", "Cédula", "Nombre", *CAMPOS.values()])
+
+    def autores(self) -> List[dict]:
+        """Una fila por autor con todas las fuentes unidas."""
+        return self._agrupar(self._filas())
+
+    def buscar(self, consulta: str) -> List[dict]:
+        """
+        Autores por cédula (con o sin CC y puntos) o por nombre: la clave exacta
+        y, si no hay, los nombres que contienen todas las palabras de la consulta.
+        """
+        cedula = normalizar_id(consulta)
+        if cedula:
+            cedulas, claves = {cedula}, set()
+        else:
+            clave = clave_nombre(consulta)
+            if not clave:
+                return []
+            encontradas = self._filas("WHERE clave = ?", (clave,))
+            if not encontradas:
+                palabras = clave.split()
+                encontradas = self._filas("WHERE " + " AND ".join(["clave LIKE ?"] * len(palabras)),
+                                          (f"%{p}%" for p in palabras))
+            cedulas = {f[2] for f in encontradas if f[2]}
+            claves = {f[4] for f in encontradas if not f[2]}
+        if cedulas:
+            marcas = ",".join("?" * len(cedulas))
+            con_cedula = self._filas(f"WHERE cedula IN ({marcas})", cedulas)
+            claves |= {f[4] for f in con_cedula if f[4]}
+        else:
+            con_cedula = []
+        sin_cedula = []
+        if claves:
+            marcas = ",".join("?" * len(claves))
+            sin_cedula = self._filas(f"WHERE cedula IS NULL AND clave IN ({marcas})", claves)
+        return self._agrupar(con_cedula + sin_cedula)
+
+    def _agrupar(self, filas: List[tuple]) -> List[dict]:
+        # cédulas con que aparece cada nombre en las filas que sí tienen cédula
+        cedulas_de = defaultdict(set)
+        for _, _, cedula, _, clave, _ in filas:
+            if cedula and clave:
+                cedulas_de[clave].add(cedula)
+
+        grupos: Dict[Tuple[str, str], List[tuple]] = {}
+        for fila in filas:
+            cedula, clave = fila[2], fila[4]
+            if cedula:
+                llave = ("cedula", cedula)
+            elif len(cedulas_de.get(clave, ())) == 1:
+                llave = ("cedula", next(iter(cedulas_de[clave])))
+            else:
+                llave = ("nombre", clave)
+            grupos.setdefault(llave, []).append(fila)
+
+        orden = {f: i for i, f in enumerate(self.prioridad)}
+        salida = []
+        for (tipo, valor), miembros in grupos.items():
+            miembros.sort(key=lambda f: (orden.get(f[0], len(orden)), f[0], f[1]))
+            datos = [json.loads(f[5]) for f in miembros]
+            autor = {"Cédula": valor if tipo == "cedula" else None}
+            nombre = next((f for f in miembros if f[3]), None)
+            autor["Nombre"] = nombre[3] if nombre else None
+            autor["Nombre (fuente)"] = f"{nombre[0]}:{nombre[1]}" if nombre else None
+            for campo, columna in CAMPOS.items():
+                autor[columna] = next((d[campo] for d in datos if d.get(campo)), None)
+            autor["Obras"] = "; ".join(dict.fromkeys(t for d in datos for t in d.get("obra", ()))) or None
+            autor["Fuentes"] = ", ".join(dict.fromkeys(f[0] for f in miembros))
+            autor["Registros"] = "; ".join(f"{f[0]}:{f[1]}" for f in miembros)
+            if tipo == "nombre":
+                # mismo nombre con varias cédulas en otras fuentes: no se puede decidir a cuál pertenece
+                autor["Revisar"] = ("nombre con cédulas " + ", ".join(sorted(cedulas_de[valor]))
+                                    if cedulas_de.get(valor) else "sin cédula")
+            else:
+                autor["Revisar"] = None
+            salida.append(autor)
+        salida.sort(key=lambda a: plegar(a["Nombre"] or ""))
+        return salida
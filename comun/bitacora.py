@@ -0,0 +1,210 @@
+"""
+Bitácora de tareas para reanudar los scripts que recorren un Excel fila por fila.
+
+Es un archivo JSONL junto a la salida (salida + '.bitacora.jsonl') al que solo
+se agregan líneas: cada fila que termina escribe una, con su clave, su estado
+y su resultado, y se vacía al disco en el momento. Si el proceso muere en la
+fila 3.000, la corrida siguiente lee la bitácora, salta las filas ya hechas y
+sigue desde ahí; el Excel se escribe una sola vez, al final.
+
+- La clave la elige cada script a partir del contenido de la fila (URL,
+  authorId, título...), no de su posición: reordenar o agregar filas al Excel
+  no invalida lo hecho.
+- Solo cuentan como hechas las filas con estado "ok". Las que terminaron con
+  error se vuelven a intentar en la corrida siguiente.
+- Si una clave aparece varias veces, vale la última línea. Una línea cortada
+  por una caída se ignora.
+- Sirve para retomar, no para guardar resultados para siempre: una fila hecha
+  hace más de --vigencia (o --max-age, en los scripts con caché HTTP) se
+  vuelve a procesar, así que una corrida nueva después de una completa
+  consulta de nuevo las fuentes.
+- --reiniciar descarta la bitácora y procesa todo de nuevo.
+- sembrar() da por hechas filas que ya traía una salida anterior a la
+  bitácora (con la fecha de ese archivo, así también vencen).
+
+Uso típico:
+
+    bitacora = Bitacora.desde_args(args, args.salida)
+    for i, fila in df.iterrows():
+        datos = bitacora.datos(clave(fila))
+        if datos is not None:
+            ...                                  # poner el resultado guardado en df
+            continue
+        ...                                      # procesar y luego:
+        bitacora.registrar(clave(fila), {"url": url})     # o error="mensaje"
+    df.to_excel(args.salida)
+    bitacora.cerrar()
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from comun.cache_http import duracion
+
+SUFIJO = ".bitacora.jsonl"
+VIGENCIA_DEFECTO = "1d"
+
+
+class Bitacora:
+    """Estado por clave: {clave: datos} de las filas terminadas bien. Segura entre hilos."""
+
+    def __init__(self, ruta, reiniciar: bool = False, vigencia: Optional[float] = None):
+        self.ruta = Path(ruta)
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.vigencia = vigencia  # segundos; None = las filas hechas no vencen
+        self._hechas: Dict[str, dict] = {}
+        self._fechas: Dict[str, float] = {}   # de las hechas, para conservar la vigencia al compactar
+        self._errores: Dict[str, str] = {}
+        self.retomadas = 0
+        self.vencidas = 0
+        self.nuevas = 0
+        self.fallidas = 0
+        if reiniciar and self.ruta.exists():
+            self.ruta.unlink()
+        elif self.ruta.exists():
+            lineas = self._leer()
+            self.retomadas = len(self._hechas)
+            if lineas > 2 * (len(self._hechas) + len(self._errores)) + 100:
+                self._compactar()
+        self._lock = threading.Lock()
+        self._archivo = open(self.ruta, "a", encoding="utf-8")
+
+    # ---------- integración con argparse ----------
+
+    @staticmethod
+    def agregar_argumentos(ap: argparse.ArgumentParser, vigencia: bool = True) -> None:
+        """`vigencia=False` en los scripts que ya tienen --max-age y lo pasan a desde_args."""
+        ap.add_argument("--bitacora", help=f"Archivo de la bitácora de filas hechas (por defecto, la salida + '{SUFIJO}')")
+        ap.add_argument("--reiniciar", action="store_true",
+                        help="Ignorar la bitácora de una corrida anterior y procesar todas las filas")
+        if vigencia:
+            ap.add_argument("--vigencia", type=duracion, default=VIGENCIA_DEFECTO,
+                            help=f"Antigüedad máxima de una fila hecha para saltarla: 3600, 90m, 12h, 7d... "
+                                 f"(por defecto {VIGENCIA_DEFECTO})")
+
+    @classmethod
+    def desde_args(cls, args: argparse.Namespace, salida, vigencia: Optional[float] = None) -> "Bitacora":
+        vigencia = vigencia if vigencia is not None else args.vigencia
+        bitacora = cls(args.bitacora or str(salida) + SUFIJO, args.reiniciar, vigencia)
+        if bitacora.retomadas:
+            print(f"♻️ Bitácora {bitacora.ruta}: {bitacora.retomadas} filas ya hechas se saltan "
+                  f"(--reiniciar para repetirlas)")
+        if bitacora.vencidas:
+            print(f"⌛ {bitacora.vencidas} filas hechas hace más de {vigencia:g} s se vuelven a procesar")
+        return bitacora
+
+    # ---------- lectura ----------
+
+    def _leer(self) -> int:
+        desde = time.time() - self.vigencia if self.vigencia is not None else None
+        vencidas = set()
+        lineas = 0
+        with open(self.ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    registro = json.loads(linea)
+                    clave = registro["clave"]
+                except (ValueError, KeyError, TypeError):
+                    continue  # línea a medio escribir cuando se cayó el proceso
+                lineas += 1
+                fecha = registro.get("fecha", 0)
+                vencidas.discard(clave)
+                if registro.get("estado") == "ok":
+                    if desde is not None and fecha < desde:
+                        vencidas.add(clave)  # pendiente otra vez
+                        self._hechas.pop(clave, None)
+                        continue
+                    self._hechas[clave] = registro.get("datos") or {}
+                    self._fechas[clave] = fecha
+                    self._errores.pop(clave, None)
+                else:
+                    self._errores[clave] = registro.get("error", "")
+                    self._hechas.pop(clave, None)
+        self.vencidas = len(vencidas)
+        return lineas
+
+    def _compactar(self) -> None:
+        """Reescribe la bitácora con una línea por clave (tras muchas corridas con reintentos)."""
+        tmp = self.ruta.with_name(self.ruta.name + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for clave, datos in self._hechas.items():
+                f.write(json.dumps({"clave": clave, "estado": "ok", "fecha": self._fechas[clave], "datos": datos},
+                                   ensure_ascii=False) + "\n")
+            for clave, error in self._errores.items():
+                f.write(json.dumps({"clave": clave, "estado": "error", "error": error}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.ruta)
+
+    def hecha(self, clave: str) -> bool:
+        return str(clave) in self._hechas
+
+    def datos(self, clave: str) -> Optional[dict]:
+        """El resultado guardado de una fila hecha, o None si está pendiente."""
+        return self._hechas.get(str(clave))
+
+    def error_previo(self, clave: str) -> Optional[str]:
+        return self._errores.get(str(clave))
+
+    # ---------- escritura ----------
+
+    def sembrar(self, clave: str, datos: dict, fecha: float) -> bool:
+        """
+        Da por hecha una fila que la bitácora no conoce, con un resultado que
+        viene de otra parte (p. ej. el Excel de salida de una corrida sin
+        bitácora). No pisa nada de la bitácora y respeta la vigencia: True si
+        la fila quedó hecha.
+        """
+        clave = str(clave)
+        if clave in self._hechas or clave in self._errores:
+            return False
+        if self.vigencia is not None and fecha < time.time() - self.vigencia:
+            return False
+        registro = {"clave": clave, "estado": "ok", "fecha": round(fecha, 3), "datos": datos}
+        with self._lock:
+            self._archivo.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+            self._archivo.flush()
+            self._hechas[clave] = datos
+            self._fechas[clave] = registro["fecha"]
+            self.retomadas += 1
+        return True
+
+    def registrar(self, clave: str, datos: Optional[dict] = None, error: Optional[str] = None) -> None:
+        """Agrega la fila terminada (con error si `error`) y la deja en disco antes de volver."""
+        clave = str(clave)
+        registro = {"clave": clave, "estado": "error" if error else "ok", "fecha": round(time.time(), 3)}
+        if error:
+            registro["error"] = str(error)
+        else:
+            registro["datos"] = datos or {}
+        linea = json.dumps(registro, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._archivo.write(linea)
+            self._archivo.flush()  # una caída del proceso no pierde la fila; el SO ya la tiene
+            if error:
+                self._errores[clave] = registro["error"]
+                self._hechas.pop(clave, None)
+                self.fallidas += 1
+            else:
+                self._hechas[clave] = registro["datos"]
+                self._fechas[clave] = registro["fecha"]
+                self._errores.pop(clave, None)
+                self.nuevas += 1
+
+    def cerrar(self) -> None:
+        with self._lock:
+            if not self._archivo.closed:
+                self._archivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def resumen(self) -> str:
+        return (f"bitácora: {self.retomadas} filas retomadas, {self.nuevas} nuevas, "
+                f"{self.fallidas} con error ({self.ruta})")
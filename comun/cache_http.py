@@ -0,0 +1,173 @@
+"""
+Caché persistente (SQLite) de respuestas JSON de APIs (Scopus, etc.).
+
+Cada entrada se identifica por (endpoint, clave), p. ej. ("author", "57203716721"),
+y guarda el JSON, la hora de descarga y los validadores HTTP (ETag y
+Last-Modified) cuando la respuesta los trae.
+
+- Una entrada más nueva que `max_age` se usa sin tocar la red (acierto).
+- Una entrada vencida con validadores se revalida con If-None-Match /
+  If-Modified-Since: un 304 renueva su fecha sin volver a descargarla.
+- Sin validadores, o con 200, se descarga de nuevo y se reemplaza.
+
+Uso típico:
+
+    cache = CacheHTTP.desde_args(args)        # respeta --no-cache-http y --max-age
+    entrada = cache.buscar("author", author_id)
+    if entrada and entrada.fresca: ...
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+RUTA_DEFECTO = os.environ.get(
+    "CACHE_HTTP", str(Path.home() / ".cache" / "scripts_editorial" / "respuestas_http.sqlite")
+)
+MAX_AGE_DEFECTO = "7d"
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS respuestas (
+    endpoint   TEXT NOT NULL,
+    clave      TEXT NOT NULL,
+    cuerpo     TEXT NOT NULL,          -- JSON
+    etag       TEXT,
+    ultima_mod TEXT,                   -- Last-Modified tal como llegó
+    guardado   REAL NOT NULL,          -- epoch de la última descarga o revalidación
+    PRIMARY KEY (endpoint, clave)
+);
+"""
+
+_UNIDADES = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def duracion(texto: str) -> float:
+    """Segundos a partir de '3600', '90m', '12h' o '7d' (para --max-age)."""
+    m = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(texto).lower())
+    if not m:
+        raise argparse.ArgumentTypeError(f"Duración inválida: {texto!r} (use p. ej. 3600, 90m, 12h, 7d)")
+    return float(m.group(1)) * _UNIDADES[m.group(2) or "s"]
+
+
+@dataclass
+class Entrada:
+    datos: dict
+    etag: Optional[str]
+    ultima_mod: Optional[str]
+    guardado: float
+    fresca: bool
+
+    def cabeceras_condicionales(self) -> Dict[str, str]:
+        cabeceras = {}
+        if self.etag:
+            cabeceras["If-None-Match"] = self.etag
+        if self.ultima_mod:
+            cabeceras["If-Modified-Since"] = self.ultima_mod
+        return cabeceras
+
+
+class CacheHTTP:
+    """Caché de respuestas por (endpoint, clave). Con activo=False nunca guarda ni recupera nada."""
+
+    def __init__(self, ruta: str = RUTA_DEFECTO, max_age: float = duracion(MAX_AGE_DEFECTO), activo: bool = True):
+        self.ruta = str(ruta)
+        self.max_age = max_age
+        self.activo = activo
+        self.aciertos = 0
+        self.revalidados = 0
+        self.fallos = 0
+        self._con: Optional[sqlite3.Connection] = None
+
+    # ---------- integración con argparse ----------
+
+    @staticmethod
+    def agregar_argumentos(ap: argparse.ArgumentParser) -> None:
+        ap.add_argument("--max-age", type=duracion, default=MAX_AGE_DEFECTO,
+                        help=f"Antigüedad máxima de una respuesta en caché: 3600, 90m, 12h, 7d... "
+                             f"(por defecto {MAX_AGE_DEFECTO}; 0 revalida todo)")
+        ap.add_argument("--no-cache-http", action="store_true",
+                        help="No usar la caché de respuestas (consulta siempre la API)")
+        ap.add_argument("--cache-http", default=RUTA_DEFECTO,
+                        help=f"Archivo SQLite de la caché de respuestas (por defecto {RUTA_DEFECTO})")
+
+    @classmethod
+    def desde_args(cls, args: argparse.Namespace) -> "CacheHTTP":
+        return cls(args.cache_http, args.max_age, activo=not args.no_cache_http)
+
+    # ---------- conexión ----------
+
+    def _conexion(self) -> sqlite3.Connection:
+        if self._con is None:
+            Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=60)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(_ESQUEMA)
+            self._con = con
+        return self._con
+
+    def cerrar(self) -> None:
+        if self._con is not None:
+            self._con.close()
+            self._con = None
+
+    # ---------- lectura y escritura ----------
+
+    def buscar(self, endpoint: str, clave: str) -> Optional[Entrada]:
+        """La entrada guardada (fresca o vencida) o None. No cuenta aciertos ni fallos."""
+        if not self.activo:
+            return None
+        fila = self._conexion().execute(
+            "SELECT cuerpo, etag, ultima_mod, guardado FROM respuestas WHERE endpoint = ? AND clave = ?",
+            (endpoint, str(clave))).fetchone()
+        if fila is None:
+            return None
+        cuerpo, etag, ultima_mod, guardado = fila
+        return Entrada(json.loads(cuerpo), etag, ultima_mod, guardado,
+                       fresca=time.time() - guardado < self.max_age)
+
+    def guardar(self, endpoint: str, clave: str, datos: dict,
+                etag: Optional[str] = None, ultima_mod: Optional[str] = None) -> None:
+        if not self.activo:
+            return
+        con = self._conexion()
+        with con:
+            con.execute(
+                "INSERT OR REPLACE INTO respuestas (endpoint, clave, cuerpo, etag, ultima_mod, guardado) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (endpoint, str(clave), json.dumps(datos, ensure_ascii=False), etag, ultima_mod, time.time()))
+
+    def guardar_varios(self, endpoint: str, datos: Dict[str, dict]) -> None:
+        """Guarda varias entradas sin validadores (p. ej. cada autor de una respuesta por lotes)."""
+        if not self.activo or not datos:
+            return
+        con = self._conexion()
+        ahora = time.time()
+        with con:
+            con.executemany(
+                "INSERT OR REPLACE INTO respuestas (endpoint, clave, cuerpo, etag, ultima_mod, guardado) "
+                "VALUES (?, ?, ?, NULL, NULL, ?)",
+                [(endpoint, str(k), json.dumps(v, ensure_ascii=False), ahora) for k, v in datos.items()])
+
+    def renovar(self, endpoint: str, clave: str) -> None:
+        """Marca la entrada como recién validada (tras un 304)."""
+        con = self._conexion()
+        with con:
+            con.execute("UPDATE respuestas SET guardado = ? WHERE endpoint = ? AND clave = ?",
+                        (time.time(), endpoint, str(clave)))
+
+    def resumen(self) -> str:
+        if not self.activo:
+            return "caché HTTP desactivada"
+        return (f"caché HTTP: {self.aciertos} aciertos, {self.revalidados} revalidados (304), "
+                f"{self.fallos} fallos ({self.ruta})")
+
+
+# Instancia inactiva para usar como valor por defecto en los clientes.
+SIN_CACHE = CacheHTTP(activo=False)
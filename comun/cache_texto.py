@@ -0,0 +1,298 @@
+"""
+Caché persistente (SQLite) del texto extraído de PDFs.
+
+La clave de cada documento es el hash SHA-256 de su contenido más el backend de
+extracción (pdfplumber, PyPDF2, OCR...) y sus ajustes (dpi, idioma, número de
+páginas...). Se guarda el texto por página, de modo que volver a correr un
+script después de corregir una regex no vuelve a abrir ningún PDF.
+
+- Renombrar o mover un PDF no invalida la caché (la clave es el contenido).
+- Cambiar el backend o los ajustes genera otra clave.
+- Tamaño acotado: al superar `max_mb` se eliminan los documentos usados hace
+  más tiempo (LRU). El total se lleva en memoria y la hora de uso de los
+  aciertos se escribe por lotes, para no tocar la base en cada lectura; lo
+  pendiente se escribe en cerrar(), que también corre al salir del proceso
+  (los procesos de un pool no corren atexit: deben llamar a cerrar()).
+
+Uso típico:
+
+    cache = CacheTexto.desde_args(args)          # respeta --no-cache
+    paginas = cache.paginas(ruta, "pdfplumber", {}, extraer_paginas)
+"""
+
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Ruta por defecto; se puede cambiar con la variable de entorno CACHE_TEXTO_PDF
+# o con --cache en cada script.
+RUTA_DEFECTO = os.environ.get(
+    "CACHE_TEXTO_PDF", str(Path.home() / ".cache" / "scripts_editorial" / "texto_pdf.sqlite")
+)
+MAX_MB_DEFECTO = 512
+LOTE_USO = 100  # aciertos cuya hora de uso se acumula antes de escribirla
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    clave       TEXT PRIMARY KEY,
+    completo    INTEGER NOT NULL DEFAULT 0,   -- 1 si están todas las páginas
+    num_paginas INTEGER,
+    bytes       INTEGER NOT NULL DEFAULT 0,
+    usado       REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS paginas (
+    clave  TEXT NOT NULL,
+    numero INTEGER NOT NULL,
+    texto  TEXT NOT NULL,
+    PRIMARY KEY (clave, numero)
+);
+CREATE INDEX IF NOT EXISTS idx_documentos_usado ON documentos(usado);
+"""
+
+
+def hash_archivo(ruta, bloque: int = 1 << 20) -> str:
+    """SHA-256 del contenido del archivo, leído por bloques."""
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(bloque), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+class CacheTexto:
+    """Caché de texto por página. Con activo=False nunca guarda ni recupera nada."""
+
+    def __init__(self, ruta: str = RUTA_DEFECTO, max_mb: float = MAX_MB_DEFECTO, activo: bool = True):
+        self.ruta = str(ruta)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.activo = activo
+        self.aciertos = 0
+        self.fallos = 0
+        self._con: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self._usados: Dict[str, float] = {}   # clave -> hora de uso aún sin escribir
+        self._total: Optional[int] = None     # bytes en la base, según esta conexión
+
+    # ---------- integración con argparse ----------
+
+    @staticmethod
+    def agregar_argumentos(ap: argparse.ArgumentParser) -> None:
+        ap.add_argument("--no-cache", action="store_true",
+                        help="No usar la caché de texto extraído (siempre re-parsea los PDFs)")
+        ap.add_argument("--cache", default=RUTA_DEFECTO,
+                        help=f"Archivo SQLite de la caché de texto (por defecto {RUTA_DEFECTO})")
+        ap.add_argument("--cache-max-mb", type=float, default=MAX_MB_DEFECTO,
+                        help=f"Tamaño máximo de la caché en MB (por defecto {MAX_MB_DEFECTO})")
+
+    @classmethod
+    def desde_args(cls, args: argparse.Namespace) -> "CacheTexto":
+        return cls(args.cache, args.cache_max_mb, activo=not args.no_cache)
+
+    # ---------- conexión ----------
+
+    def __getstate__(self):
+        # Permite pasar la caché a procesos hijos: cada uno abre su conexión.
+        estado = self.__dict__.copy()
+        estado["_con"] = None
+        estado["_pid"] = None
+        estado["_usados"] = {}
+        estado["_total"] = None
+        return estado
+
+    def _conexion(self) -> sqlite3.Connection:
+        if self._con is None or self._pid != os.getpid():
+            Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+            con = sqlite3.connect(self.ruta, timeout=60)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            con.executescript(_ESQUEMA)
+            self._con, self._pid = con, os.getpid()
+            self._usados, self._total = {}, None
+            atexit.register(self.cerrar)
+        return self._con
+
+    def cerrar(self) -> None:
+        """Escribe las horas de uso pendientes y cierra la conexión."""
+        atexit.unregister(self.cerrar)
+        if self._con is not None:
+            if self._pid == os.getpid():
+                with self._con:
+                    self._escribir_usados(self._con)
+            self._con.close()
+            self._con = None
+
+    # ---------- claves ----------
+
+    def _hash(self, ruta) -> str:
+        st = os.stat(ruta)
+        memo = (os.path.abspath(ruta), st.st_size, st.st_mtime_ns)
+        if memo not in self._hashes:
+            self._hashes[memo] = hash_archivo(ruta)
+        return self._hashes[memo]
+
+    def clave(self, ruta, backend: str, ajustes: Optional[dict] = None) -> str:
+        ajustes_txt = json.dumps(ajustes or {}, sort_keys=True, ensure_ascii=False)
+        return f"{self._hash(ruta)}|{backend}|{ajustes_txt}"
+
+    # ---------- documento completo ----------
+
+    def paginas(self, ruta, backend: str, ajustes: Optional[dict],
+                extraer: Callable[[str], List[str]]) -> List[str]:
+        """
+        Devuelve el texto de cada página. Si no está en caché llama a
+        extraer(ruta) -> List[str] y guarda el resultado.
+        """
+        if not self.activo:
+            return extraer(ruta)
+        clave = self.clave(ruta, backend, ajustes)
+        con = self._conexion()
+        fila = con.execute("SELECT completo, num_paginas FROM documentos WHERE clave = ?", (clave,)).fetchone()
+        if fila and fila[0]:
+            textos = [t for (t,) in con.execute(
+                "SELECT texto FROM paginas WHERE clave = ? ORDER BY numero", (clave,))]
+            if len(textos) == fila[1]:
+                self.aciertos += 1
+                self._tocar(clave)
+                return textos
+        self.fallos += 1
+        textos = extraer(ruta)
+        self._guardar(clave, dict(enumerate(textos)), completo=True, num_paginas=len(textos))
+        return textos
+
+    # ---------- páginas sueltas ----------
+
+    def pagina(self, ruta, backend: str, ajustes: Optional[dict], numero: int,
+               extraer: Callable[[int], str]) -> str:
+        """
+        Texto de una sola página (índice desde 0). Útil cuando el script solo
+        lee algunas páginas del documento. extraer(numero) -> str.
+
+        La conexión SQLite no se comparte entre hilos: si la extracción corre en
+        un pool, usar buscar_pagina/guardar_pagina desde el hilo principal.
+        """
+        texto = self.buscar_pagina(ruta, backend, ajustes, numero)
+        if texto is None:
+            texto = extraer(numero)
+            self.guardar_pagina(ruta, backend, ajustes, numero, texto)
+        return texto
+
+    def buscar_pagina(self, ruta, backend: str, ajustes: Optional[dict], numero: int) -> Optional[str]:
+        """Texto guardado de una página, o None si no está en caché."""
+        if not self.activo:
+            return None
+        clave = self.clave(ruta, backend, ajustes)
+        fila = self._conexion().execute(
+            "SELECT texto FROM paginas WHERE clave = ? AND numero = ?", (clave, numero)).fetchone()
+        if fila is None:
+            self.fallos += 1
+            return None
+        self.aciertos += 1
+        self._tocar(clave)
+        return fila[0]
+
+    def guardar_pagina(self, ruta, backend: str, ajustes: Optional[dict], numero: int, texto: str) -> None:
+        if self.activo:
+            self._guardar(self.clave(ruta, backend, ajustes), {numero: texto}, completo=False)
+
+    def num_paginas(self, ruta, backend: str, ajustes: Optional[dict],
+                    contar: Callable[[], int]) -> int:
+        """Número de páginas del documento (se guarda junto con el texto)."""
+        if not self.activo:
+            return contar()
+        clave = self.clave(ruta, backend, ajustes)
+        con = self._conexion()
+        fila = con.execute("SELECT num_paginas FROM documentos WHERE clave = ?", (clave,)).fetchone()
+        if fila and fila[0] is not None:
+            return fila[0]
+        n = contar()
+        with con:
+            con.execute(
+                "INSERT INTO documentos (clave, num_paginas, usado) VALUES (?, ?, ?) "
+                "ON CONFLICT(clave) DO UPDATE SET num_paginas = excluded.num_paginas",
+                (clave, n, time.time()))
+        return n
+
+    # ---------- escritura y desalojo ----------
+
+    def _tocar(self, clave: str) -> None:
+        # la hora de uso solo ordena el desalojo: se escribe por lotes, o junto
+        # con la siguiente escritura
+        self._usados[clave] = time.time()
+        if len(self._usados) >= LOTE_USO:
+            con = self._conexion()
+            with con:
+                self._escribir_usados(con)
+
+    def _escribir_usados(self, con: sqlite3.Connection) -> None:
+        if self._usados:
+            con.executemany("UPDATE documentos SET usado = ? WHERE clave = ?",
+                            [(t, c) for c, t in self._usados.items()])
+            self._usados.clear()
+
+    def _guardar(self, clave: str, textos: Dict[int, str], completo: bool,
+                 num_paginas: Optional[int] = None) -> None:
+        con = self._conexion()
+        if self._total is None:
+            self._total = con.execute("SELECT COALESCE(SUM(bytes), 0) FROM documentos").fetchone()[0]
+        tam = sum(len(t.encode("utf-8")) for t in textos.values())
+        with con:
+            fila = con.execute("SELECT bytes FROM documentos WHERE clave = ?", (clave,)).fetchone()
+            antes = fila[0] if fila else 0
+            if completo:  # reemplaza lo que hubiera de una lectura parcial
+                con.execute("DELETE FROM paginas WHERE clave = ?", (clave,))
+                bytes_doc = tam
+            else:  # las páginas que se vuelven a guardar no suman dos veces
+                numeros = list(textos)
+                reemplazados = con.execute(
+                    "SELECT COALESCE(SUM(LENGTH(CAST(texto AS BLOB))), 0) FROM paginas "
+                    f"WHERE clave = ? AND numero IN ({','.join('?' * len(numeros))})",
+                    (clave, *numeros)).fetchone()[0]
+                bytes_doc = antes - reemplazados + tam
+            con.execute(
+                "INSERT INTO documentos (clave, completo, num_paginas, bytes, usado) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(clave) DO UPDATE SET completo = MAX(completo, excluded.completo), "
+                "num_paginas = COALESCE(excluded.num_paginas, num_paginas), "
+                "bytes = excluded.bytes, usado = excluded.usado",
+                (clave, int(completo), num_paginas, bytes_doc, time.time()))
+            con.executemany(
+                "INSERT OR REPLACE INTO paginas (clave, numero, texto) VALUES (?, ?, ?)",
+                [(clave, n, t) for n, t in textos.items()])
+            self._usados.pop(clave, None)
+            self._escribir_usados(con)
+        self._total += bytes_doc - antes
+        if self._total > self.max_bytes:
+            self._desalojar()
+
+    def _desalojar(self) -> None:
+        con = self._conexion()
+        # otros procesos pueden haber escrito: se recalcula antes de borrar
+        total = con.execute("SELECT COALESCE(SUM(bytes), 0) FROM documentos").fetchone()[0]
+        self._total = total
+        if total <= self.max_bytes:
+            return
+        borrar = []
+        for clave, tam in con.execute("SELECT clave, bytes FROM documentos ORDER BY usado"):
+            if total <= self.max_bytes:
+                break
+            borrar.append((clave,))
+            total -= tam
+        with con:
+            con.executemany("DELETE FROM paginas WHERE clave = ?", borrar)
+            con.executemany("DELETE FROM documentos WHERE clave = ?", borrar)
+        self._total = total
+
+    def resumen(self) -> str:
+        if not self.activo:
+            return "caché de texto desactivada"
+        return f"caché de texto: {self.aciertos} aciertos, {self.fallos} fallos ({self.ruta})"
+
+
+# Instancia inactiva para usar como valor por defecto en las funciones de extracción.
+SIN_CACHE = CacheTexto(activo=False)
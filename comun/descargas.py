@@ -0,0 +1,371 @@
+"""
+Motor de descargas compartido por los scripts que bajan PDFs e imágenes.
+
+- Una sola sesión HTTP con pool de conexiones por host (keep-alive).
+- Descarga por bloques a `<destino>.part` y renombrado atómico al terminar:
+  nunca queda un archivo a medias con el nombre final y la memoria no crece
+  con el tamaño del archivo.
+- Reanudación con Range: si quedó un .part de una corrida interrumpida se
+  piden solo los bytes que faltan (con If-Range para no mezclar versiones).
+- Omite lo que ya está: si se conoce el tamaño (o MD5) esperado y el archivo
+  local coincide, no hace ninguna petición; si no, manda If-None-Match con el
+  ETag de la descarga anterior o compara Content-Length antes de leer el cuerpo.
+- Validación opcional (p. ej. validar_pdf: %PDF- al inicio y %%EOF al final).
+- Pool de hilos acotado para descargar varios archivos a la vez. Dos tareas
+  con el mismo destino nunca corren a la vez: si se repite la misma URL y
+  destino se devuelve el Future de la primera, y si cambia la URL la segunda
+  espera a que termine la primera (comparten el mismo .part).
+
+Los ETag y tamaños de lo descargado se guardan en `.descargas.json` dentro de
+cada carpeta de destino. Cada descarga solo agrega una línea a
+`.descargas.jsonl`; el JSON se reescribe de vez en cuando, al compactar.
+
+    with Descargador(hilos=4) as d:
+        for url, ruta in pendientes:
+            d.enviar(Tarea(url, ruta, validar=validar_pdf))
+        for r in d.resultados():
+            print(r.resumen())
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BLOQUE = 1 << 16
+INDICE = ".descargas.json"
+DIARIO = ".descargas.jsonl"   # cambios desde la última compactación del índice
+SUFIJO_PARCIAL = ".part"
+
+Validador = Callable[[str], Optional[str]]  # ruta -> mensaje de error o None
+
+
+def validar_pdf(ruta: str) -> Optional[str]:
+    """Comprueba la cabecera %PDF- y que haya un %%EOF en el último KB."""
+    with open(ruta, "rb") as f:
+        if f.read(5) != b"%PDF-":
+            return "no empieza con %PDF- (¿página de error en lugar del PDF?)"
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 1024))
+        if b"%%EOF" not in f.read():
+            return "no termina con %%EOF (archivo truncado)"
+    return None
+
+
+FIRMAS_IMAGEN = {b"\xff\xd8\xff": ".jpg", b"\x89PNG\r\n\x1a\n": ".png", b"GIF87a": ".gif", b"GIF89a": ".gif"}
+
+
+def extension_imagen(ruta: str) -> Optional[str]:
+    """Extensión según los bytes mágicos (JPEG, PNG, GIF o WebP); None si no es imagen."""
+    with open(ruta, "rb") as f:
+        cabecera = f.read(12)
+    if cabecera[:4] == b"RIFF" and cabecera[8:12] == b"WEBP":
+        return ".webp"
+    for firma, extension in FIRMAS_IMAGEN.items():
+        if cabecera.startswith(firma):
+            return extension
+    return None
+
+
+def validar_imagen(ruta: str) -> Optional[str]:
+    if extension_imagen(ruta) is None:
+        return "no es una imagen (¿página de error o captcha?)"
+    return None
+
+
+def md5_archivo(ruta: str) -> str:
+    h = hashlib.md5()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(1 << 20), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+@dataclass
+class Tarea:
+    url: str
+    destino: str
+    bytes: Optional[int] = None          # tamaño esperado, si la fuente lo informa
+    md5: Optional[str] = None            # checksum esperado (p. ej. el de DSpace)
+    validar: Optional[Validador] = None
+    cabeceras: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class Resultado:
+    tarea: Tarea
+    estado: str                          # descargado | reanudado | existente | error
+    bytes: int = 0
+    segundos: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.estado != "error"
+
+    def resumen(self) -> str:
+        nombre = os.path.basename(self.tarea.destino)
+        if self.estado == "error":
+            return f"❌ {nombre}: {self.error}"
+        if self.estado == "existente":
+            return f"⏭️ {nombre}: ya estaba descargado"
+        mb = self.bytes / 1024 / 1024
+        return f"✅ {nombre}: {mb:.1f} MB en {self.segundos:.1f} s" + (" (reanudado)" if self.estado == "reanudado" else "")
+
+
+class _Indice:
+    """
+    ETag y tamaño de cada archivo descargado, por carpeta (acceso protegido con
+    un lock). Cada escritura agrega una línea al diario; cuando el diario tiene
+    muchas más líneas que entradas, se vuelca todo al JSON y se vacía.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._carpetas: Dict[str, Dict[str, dict]] = {}
+        self._lineas: Dict[str, int] = {}
+
+    def _cargar(self, carpeta: str) -> Dict[str, dict]:
+        if carpeta not in self._carpetas:
+            try:
+                with open(os.path.join(carpeta, INDICE), encoding="utf-8") as f:
+                    entradas = json.load(f)
+            except (OSError, ValueError):
+                entradas = {}
+            lineas = 0
+            try:
+                with open(os.path.join(carpeta, DIARIO), encoding="utf-8") as f:
+                    for linea in f:
+                        try:
+                            nombre, datos = json.loads(linea)
+                        except (ValueError, TypeError):
+                            continue  # línea a medio escribir cuando se cayó el proceso
+                        entradas[nombre] = datos
+                        lineas += 1
+            except OSError:
+                pass
+            self._carpetas[carpeta] = entradas
+            self._lineas[carpeta] = lineas
+        return self._carpetas[carpeta]
+
+    def leer(self, destino: str) -> dict:
+        carpeta, nombre = os.path.split(os.path.abspath(destino))
+        with self._lock:
+            return dict(self._cargar(carpeta).get(nombre, {}))
+
+    def escribir(self, destino: str, datos: dict) -> None:
+        carpeta, nombre = os.path.split(os.path.abspath(destino))
+        with self._lock:
+            entradas = self._cargar(carpeta)
+            entradas[nombre] = datos
+            if self._lineas[carpeta] >= 2 * len(entradas) + 100:
+                self._compactar(carpeta, entradas)
+                return
+            with open(os.path.join(carpeta, DIARIO), "a", encoding="utf-8") as f:
+                f.write(json.dumps([nombre, datos], ensure_ascii=False) + "\n")
+            self._lineas[carpeta] += 1
+
+    def _compactar(self, carpeta: str, entradas: Dict[str, dict]) -> None:
+        tmp = os.path.join(carpeta, INDICE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entradas, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, os.path.join(carpeta, INDICE))
+        # si el proceso muere aquí, el diario solo repite lo que ya está en el JSON
+        open(os.path.join(carpeta, DIARIO), "w").close()
+        self._lineas[carpeta] = 0
+
+
+class Descargador:
+    def __init__(self, hilos: int = 4, timeout: float = 60, reintentos: int = 3,
+                 sesion: Optional[requests.Session] = None, cabeceras: Optional[Dict[str, str]] = None):
+        self.hilos = max(1, hilos)
+        self.timeout = timeout
+        self.reintentos = reintentos
+        self.sesion = sesion or requests.Session()
+        # un pool por host con tantas conexiones como hilos (por defecto requests deja 10)
+        adaptador = HTTPAdapter(pool_connections=16, pool_maxsize=max(10, self.hilos))
+        self.sesion.mount("http://", adaptador)
+        self.sesion.mount("https://", adaptador)
+        if cabeceras:
+            self.sesion.headers.update(cabeceras)
+        self._indice = _Indice()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._futuros: List[Future] = []
+        self._lock = threading.Lock()
+        self._en_curso: Dict[str, Future] = {}              # destino -> tarea pendiente o en curso
+        self._urls: Dict[str, str] = {}                     # destino -> URL de esa tarea
+        self._locks_destino: Dict[str, threading.Lock] = {}
+
+    # ---------- concurrencia ----------
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def enviar(self, tarea: Tarea) -> Future:
+        """
+        Encola la tarea en el pool de hilos; el resultado queda en el Future. Si
+        ya hay una tarea pendiente con la misma URL y el mismo destino, devuelve
+        su Future en lugar de descargar dos veces.
+        """
+        destino = os.path.abspath(tarea.destino)
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.hilos, thread_name_prefix="descarga")
+            previo = self._en_curso.get(destino)
+            if previo is not None and not previo.done() and self._urls[destino] == tarea.url:
+                futuro = previo
+            else:
+                futuro = self._pool.submit(self.descargar, tarea)
+                self._en_curso[destino], self._urls[destino] = futuro, tarea.url
+                futuro.add_done_callback(lambda f, d=destino: self._terminado(d, f))
+            self._futuros.append(futuro)
+        return futuro
+
+    def _terminado(self, destino: str, futuro: Future) -> None:
+        with self._lock:
+            if self._en_curso.get(destino) is futuro:
+                del self._en_curso[destino]
+                del self._urls[destino]
+
+    def _lock_destino(self, destino: str) -> threading.Lock:
+        with self._lock:
+            return self._locks_destino.setdefault(os.path.abspath(destino), threading.Lock())
+
+    def resultados(self) -> List[Resultado]:
+        """Espera todas las tareas enviadas y devuelve sus resultados en orden de envío."""
+        futuros, self._futuros = self._futuros, []
+        return [f.result() for f in futuros]
+
+    def descargar_todo(self, tareas: Iterable[Tarea]) -> List[Resultado]:
+        for t in tareas:
+            self.enviar(t)
+        return self.resultados()
+
+    def cerrar(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    # ---------- una descarga ----------
+
+    def descargar(self, tarea: Tarea) -> Resultado:
+        """
+        Descarga con reintentos; cada reintento reanuda desde el .part. Nunca lanza.
+        Las descargas al mismo destino se hacen una tras otra (comparten el .part).
+        """
+        with self._lock_destino(tarea.destino):
+            return self._descargar_con_reintentos(tarea)
+
+    def _descargar_con_reintentos(self, tarea: Tarea) -> Resultado:
+        t0 = time.perf_counter()
+        ultimo_error = None
+        for intento in range(self.reintentos + 1):
+            try:
+                r = self._descargar(tarea)
+                r.segundos = time.perf_counter() - t0
+                return r
+            except _NoReintentar as e:
+                ultimo_error = str(e)
+                break
+            except (requests.RequestException, OSError) as e:
+                ultimo_error = str(e) or type(e).__name__
+                if intento < self.reintentos:  # tras el último intento no hay a qué esperar
+                    time.sleep(min(30, 2 ** intento))
+        return Resultado(tarea, "error", error=ultimo_error, segundos=time.perf_counter() - t0)
+
+    def _coincide_local(self, tarea: Tarea) -> bool:
+        """El archivo final ya existe y coincide con lo esperado (sin peticiones)."""
+        if tarea.bytes is None or os.path.getsize(tarea.destino) != tarea.bytes:
+            return False
+        if tarea.md5 and md5_archivo(tarea.destino) != tarea.md5.lower():
+            return False
+        return not (tarea.validar and tarea.validar(tarea.destino))
+
+    def _descargar(self, tarea: Tarea) -> Resultado:
+        destino = tarea.destino
+        parcial = destino + SUFIJO_PARCIAL
+        os.makedirs(os.path.dirname(os.path.abspath(destino)), exist_ok=True)
+        previo = self._indice.leer(destino)
+        cabeceras = dict(tarea.cabeceras)
+
+        existe = os.path.exists(destino)
+        if existe:
+            if self._coincide_local(tarea):
+                return Resultado(tarea, "existente", os.path.getsize(destino))
+            if tarea.bytes is None and previo.get("etag"):
+                cabeceras["If-None-Match"] = previo["etag"]
+
+        ya = os.path.getsize(parcial) if os.path.exists(parcial) else 0
+        if ya:
+            cabeceras["Range"] = f"bytes={ya}-"
+            if previo.get("etag_parcial"):
+                cabeceras["If-Range"] = previo["etag_parcial"]
+
+        with self.sesion.get(tarea.url, headers=cabeceras, stream=True, timeout=self.timeout) as r:
+            if r.status_code == 304:
+                return Resultado(tarea, "existente", os.path.getsize(destino))
+            if r.status_code == 416 and ya:
+                # el .part ya tenía todo (o cambió en el servidor): se valida o se descarta
+                total = r.headers.get("Content-Range", "").rpartition("/")[2]
+                if total.isdigit() and int(total) == ya:
+                    return self._finalizar(tarea, parcial, ya, "reanudado", previo.get("etag_parcial"))
+                os.remove(parcial)
+                raise requests.RequestException("Rango inválido; se reinicia la descarga")
+            if r.status_code in (401, 403, 404, 410):
+                raise _NoReintentar(f"HTTP {r.status_code} en {tarea.url}")
+            r.raise_for_status()
+
+            etag = r.headers.get("ETag")
+            largo = r.headers.get("Content-Length")
+            if existe and r.status_code == 200 and largo is not None and "Range" not in cabeceras \
+                    and int(largo) == os.path.getsize(destino) \
+                    and not (tarea.validar and tarea.validar(destino)):
+                # sin ETag ni tamaño esperado: mismo tamaño que el local basta para no repetir
+                return Resultado(tarea, "existente", int(largo))
+
+            if r.status_code == 206:
+                modo, estado, escritos = "ab", "reanudado", ya
+            else:  # 200: el servidor ignoró el Range (o no había .part)
+                modo, estado, escritos = "wb", "descargado", 0
+            self._indice.escribir(destino, {**previo, "url": tarea.url, "etag_parcial": etag})
+            with open(parcial, modo) as f:
+                for trozo in r.iter_content(BLOQUE):
+                    f.write(trozo)
+                    escritos += len(trozo)
+
+            esperado = tarea.bytes
+            if r.status_code == 206:
+                total = r.headers.get("Content-Range", "").rpartition("/")[2]
+                esperado = esperado or (int(total) if total.isdigit() else None)
+            elif largo is not None and "Content-Encoding" not in r.headers:
+                esperado = esperado or int(largo)
+            if esperado is not None and escritos < esperado:
+                raise requests.RequestException(f"Descarga incompleta ({escritos}/{esperado} bytes)")
+        return self._finalizar(tarea, parcial, escritos, estado, etag)
+
+    def _finalizar(self, tarea: Tarea, parcial: str, escritos: int, estado: str,
+                   etag: Optional[str]) -> Resultado:
+        if tarea.md5 and md5_archivo(parcial) != tarea.md5.lower():
+            os.remove(parcial)
+            raise requests.RequestException("El MD5 no coincide con el informado por el servidor")
+        error = tarea.validar(parcial) if tarea.validar else None
+        if error:
+            os.remove(parcial)
+            raise _NoReintentar(error)
+        os.replace(parcial, tarea.destino)
+        self._indice.escribir(tarea.destino, {"url": tarea.url, "etag": etag, "bytes": escritos})
+        return Resultado(tarea, estado, escritos)
+
+
+class _NoReintentar(Exception):
+    """Error definitivo (404, contenido inválido): no tiene sentido reintentar."""
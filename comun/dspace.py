@@ -0,0 +1,143 @@
+"""
+Cliente mínimo de la API REST de DSpace 7 (`/server/api`).
+
+Resuelve la URL pública de un ítem (…/items/<uuid>, …/entities/<tipo>/<uuid>,
+…/handle/<prefijo>/<sufijo> o el enlace antiguo …/bitstream/<prefijo>/<sufijo>/…)
+a su UUID, lista los bitstreams de un bundle (ORIGINAL por defecto) y los
+descarga, todo con HTTP y JSON, sin navegador.
+
+    cliente = ClienteDSpace.desde_url_item(url)          # o ClienteDSpace("https://repo/server/api")
+    for b in cliente.bitstreams(cliente.resolver_item(url)):
+        cliente.descargar(b, os.path.join("pdfs", b.nombre))
+
+Documentación de la API: https://github.com/DSpace/RestContract
+"""
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit
+
+import requests
+
+RE_UUID = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.IGNORECASE)
+RE_HANDLE = re.compile(r"/(?:handle|bitstream)/(\d+(?:\.\d+)*/[^/?#]+)")
+TAMANO_PAGINA = 100
+
+
+class ErrorDSpace(Exception):
+    pass
+
+
+def api_de_url(url: str) -> str:
+    """URL de la API REST del repositorio de `url` (<esquema>://<host>/server/api)."""
+    partes = urlsplit(url)
+    return f"{partes.scheme}://{partes.netloc}/server/api"
+
+
+def ruta_api_item(url: str) -> str:
+    """Ruta de la API para el ítem de `url`: /core/items/<uuid> o /pid/find?id=hdl:<handle>."""
+    ruta = urlsplit(url).path
+    m = RE_UUID.search(ruta)
+    if m:
+        return f"/core/items/{m.group(0).lower()}"
+    m = RE_HANDLE.search(ruta)
+    if not m:
+        raise ErrorDSpace(f"La URL no tiene UUID ni handle: {url}")
+    return f"/pid/find?id=hdl:{m.group(1)}"
+
+
+@dataclass
+class Bitstream:
+    uuid: str
+    nombre: str
+    bytes: Optional[int]
+    checksum: Optional[str]        # valor informado por DSpace (normalmente MD5)
+    algoritmo: Optional[str]
+    url_contenido: str
+
+
+class ClienteDSpace:
+    def __init__(self, api: str, sesion: Optional[requests.Session] = None, timeout: float = 30):
+        self.api = api.rstrip("/")
+        self.sesion = sesion or requests.Session()
+        self.sesion.headers.setdefault("Accept", "application/json")
+        self.timeout = timeout
+
+    @classmethod
+    def desde_url_item(cls, url: str, **kw) -> "ClienteDSpace":
+        """Cliente para el repositorio de `url` (la API está en <esquema>://<host>/server/api)."""
+        return cls(api_de_url(url), **kw)
+
+    # ---------- HTTP ----------
+
+    def _get(self, url: str, **params) -> dict:
+        if not url.startswith("http"):
+            url = self.api + url
+        r = self.sesion.get(url, params=params or None, timeout=self.timeout)
+        if r.status_code == 404:
+            raise ErrorDSpace(f"No existe en el repositorio: {url}")
+        r.raise_for_status()
+        return r.json()
+
+    def _paginas(self, url: str, clave: str) -> Iterator[dict]:
+        """Recorre una colección HAL paginada (_embedded[clave], _links.next)."""
+        datos = self._get(url, page=0, size=TAMANO_PAGINA)
+        while True:
+            yield from datos.get("_embedded", {}).get(clave, [])
+            siguiente = datos.get("_links", {}).get("next", {}).get("href")
+            if not siguiente:
+                return
+            datos = self._get(siguiente)
+
+    # ---------- ítems ----------
+
+    def resolver_item(self, url: str) -> str:
+        """UUID del ítem a partir de su URL pública (uuid en la ruta o handle)."""
+        ruta = ruta_api_item(url)
+        if ruta.startswith("/core/items/"):
+            return ruta.rsplit("/", 1)[1]
+        # /pid/find redirige al ítem (requests sigue la redirección)
+        item = self._get(ruta)
+        if "uuid" not in item:
+            raise ErrorDSpace(f"{ruta} no corresponde a un ítem")
+        return item["uuid"]
+
+    def item(self, uuid: str) -> dict:
+        return self._get(f"/core/items/{uuid}")
+
+    # ---------- bundles y bitstreams ----------
+
+    def bundles(self, uuid_item: str) -> List[dict]:
+        return list(self._paginas(f"/core/items/{uuid_item}/bundles", "bundles"))
+
+    def bitstreams(self, uuid_item: str, bundle: str = "ORIGINAL") -> List[Bitstream]:
+        """Bitstreams del bundle indicado (los archivos que se ven en la página del ítem)."""
+        salida = []
+        for b in self.bundles(uuid_item):
+            if b.get("name") != bundle:
+                continue
+            for bs in self._paginas(f"/core/bundles/{b['uuid']}/bitstreams", "bitstreams"):
+                checksum: Dict[str, str] = bs.get("checkSum") or {}
+                salida.append(Bitstream(
+                    uuid=bs["uuid"],
+                    nombre=bs.get("name") or f"{bs['uuid']}.pdf",
+                    bytes=bs.get("sizeBytes"),
+                    checksum=checksum.get("value"),
+                    algoritmo=checksum.get("checkSumAlgorithm"),
+                    url_contenido=bs.get("_links", {}).get("content", {}).get("href")
+                                  or f"{self.api}/core/bitstreams/{bs['uuid']}/content",
+                ))
+        return salida
+
+    def descargar(self, bitstream: Bitstream, destino: str, bloque: int = 1 << 16) -> int:
+        """Guarda el contenido del bitstream en `destino` (por bloques). Devuelve los bytes escritos."""
+        escritos = 0
+        with self.sesion.get(bitstream.url_contenido, stream=True, timeout=self.timeout,
+                             headers={"Accept": "*/*"}) as r:
+            r.raise_for_status()
+            with open(destino, "wb") as f:
+                for trozo in r.iter_content(bloque):
+                    f.write(trozo)
+                    escritos += len(trozo)
+        return escritos
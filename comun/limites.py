@@ -0,0 +1,87 @@
+"""
+Limitadores de tasa (cubo de tokens) para clientes asyncio y para hilos.
+
+En vez de dormir un tiempo aleatorio entre peticiones, cada petición toma un
+token del cubo de su host. El cubo se rellena a `tasa` tokens por segundo
+hasta `rafaga`. Si no hay token, la petición espera exactamente lo que falta
+para el siguiente. Las esperas se reservan por turno, así que N tareas
+concurrentes nunca superan la tasa configurada.
+
+    limitador = LimitadorPorHost(tasa=5, rafaga=5)
+    await limitador.adquirir(url)      # antes de cada petición HTTP
+
+CuboTokensHilos es la misma cuenta para código con ThreadPoolExecutor.
+"""
+
+import asyncio
+import threading
+import time
+from typing import Dict
+from urllib.parse import urlsplit
+
+
+class CuboTokens:
+    def __init__(self, tasa: float, rafaga: float = 1):
+        if tasa <= 0:
+            raise ValueError("La tasa debe ser positiva")
+        self.tasa = tasa
+        self.rafaga = max(1.0, rafaga)
+        self._tokens = self.rafaga
+        self._ultimo = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _reservar(self) -> float:
+        """Toma un token (el saldo puede quedar negativo) y devuelve cuánto hay que esperar."""
+        ahora = time.monotonic()
+        self._tokens = min(self.rafaga, self._tokens + (ahora - self._ultimo) * self.tasa)
+        self._ultimo = ahora
+        self._tokens -= 1
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.tasa
+
+    async def adquirir(self) -> None:
+        async with self._lock:
+            espera = self._reservar()
+        if espera:
+            await asyncio.sleep(espera)
+
+    def pausar(self, segundos: float) -> None:
+        """Vacía el cubo durante `segundos` (p. ej. tras un 429 con Retry-After)."""
+        self._tokens = min(self._tokens, -segundos * self.tasa)
+        self._ultimo = time.monotonic()
+
+
+class CuboTokensHilos(CuboTokens):
+    """CuboTokens para hilos: adquirir() bloquea el hilo el tiempo justo."""
+
+    def __init__(self, tasa: float, rafaga: float = 1):
+        super().__init__(tasa, rafaga)
+        self._lock_hilos = threading.Lock()
+
+    def adquirir(self) -> None:
+        with self._lock_hilos:
+            espera = self._reservar()
+        if espera:
+            time.sleep(espera)
+
+    def pausar(self, segundos: float) -> None:
+        with self._lock_hilos:
+            super().pausar(segundos)
+
+
+class LimitadorPorHost:
+    """Un CuboTokens independiente por host (esquema://host:puerto)."""
+
+    def __init__(self, tasa: float, rafaga: float = 1):
+        self.tasa = tasa
+        self.rafaga = rafaga
+        self._cubos: Dict[str, CuboTokens] = {}
+
+    def cubo(self, url: str) -> CuboTokens:
+        partes = urlsplit(url)
+        host = f"{partes.scheme}://{partes.netloc}"
+        if host not in self._cubos:
+            self._cubos[host] = CuboTokens(self.tasa, self.rafaga)
+        return self._cubos[host]
+
+    async def adquirir(self, url: str) -> None:
+        await self.cubo(url).adquirir()
@@ -0,0 +1,174 @@
+"""
+Manifiesto de cambios para procesar una carpeta de PDFs de forma incremental.
+
+Junto al archivo de salida (CSV/XLSX) se guarda un JSON con la ruta relativa,
+el tamaño, el mtime y el SHA-256 de cada PDF ya procesado. Cada corrida lo
+actualiza; con --incremental solo se procesan los PDFs nuevos o modificados y
+sus filas se reemplazan en la salida existente (la clave es el archivo). Las
+filas de los PDFs que ya no están en la carpeta se eliminan.
+
+- Si tamaño y mtime coinciden con el manifiesto, el archivo no se vuelve a leer.
+- Si cambiaron, se compara el hash: copiar o tocar un PDF sin cambiar su
+  contenido no obliga a reprocesarlo.
+- Un PDF que falla no se registra, así que se reintenta en la corrida siguiente.
+- Si la salida no existe todavía, --incremental equivale a una corrida completa.
+
+Uso típico:
+
+    man = Manifiesto.desde_args(args, args.out, carpeta)
+    cambios = man.clasificar(pdfs)
+    for ruta in cambios.pendientes:
+        ...                      # procesar y, si salió bien:
+        man.registrar(ruta)
+    df = combinar(leer_tabla(args.out), nuevas, "archivo", cambios.conservar, cambios.orden)
+    ...                          # escribir df
+    man.guardar()
+"""
+
+import argparse
+import json
+import os
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+from comun.cache_texto import hash_archivo
+
+SUFIJO = ".manifiesto.json"
+
+
+@dataclass
+class Cambios:
+    pendientes: List[str] = field(default_factory=list)  # rutas a procesar (nuevas o modificadas)
+    conservar: Set[str] = field(default_factory=set)     # claves cuyas filas se mantienen
+    borrados: Set[str] = field(default_factory=set)      # claves que ya no están en la carpeta
+    orden: List[str] = field(default_factory=list)       # claves de la carpeta, en orden de recorrido
+    nuevos: int = 0
+    modificados: int = 0
+
+    def resumen(self) -> str:
+        return (f"manifiesto: {self.nuevos} nuevos, {self.modificados} modificados, "
+                f"{len(self.conservar)} sin cambios, {len(self.borrados)} eliminados")
+
+
+class Manifiesto:
+    """
+    Estado por archivo: {clave: {"bytes", "mtime_ns", "sha256"}}. La clave es la
+    ruta relativa a `base` con "/" como separador.
+    """
+
+    def __init__(self, ruta, base, incremental: bool = False):
+        self.ruta = Path(ruta)
+        self.base = Path(base)
+        self.incremental = incremental
+        self.anterior: Dict[str, dict] = {}
+        if self.ruta.exists():
+            try:
+                self.anterior = json.loads(self.ruta.read_text(encoding="utf-8")).get("archivos", {})
+            except (ValueError, AttributeError) as e:
+                print(f"⚠️ Manifiesto ilegible ({self.ruta}): {e}. Se procesa todo.")
+        self._candidatos: Dict[str, dict] = {}
+        self._nuevo: Dict[str, dict] = {}
+
+    # ---------- integración con argparse ----------
+
+    @staticmethod
+    def agregar_argumentos(ap: argparse.ArgumentParser) -> None:
+        ap.add_argument("--incremental", action="store_true",
+                        help="Procesa solo los PDFs nuevos o modificados y actualiza la salida existente")
+        ap.add_argument("--manifiesto",
+                        help=f"Archivo del manifiesto (por defecto, la salida + '{SUFIJO}')")
+
+    @classmethod
+    def desde_args(cls, args: argparse.Namespace, salida, base) -> "Manifiesto":
+        ruta = args.manifiesto or str(salida) + SUFIJO
+        incremental = args.incremental and os.path.exists(salida)
+        if args.incremental and not incremental:
+            print(f"ℹ️ {salida} no existe todavía: se procesan todos los PDFs.")
+        return cls(ruta, base, incremental)
+
+    # ---------- clasificación ----------
+
+    def clave(self, ruta) -> str:
+        return Path(os.path.relpath(ruta, self.base)).as_posix()
+
+    def _entrada(self, ruta, st: os.stat_result) -> dict:
+        return {"bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+    def clasificar(self, rutas: Iterable) -> Cambios:
+        """
+        Separa los PDFs de la carpeta en pendientes y sin cambios. Sin
+        --incremental todos quedan pendientes (el manifiesto igual se actualiza).
+        """
+        cambios = Cambios()
+        for ruta in rutas:
+            clave = self.clave(ruta)
+            cambios.orden.append(clave)
+            entrada = self._entrada(ruta, os.stat(ruta))
+            previa = self.anterior.get(clave)
+            if previa is None:
+                cambios.nuevos += 1
+            elif (previa.get("bytes"), previa.get("mtime_ns")) == (entrada["bytes"], entrada["mtime_ns"]):
+                entrada["sha256"] = previa.get("sha256")
+            else:
+                # tamaño o fecha distintos: decide el contenido
+                entrada["sha256"] = hash_archivo(ruta)
+                if entrada["sha256"] != previa.get("sha256"):
+                    cambios.modificados += 1
+                    previa = None
+            self._candidatos[clave] = entrada
+            if previa is not None and self.incremental:
+                cambios.conservar.add(clave)
+                self._nuevo[clave] = entrada
+            else:
+                cambios.pendientes.append(ruta)
+        cambios.borrados = set(self.anterior) - set(cambios.orden)
+        return cambios
+
+    def registrar(self, ruta) -> None:
+        """Marca un PDF como procesado correctamente."""
+        clave = self.clave(ruta)
+        entrada = self._candidatos.get(clave) or self._entrada(ruta, os.stat(ruta))
+        if not entrada.get("sha256"):
+            entrada["sha256"] = hash_archivo(ruta)
+        self._nuevo[clave] = entrada
+
+    def guardar(self) -> None:
+        """Escribe el manifiesto (llamar después de escribir la salida)."""
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.ruta.with_name(self.ruta.name + ".tmp")
+        datos = {"base": str(self.base), "archivos": dict(sorted(self._nuevo.items()))}
+        tmp.write_text(json.dumps(datos, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp, self.ruta)
+
+
+# ---------- actualización de la tabla de salida ----------
+
+def leer_tabla(ruta) -> Optional[pd.DataFrame]:
+    """Lee la salida de una corrida anterior (CSV o Excel), o None si no existe."""
+    if not os.path.exists(ruta):
+        return None
+    if str(ruta).lower().endswith(".csv"):
+        return pd.read_csv(ruta, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    return pd.read_excel(ruta, dtype=object)
+
+
+def combinar(anterior: Optional[pd.DataFrame], nuevas: pd.DataFrame, columna: str,
+             conservar: Set[str], orden: List[str]) -> pd.DataFrame:
+    """
+    Filas de `anterior` cuyas claves están en `conservar` más las filas nuevas,
+    ordenadas como la carpeta (un archivo puede tener varias filas).
+    """
+    partes = []
+    if anterior is not None and columna in anterior.columns and conservar:
+        partes.append(anterior[anterior[columna].isin(conservar)])
+    if not nuevas.empty:
+        partes.append(nuevas)
+    if not partes:
+        return nuevas
+    df = pd.concat(partes, ignore_index=True)
+    posicion = {clave: i for i, clave in enumerate(orden)}
+    df = df.iloc[df[columna].map(posicion).fillna(len(orden)).to_numpy().argsort(kind="stable")]
+    return df.reset_index(drop=True)
@@ -0,0 +1,247 @@
+"""
+Copia local (SQLite) de los registros de un repositorio vía OAI-PMH, con un
+índice invertido de trigramas sobre los títulos.
+
+- cosechar(): ListRecords con metadataPrefix=oai_dc, sigue resumptionToken y
+  en corridas siguientes pide solo lo cambiado desde la última (from=).
+  Respeta el 503 + Retry-After con que los servidores OAI regulan la carga y
+  marca los registros con status="deleted".
+- buscar(): candidatos por trigramas compartidos (una consulta SQL sobre el
+  índice), ordenados por similitud con SequenceMatcher. Resuelve un título en
+  milisegundos, sin red.
+
+    indice = IndiceOAI("repositorio.sqlite")
+    indice.cosechar("https://repository.uniminuto.edu/server/oai/request")
+    indice.buscar("Hojas Mutisianas")   # [(similitud, titulo, url), ...]
+
+Especificación: https://www.openarchives.org/OAI/openarchivesprotocol.html
+"""
+
+import os
+import re
+import sqlite3
+import time
+import unicodedata
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+import requests
+
+RUTA_DEFECTO = os.environ.get(
+    "INDICE_OAI", str(Path.home() / ".cache" / "scripts_editorial" / "repositorio_oai.sqlite")
+)
+NS = {
+    "oai": "http://www.openarchives.org/OAI/2.0/",
+    "dc": "http://purl.org/dc/elements/1.1/",
+}
+CANDIDATOS = 30   # registros que pasan del filtro de trigramas a SequenceMatcher
+COMUN = 0.05      # un trigrama en más del 5 % de los títulos ("ion", "de ") no discrimina
+MIN_GRAMAS = 4    # pero siempre se consultan al menos los 4 más raros de la búsqueda
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    id            INTEGER PRIMARY KEY,
+    identificador TEXT UNIQUE NOT NULL,      -- oai:repositorio:10656/123
+    datestamp     TEXT,
+    titulo        TEXT,
+    titulo_norm   TEXT,
+    url           TEXT,
+    borrado       INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS trigramas (
+    grama    TEXT NOT NULL,
+    registro INTEGER NOT NULL,
+    PRIMARY KEY (grama, registro)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS ix_trigramas_registro ON trigramas (registro);   -- para reindexar un registro
+CREATE TABLE IF NOT EXISTS cosechas (
+    endpoint TEXT PRIMARY KEY,
+    desde    TEXT NOT NULL,                  -- from= de la próxima cosecha incremental
+    fecha    REAL NOT NULL
+);
+"""
+
+
+class ErrorOAI(Exception):
+    pass
+
+
+def normalizar(texto: str) -> str:
+    """Minúsculas, sin tildes ni puntuación y con espacios simples."""
+    texto = unicodedata.normalize("NFKD", texto or "")
+    texto = "".join(c for c in texto if not unicodedata.combining(c)).lower()
+    return " ".join(re.findall(r"[a-z0-9]+", texto))
+
+
+def trigramas(texto_norm: str) -> set:
+    relleno = f"  {texto_norm} "
+    return {relleno[i:i + 3] for i in range(len(relleno) - 2)}
+
+
+def similitud(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def url_de_identificadores(identificadores: List[str], base_handle: Optional[str] = None) -> Optional[str]:
+    """URL del ítem: la de /handle/ del repositorio si está, si no hdl.handle.net o la primera http."""
+    urls = [i.strip() for i in identificadores if i.strip().startswith("http")]
+    for u in urls:
+        if "/handle/" in u or "/items/" in u:
+            return u
+    for u in urls:
+        m = re.search(r"hdl\.handle\.net/(.+)", u)
+        if m and base_handle:
+            return f"{base_handle.rstrip('/')}/handle/{m.group(1)}"
+    return urls[0] if urls else None
+
+
+class IndiceOAI:
+    def __init__(self, ruta: str = RUTA_DEFECTO):
+        self.ruta = str(ruta)
+        Path(self.ruta).parent.mkdir(parents=True, exist_ok=True)
+        self.con = sqlite3.connect(self.ruta, timeout=60)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(_ESQUEMA)
+        self._frecuencias = None   # grama -> nº de títulos, para la búsqueda
+
+    def cerrar(self) -> None:
+        self.con.close()
+
+    def total(self) -> int:
+        return self.con.execute("SELECT COUNT(*) FROM registros WHERE borrado = 0").fetchone()[0]
+
+    # ---------- cosecha ----------
+
+    def _paginas(self, sesion: requests.Session, endpoint: str, params: dict,
+                 timeout: float) -> Iterator[ET.Element]:
+        """Cada respuesta ListRecords, siguiendo resumptionToken y reintentando los 503."""
+        while True:
+            for intento in range(6):
+                r = sesion.get(endpoint, params=params, timeout=timeout)
+                if r.status_code != 503:
+                    break
+                espera = r.headers.get("Retry-After", "")
+                time.sleep(min(120, int(espera)) if espera.isdigit() else 2 ** intento)
+            r.raise_for_status()
+            raiz = ET.fromstring(r.content)
+            error = raiz.find("oai:error", NS)
+            if error is not None:
+                if error.get("code") == "noRecordsMatch":
+                    return
+                raise ErrorOAI(f"{error.get('code')}: {(error.text or '').strip()}")
+            yield raiz
+            token = raiz.find(".//oai:resumptionToken", NS)
+            if token is None or not (token.text or "").strip():
+                return
+            params = {"verb": "ListRecords", "resumptionToken": token.text.strip()}
+
+    def _granularidad(self, sesion: requests.Session, endpoint: str, timeout: float) -> str:
+        try:
+            raiz = ET.fromstring(sesion.get(endpoint, params={"verb": "Identify"}, timeout=timeout).content)
+            return raiz.findtext(".//oai:granularity", "YYYY-MM-DD", NS)
+        except (requests.RequestException, ET.ParseError):
+            return "YYYY-MM-DD"
+
+    def cosechar(self, endpoint: str, conjunto: Optional[str] = None, completa: bool = False,
+                 sesion: Optional[requests.Session] = None, timeout: float = 120,
+                 progreso=print) -> Tuple[int, int]:
+        """
+        Trae los registros nuevos o cambiados desde la última cosecha del endpoint
+        (todos si es la primera o completa=True). Devuelve (actualizados, borrados).
+        """
+        sesion = sesion or requests.Session()
+        clave = endpoint + (f"#{conjunto}" if conjunto else "")
+        fila = self.con.execute("SELECT desde FROM cosechas WHERE endpoint = ?", (clave,)).fetchone()
+        params = {"verb": "ListRecords", "metadataPrefix": "oai_dc"}
+        if conjunto:
+            params["set"] = conjunto
+        if fila and not completa:
+            params["from"] = fila[0]
+
+        granularidad = self._granularidad(sesion, endpoint, timeout)
+        inicio = datetime.now(timezone.utc)
+        base_handle = re.sub(r"/server/oai/.*$|/oai/.*$", "", endpoint)
+        actualizados = borrados = 0
+        for n, raiz in enumerate(self._paginas(sesion, endpoint, params, timeout)):
+            fecha = raiz.findtext("oai:responseDate", None, NS)
+            if fecha and n == 0:
+                # la próxima cosecha parte de la hora del servidor, no de la local
+                inicio = datetime.fromisoformat(fecha.replace("Z", "+00:00"))
+            with self.con:
+                for registro in raiz.iterfind(".//oai:ListRecords/oai:record", NS):
+                    if self._guardar(registro, base_handle):
+                        actualizados += 1
+                    else:
+                        borrados += 1
+            self._frecuencias = None
+            progreso(f"   📥 {actualizados} registros cosechados, {borrados} borrados...")
+
+        desde = inicio.strftime("%Y-%m-%dT%H:%M:%SZ" if "hh" in granularidad else "%Y-%m-%d")
+        with self.con:
+            self.con.execute("INSERT OR REPLACE INTO cosechas (endpoint, desde, fecha) VALUES (?, ?, ?)",
+                             (clave, desde, time.time()))
+        return actualizados, borrados
+
+    def _guardar(self, registro: ET.Element, base_handle: str) -> bool:
+        """Inserta o actualiza un registro y sus trigramas. False si viene marcado como borrado."""
+        cabecera = registro.find("oai:header", NS)
+        identificador = cabecera.findtext("oai:identifier", "", NS)
+        datestamp = cabecera.findtext("oai:datestamp", "", NS)
+        fila = self.con.execute("SELECT id FROM registros WHERE identificador = ?", (identificador,)).fetchone()
+        if fila:
+            self.con.execute("DELETE FROM trigramas WHERE registro = ?", (fila[0],))
+
+        if cabecera.get("status") == "deleted":
+            if fila:
+                self.con.execute("UPDATE registros SET borrado = 1, datestamp = ? WHERE id = ?", (datestamp, fila[0]))
+            return False
+
+        titulo = registro.findtext(".//dc:title", "", NS).strip()
+        url = url_de_identificadores([e.text or "" for e in registro.iterfind(".//dc:identifier", NS)], base_handle)
+        titulo_norm = normalizar(titulo)
+        if fila:
+            registro_id = fila[0]
+            self.con.execute("UPDATE registros SET datestamp = ?, titulo = ?, titulo_norm = ?, url = ?, borrado = 0 "
+                             "WHERE id = ?", (datestamp, titulo, titulo_norm, url, registro_id))
+        else:
+            registro_id = self.con.execute(
+                "INSERT INTO registros (identificador, datestamp, titulo, titulo_norm, url) VALUES (?, ?, ?, ?, ?)",
+                (identificador, datestamp, titulo, titulo_norm, url)).lastrowid
+        self.con.executemany("INSERT OR IGNORE INTO trigramas (grama, registro) VALUES (?, ?)",
+                             [(g, registro_id) for g in trigramas(titulo_norm)])
+        return True
+
+    # ---------- búsqueda ----------
+
+    def _gramas_utiles(self, gramas: set) -> List[str]:
+        """
+        Los trigramas de la búsqueda sin los muy comunes: sus listas de registros
+        son casi todo el índice y recorrerlas es lo que hace lenta la consulta.
+        """
+        if self._frecuencias is None:
+            self._frecuencias = dict(self.con.execute("SELECT grama, COUNT(*) FROM trigramas GROUP BY grama"))
+            self._tope = COMUN * max(1, self.total())
+        por_rareza = sorted((g for g in gramas if g in self._frecuencias), key=self._frecuencias.get)
+        utiles = [g for g in por_rareza if self._frecuencias[g] <= self._tope]
+        return utiles if len(utiles) >= MIN_GRAMAS else por_rareza[:MIN_GRAMAS]
+
+    def buscar(self, titulo: str, limite: int = 5) -> List[Tuple[float, str, Optional[str]]]:
+        """[(similitud, titulo, url)] de los registros más parecidos, de mayor a menor."""
+        consulta = normalizar(titulo)
+        gramas = self._gramas_utiles(trigramas(consulta))
+        if not gramas:
+            return []
+        marcas = ",".join("?" * len(gramas))
+        filas = self.con.execute(
+            f"SELECT r.titulo, r.titulo_norm, r.url FROM registros r JOIN ("
+            f"  SELECT registro, COUNT(*) AS n FROM trigramas WHERE grama IN ({marcas}) "
+            f"  GROUP BY registro ORDER BY n DESC LIMIT ?"
+            f") c ON c.registro = r.id WHERE r.borrado = 0",
+            (*gramas, CANDIDATOS)).fetchall()
+        puntuados = sorted(((similitud(consulta, norm), titulo_repo, url) for titulo_repo, norm, url in filas),
+                           reverse=True)
+        return puntuados[:limite]
@@ -0,0 +1,206 @@
+"""
+Resolución de entidades para nombres de autor que no coinciden exactamente:
+certificados DNDA (mayúsculas, sin tildes, con errores de OCR), contratos de
+cesión y hojas de perfil (Nombres + Apellidos), a veces sin cédula.
+
+- Bloques: cada nombre se parte en palabras (sin tildes ni partículas como
+  "de" o "la") y cada palabra se reduce a una clave fonética del español
+  (b/v, c/s/z, ll/y, h muda, qu/k, letras dobles). Dos nombres solo se
+  comparan si comparten un par de claves, que en la práctica es un nombre y
+  un apellido. Un nombre cae en pocos bloques (los pares de sus primeras
+  MAX_PALABRAS palabras) y los bloques de más de MAX_BLOQUE nombres se
+  descartan: un par tan repetido no discrimina. Así el costo crece casi
+  linealmente con el número de nombres, no con su cuadrado.
+- Puntaje: promedio de Dice y de contención (lo común sobre el nombre más
+  corto), ambos ponderados por IDF. Una palabra coincide del todo si tiene la
+  misma clave fonética, en parte si difiere en una letra (OCR) o si es la
+  inicial de la otra. Una palabra común ("maria") pesa menos que un apellido
+  raro; un segundo nombre que falta en una fuente baja el puntaje sin
+  anularlo, y "María García" no alcanza a "María Fernanda García López".
+- Grupos: union-find sobre los pares con puntaje >= umbral, del más alto al
+  más bajo. Nunca se unen dos cédulas distintas: esos pares quedan en
+  `conflictos` para revisarlos (suelen ser una cédula mal digitada o leída
+  por OCR). La confianza de un grupo es el puntaje del par más débil que se
+  usó para formarlo.
+
+    r = resolver(["JULIAN AUGUSTO VIVAS GARCIA", "Julián Vivas García", "Ana Pérez"])
+    r.grupos()    # [(0.899, [0, 1])]
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from comun.autores import palabras_nombre
+
+UMBRAL = 0.85
+MAX_BLOQUE = 300    # nombres por bloque; más allá el par de palabras es demasiado común
+MAX_PALABRAS = 6    # palabras de cada nombre que forman bloques (C(6, 2) = 15 bloques)
+PARTICULAS = {"de", "del", "la", "las", "los", "y", "e", "da", "do", "dos", "san", "van", "von"}
+
+PARCIAL_OCR = 0.8       # misma palabra con una letra distinta
+PARCIAL_INICIAL = 0.5   # "J" frente a "Julián"
+
+_FONETICA = [(re.compile(p), r) for p, r in [
+    (r"ch", "x"), (r"qu", "k"), (r"gu(?=[ei])", "g"), (r"g(?=[ei])", "j"),
+    (r"c(?=[ei])", "s"), (r"c", "k"), (r"z", "s"), (r"v", "b"), (r"w", "b"),
+    (r"ll", "y"), (r"y$", "i"), (r"h", ""), (r"(.)\1+", r"\1"),
+]]
+
+
+@lru_cache(maxsize=None)
+def fonetica(palabra: str) -> str:
+    """Clave fonética de una palabra ya plegada (minúsculas, sin tildes): "hernandez" -> "ernandes"."""
+    for regex, reemplazo in _FONETICA:
+        palabra = regex.sub(reemplazo, palabra)
+    return palabra or "-"
+
+
+def claves(nombre: str) -> List[str]:
+    """Claves fonéticas de las palabras del nombre, sin partículas, en su orden."""
+    return [fonetica(p) for p in palabras_nombre(nombre) if p not in PARTICULAS]
+
+
+def una_letra(a: str, b: str) -> bool:
+    """True si a y b difieren en exactamente una letra (cambiada, sobrante o faltante)."""
+    if a == b or abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        return sum(x != y for x, y in zip(a, b)) == 1
+    if len(a) > len(b):
+        a, b = b, a
+    i = next((k for k, (x, y) in enumerate(zip(a, b)) if x != y), len(a))
+    return a[i:] == b[i + 1:]
+
+
+def coincidencia(a: str, b: str) -> float:
+    if a == b:
+        return 1.0
+    if len(a) >= 4 and len(b) >= 4 and una_letra(a, b):
+        return PARCIAL_OCR
+    if (len(a) == 1 or len(b) == 1) and a[0] == b[0]:
+        return PARCIAL_INICIAL
+    return 0.0
+
+
+def similitud(a: Sequence[str], b: Sequence[str], peso: Dict[str, float]) -> float:
+    """(Dice + contención) / 2 entre dos listas de claves, con las palabras ponderadas por `peso`."""
+    total_a, total_b = sum(peso[p] for p in a), sum(peso[p] for p in b)
+    if not total_a or not total_b:
+        return 0.0
+    libres = list(b)
+    comun = 0.0
+    # primero las coincidencias exactas, luego las parciales con lo que quedó
+    pendientes = []
+    for p in a:
+        if p in libres:
+            libres.remove(p)
+            comun += peso[p]
+        else:
+            pendientes.append(p)
+    for p in pendientes:
+        mejor, valor = None, 0.0
+        for q in libres:
+            v = coincidencia(p, q)
+            if v > valor:
+                mejor, valor = q, v
+        if mejor is not None:
+            libres.remove(mejor)
+            comun += valor * (peso[p] + peso[mejor]) / 2
+    return (2 * comun / (total_a + total_b) + comun / min(total_a, total_b)) / 2
+
+
+@dataclass
+class Resolucion:
+    grupo: List[int]                    # por nombre: el índice más bajo de su grupo
+    confianza: List[Optional[float]]    # por nombre: la del grupo, None si quedó solo
+    comparados: int = 0
+    bloques: int = 0
+    bloques_descartados: int = 0
+    conflictos: List[Tuple[float, int, int]] = field(default_factory=list)  # sobre el umbral, cédulas distintas
+    pares: List[Tuple[float, int, int]] = field(default_factory=list, repr=False)
+
+    def grupos(self) -> List[Tuple[float, List[int]]]:
+        """[(confianza, [índices])] de los grupos con más de un nombre, del más seguro al menos."""
+        miembros = defaultdict(list)
+        for i, g in enumerate(self.grupo):
+            miembros[g].append(i)
+        salida = [(self.confianza[g], m) for g, m in miembros.items() if len(m) > 1]
+        return sorted(salida, key=lambda x: (-x[0], x[1][0]))
+
+    def resumen(self) -> str:
+        return (f"resolución: {len(self.grupos())} grupos de {len(self.grupo)} nombres, "
+                f"{self.comparados} pares comparados en {self.bloques} bloques "
+                f"({self.bloques_descartados} bloques demasiado comunes, {len(self.conflictos)} pares con cédulas distintas)")
+
+
+def resolver(nombres: Sequence[Optional[str]], cedulas: Optional[Sequence[Optional[str]]] = None,
+             umbral: float = UMBRAL) -> Resolucion:
+    """Agrupa los nombres que parecen de la misma persona. `cedulas` (opcional) va en el mismo orden."""
+    cedulas = list(cedulas) if cedulas is not None else [None] * len(nombres)
+    listas = [claves(n) if n else [] for n in nombres]
+
+    # IDF de cada clave: log(N / nombres que la contienen)
+    df = Counter(p for l in listas for p in set(l))
+    n = max(1, len(listas))
+    peso = {p: math.log(1 + n / c) for p, c in df.items()}
+
+    bloques = defaultdict(list)
+    for i, l in enumerate(listas):
+        for par in set(combinations(sorted(set(l[:MAX_PALABRAS])), 2)):
+            bloques[par].append(i)
+
+    r = Resolucion(grupo=list(range(len(nombres))), confianza=[None] * len(nombres))
+    vistos = set()
+    for miembros in bloques.values():
+        if len(miembros) < 2:
+            continue
+        r.bloques += 1
+        if len(miembros) > MAX_BLOQUE:
+            r.bloques_descartados += 1
+            continue
+        for i, j in combinations(miembros, 2):
+            if (i, j) in vistos:
+                continue
+            vistos.add((i, j))
+            r.comparados += 1
+            puntaje = similitud(listas[i], listas[j], peso)
+            if puntaje >= umbral:
+                r.pares.append((puntaje, i, j))
+
+    # union-find del par más seguro al menos seguro, sin mezclar cédulas distintas
+    padre = list(range(len(nombres)))
+    cedulas_de = {i: {c} for i, c in enumerate(cedulas) if c}
+    minimo: Dict[int, float] = {}
+
+    def raiz(x):
+        while padre[x] != x:
+            padre[x] = padre[padre[x]]
+            x = padre[x]
+        return x
+
+    for puntaje, i, j in sorted(r.pares, reverse=True):
+        a, b = raiz(i), raiz(j)
+        if a == b:
+            continue
+        ca, cb = cedulas_de.get(a, set()), cedulas_de.get(b, set())
+        if ca and cb and ca != cb:
+            r.conflictos.append((round(puntaje, 3), i, j))
+            continue
+        a, b = min(a, b), max(a, b)
+        padre[b] = a
+        if ca or cb:
+            cedulas_de[a] = ca | cb
+        cedulas_de.pop(b, None)
+        minimo[a] = min(puntaje, minimo.get(a, 1.0), minimo.pop(b, 1.0))
+
+    for i in range(len(nombres)):
+        g = raiz(i)
+        r.grupo[i] = g
+        if g in minimo:
+            r.confianza[i] = round(minimo[g], 3)
+    return r
@@ -0,0 +1,356 @@
+"""
+Cliente asíncrono de la API de Scopus (Elsevier) para datos de autores.
+
+- Author Retrieval por lotes: /content/author?author_id=id1,id2,... admite
+  hasta 25 IDs por llamada, así que N autores cuestan ceil(N/25) peticiones.
+- Los lotes corren en paralelo (`concurrencia`) detrás de un cubo de tokens
+  (comun/limites.py) cuyo ritmo se ajusta con X-RateLimit-Remaining/Reset.
+- Reintentos con espera exponencial (y jitter) en 429, 5xx y errores de red;
+  un 429 respeta Retry-After o X-RateLimit-Reset.
+- Si un lote falla con 400/404 (p. ej. un ID inexistente) se parte en dos
+  hasta aislar el ID problemático, sin perder el resto.
+- Con una CacheHTTP (comun/cache_http.py) cada autor se guarda aparte: los
+  que tengan una respuesta más nueva que max_age no se consultan. Los IDs
+  sueltos van por /content/author/author_id/<id>, que se revalida con
+  ETag/Last-Modified cuando la API los envía.
+- h-index local: recorre los documentos del autor con Scopus Search (cursor,
+  una página en memoria a la vez) ordenados por citas de mayor a menor, y
+  corta en cuanto un documento tiene citas <= h. Un autor con 500 documentos
+  y h=20 cuesta una o dos páginas, no 20. Las citas de los documentos que
+  forman el h se guardan en caché junto con la huella del autor
+  (document-count, citation-count); si la huella no cambió no se consulta.
+
+    async with ClienteScopus(API_KEY, INST_TOKEN) as cliente:
+        datos = await cliente.autores(["7004212771", "57190000000"])
+        datos["7004212771"]["document-count"]
+
+Documentación: https://dev.elsevier.com/documentation/AuthorRetrievalAPI.wadl
+"""
+
+import asyncio
+import heapq
+import random
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+from comun.cache_http import SIN_CACHE, CacheHTTP
+from comun.limites import CuboTokens
+
+BASE = "https://api.elsevier.com"
+MAX_IDS_POR_LOTE = 25
+VENTANA_CORTA = 60  # s; ventanas de X-RateLimit-Reset más largas son cuota semanal, no ritmo
+RUTA_AUTOR = "/content/author/author_id"  # también es el endpoint de la caché de autores
+RUTA_BUSQUEDA = "/content/search/scopus"
+MAX_POR_PAGINA = 25                       # máximo de Scopus Search en la vista STANDARD
+CACHE_H = "h-index"
+
+
+class ErrorScopus(Exception):
+    def __init__(self, mensaje: str, estado: Optional[int] = None):
+        super().__init__(mensaje)
+        self.estado = estado
+
+
+class CuotaAgotada(ErrorScopus):
+    """X-RateLimit-Remaining llegó a 0 y el reinicio queda más lejos que espera_max."""
+
+
+def lotes(ids: Iterable[str], tamano: int = MAX_IDS_POR_LOTE) -> List[List[str]]:
+    """IDs únicos (en orden de aparición) partidos en lotes de `tamano`."""
+    unicos = list(dict.fromkeys(str(i) for i in ids if i))
+    return [unicos[k:k + tamano] for k in range(0, len(unicos), tamano)]
+
+
+class HIndice:
+    """
+    h-index en una sola pasada sobre las citas, en cualquier orden: un
+    min-heap guarda los h documentos con más citas vistos hasta ahora
+    (memoria O(h), no O(documentos)).
+    """
+
+    def __init__(self):
+        self._monticulo: List[Tuple[int, str]] = []
+
+    @property
+    def h(self) -> int:
+        return len(self._monticulo)
+
+    def agregar(self, citas: int, documento: str = "") -> None:
+        if citas > self.h:
+            heapq.heappush(self._monticulo, (citas, documento))
+            if self._monticulo[0][0] < len(self._monticulo):
+                heapq.heappop(self._monticulo)
+
+    def documentos(self) -> Dict[str, int]:
+        """Citas de los documentos que sostienen el h actual."""
+        return {doc: citas for citas, doc in self._monticulo}
+
+
+def huella_autor(coredata: dict) -> List[int]:
+    """(document-count, citation-count): si no cambian, el h-index tampoco."""
+    return [int(coredata.get("document-count") or 0), int(coredata.get("citation-count") or 0)]
+
+
+def respuestas_autor(datos: dict) -> List[dict]:
+    """Los author-retrieval-response de una respuesta por lotes o de un solo autor."""
+    respuestas = datos.get("author-retrieval-response-list", {}).get("author-retrieval-response") \
+        or datos.get("author-retrieval-response") or []
+    return [respuestas] if isinstance(respuestas, dict) else respuestas
+
+
+def id_de_respuesta(respuesta: dict) -> Optional[str]:
+    """author_id de un author-retrieval-response ("AUTHOR_ID:123" en dc:identifier)."""
+    ident = respuesta.get("coredata", {}).get("dc:identifier", "")
+    return ident.split(":")[-1] or None
+
+
+class ClienteScopus:
+    def __init__(self, api_key: str, inst_token: Optional[str] = None, base: str = BASE,
+                 tasa: float = 2, concurrencia: int = 3, reintentos: int = 5,
+                 espera_max: float = 900, timeout: float = 60, cache: CacheHTTP = SIN_CACHE):
+        self.api_key = api_key
+        self.inst_token = inst_token
+        self.base = base.rstrip("/")
+        self.tasa_max = tasa
+        self.concurrencia = concurrencia
+        self.reintentos = reintentos
+        self.espera_max = espera_max
+        self.timeout = timeout
+        self.cache = cache
+        self.cubo = CuboTokens(tasa, rafaga=concurrencia)
+        self.llamadas = 0
+        self.restante: Optional[int] = None   # último X-RateLimit-Remaining visto
+        self.agotada: Optional[CuotaAgotada] = None
+        self._sesion = None
+        self._en_vuelo = None
+
+    async def __aenter__(self):
+        import aiohttp
+
+        cabeceras = {"X-ELS-APIKey": self.api_key, "Accept": "application/json"}
+        if self.inst_token:
+            cabeceras["X-ELS-Insttoken"] = self.inst_token
+        self._sesion = aiohttp.ClientSession(
+            headers=cabeceras, timeout=aiohttp.ClientTimeout(total=self.timeout),
+            connector=aiohttp.TCPConnector(limit=self.concurrencia),
+        )
+        self._en_vuelo = asyncio.Semaphore(self.concurrencia)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._sesion.close()
+
+    # ---------- HTTP ----------
+
+    def _ajustar_ritmo(self, cabeceras) -> None:
+        """Adapta la tasa al cupo que queda en la ventana actual de X-RateLimit."""
+        try:
+            restante = int(cabeceras["X-RateLimit-Remaining"])
+            reinicio = float(cabeceras["X-RateLimit-Reset"])
+        except (KeyError, ValueError):
+            return
+        self.restante = restante
+        ventana = max(0.0, reinicio - time.time())
+        if restante <= 0:
+            if ventana > self.espera_max:
+                self.agotada = CuotaAgotada(f"Cuota de Scopus agotada; se renueva en {ventana / 3600:.1f} h")
+                raise self.agotada
+            self.cubo.pausar(ventana)
+        elif ventana <= VENTANA_CORTA:
+            # repartir lo que queda hasta el reinicio en vez de gastarlo en ráfaga y esperar
+            self.cubo.tasa = min(self.tasa_max, max(restante / max(ventana, 1.0), 0.1))
+        else:
+            self.cubo.tasa = self.tasa_max
+
+    def _espera_reintento(self, intento: int, cabeceras) -> float:
+        for nombre in ("Retry-After", "X-RateLimit-Reset"):
+            valor = cabeceras.get(nombre)
+            try:
+                segundos = float(valor)
+            except (TypeError, ValueError):
+                continue
+            if nombre == "X-RateLimit-Reset":
+                segundos -= time.time()
+            if 0 < segundos <= self.espera_max:
+                return segundos
+        return min(60.0, 2 ** intento) * (0.5 + random.random())
+
+    async def get(self, ruta: str, cache_clave: Optional[Tuple[str, str]] = None, **params) -> dict:
+        """
+        GET con cubo de tokens, ajuste por X-RateLimit y reintentos exponenciales.
+        Con cache_clave=(endpoint, clave) usa la caché: fresca no consulta, vencida
+        se revalida con If-None-Match/If-Modified-Since.
+        """
+        import aiohttp
+
+        url = ruta if ruta.startswith("http") else self.base + ruta
+        entrada = self.cache.buscar(*cache_clave) if cache_clave else None
+        if entrada and entrada.fresca:
+            self.cache.aciertos += 1
+            return entrada.datos
+        condicionales = entrada.cabeceras_condicionales() if entrada else {}
+
+        for intento in range(self.reintentos + 1):
+            await self.cubo.adquirir()
+            if self.agotada:
+                raise self.agotada
+            try:
+                async with self._en_vuelo:
+                    self.llamadas += 1
+                    async with self._sesion.get(url, params=params or None, headers=condicionales) as r:
+                        self._ajustar_ritmo(r.headers)
+                        if r.status == 304 and entrada:
+                            self.cache.revalidados += 1
+                            self.cache.renovar(*cache_clave)
+                            return entrada.datos
+                        if r.status == 429 or r.status >= 500:
+                            if intento == self.reintentos:
+                                raise ErrorScopus(f"HTTP {r.status} tras {intento + 1} intentos: {url}", r.status)
+                            self.cubo.pausar(self._espera_reintento(intento, r.headers))
+                            continue
+                        if r.status in (401, 403):
+                            raise ErrorScopus(f"HTTP {r.status}: revise API_KEY / INST_TOKEN", r.status)
+                        if r.status >= 400:
+                            raise ErrorScopus(f"HTTP {r.status}: {(await r.text())[:300]}", r.status)
+                        datos = await r.json(content_type=None)
+                        if cache_clave:
+                            self.cache.fallos += 1
+                            self.cache.guardar(*cache_clave, datos, r.headers.get("ETag"),
+                                               r.headers.get("Last-Modified"))
+                        return datos
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if intento == self.reintentos:
+                    raise ErrorScopus(f"Error de red tras {intento + 1} intentos: {e}") from e
+                await asyncio.sleep(self._espera_reintento(intento, {}))
+        raise ErrorScopus(f"Sin respuesta: {url}")
+
+    # ---------- autores ----------
+
+    async def _lote(self, ids: List[str], campos: Optional[str]) -> Dict[str, dict]:
+        # con `campos` la respuesta es parcial: no se guarda en la caché de autores
+        params = {"field": campos} if campos else {}
+        try:
+            if len(ids) == 1:
+                # un solo autor: endpoint individual, que admite revalidación condicional
+                datos = await self.get(f"{RUTA_AUTOR}/{ids[0]}",
+                                       cache_clave=None if campos else (RUTA_AUTOR, ids[0]), **params)
+            else:
+                datos = await self.get("/content/author", author_id=",".join(ids), **params)
+        except ErrorScopus as e:
+            if e.estado not in (400, 404):
+                raise
+            if len(ids) == 1:
+                return {ids[0]: {"error": str(e)}}
+            # un ID inválido tumba el lote entero: se parte hasta aislarlo
+            mitad = len(ids) // 2
+            a, b = await asyncio.gather(self._lote(ids[:mitad], campos), self._lote(ids[mitad:], campos))
+            return {**a, **b}
+
+        por_autor = {}
+        for respuesta in respuestas_autor(datos):
+            author_id = id_de_respuesta(respuesta)
+            if author_id:
+                por_autor[author_id] = respuesta
+        if len(ids) > 1 and not campos:
+            # cada autor queda en caché con la forma de la respuesta individual
+            self.cache.fallos += len(por_autor)
+            self.cache.guardar_varios(RUTA_AUTOR, {
+                k: {"author-retrieval-response": [v]} for k, v in por_autor.items()})
+
+        salida = {k: v.get("coredata", {}) for k, v in por_autor.items()}
+        for author_id in ids:
+            salida.setdefault(author_id, {"error": "No encontrado en Scopus"})
+        return salida
+
+    # ---------- documentos y h-index ----------
+
+    async def documentos_autor(self, author_id: str, por_pagina: int = MAX_POR_PAGINA,
+                               ordenado: bool = True) -> AsyncIterator[Tuple[str, int]]:
+        """
+        (scopus_id, citas) de cada documento del autor, página a página con el
+        cursor de Scopus Search. Si el consumidor deja de iterar no se piden más páginas.
+        """
+        params = {"query": f"AU-ID({author_id})", "field": "dc:identifier,citedby-count",
+                  "count": min(por_pagina, MAX_POR_PAGINA)}
+        if ordenado:
+            params["sort"] = "-citedby-count"
+        cursor, leidos = "*", 0
+        while True:
+            resultados = (await self.get(RUTA_BUSQUEDA, cursor=cursor, **params)).get("search-results", {})
+            entradas = [e for e in resultados.get("entry", []) if "error" not in e]
+            for e in entradas:
+                yield e.get("dc:identifier", ""), int(e.get("citedby-count") or 0)
+            leidos += len(entradas)
+            siguiente = resultados.get("cursor", {}).get("@next")
+            # @next viene aun en la última página: totalResults evita pedir una página vacía
+            total = int(resultados.get("opensearch:totalResults") or 0)
+            if not entradas or not siguiente or siguiente == cursor or (total and leidos >= total):
+                return
+            cursor = siguiente
+
+    async def h_index(self, author_id: str, coredata: Optional[dict] = None,
+                      por_pagina: int = MAX_POR_PAGINA, ordenado: bool = True) -> int:
+        """h-index del autor; reutiliza la caché si su huella (coredata) no cambió."""
+        huella = huella_autor(coredata) if coredata else None
+        entrada = self.cache.buscar(CACHE_H, author_id)
+        if entrada and huella and entrada.datos.get("huella") == huella and self.cache.max_age > 0:
+            self.cache.aciertos += 1
+            return entrada.datos["h"]
+
+        calculo = HIndice()
+        documentos = self.documentos_autor(author_id, por_pagina, ordenado)
+        async for documento, citas in documentos:
+            if ordenado and citas <= calculo.h:
+                break  # en orden descendente ningún documento posterior sube el h
+            calculo.agregar(citas, documento)
+        await documentos.aclose()
+
+        self.cache.fallos += 1
+        if huella:
+            self.cache.guardar(CACHE_H, author_id, {"huella": huella, "h": calculo.h,
+                                                    "documentos": calculo.documentos()})
+        return calculo.h
+
+    async def h_indices(self, autores: Dict[str, dict], por_pagina: int = MAX_POR_PAGINA,
+                        ordenado: bool = True,
+                        al_terminar: Optional[Callable[[str, object], None]] = None) -> Dict[str, object]:
+        """
+        {author_id: h o mensaje de error} para cada autor ({author_id: coredata}), en
+        paralelo. al_terminar(author_id, h) se llama con cada uno según termina.
+        """
+        async def uno(author_id, coredata):
+            try:
+                h = await self.h_index(author_id, coredata, por_pagina, ordenado)
+            except ErrorScopus as e:
+                h = f"Error: {e}"
+            if al_terminar:
+                al_terminar(author_id, h)
+            return author_id, h
+
+        return dict(await asyncio.gather(*[uno(k, v) for k, v in autores.items()]))
+
+    async def _lote_seguro(self, ids: List[str], campos: Optional[str]) -> Dict[str, dict]:
+        """Como _lote, pero un fallo (red, cuota...) solo marca con error los IDs de ese lote."""
+        try:
+            return await self._lote(ids, campos)
+        except ErrorScopus as e:
+            return {author_id: {"error": str(e)} for author_id in ids}
+
+    async def autores(self, ids: Iterable[str], tamano_lote: int = MAX_IDS_POR_LOTE,
+                      campos: Optional[str] = None) -> Dict[str, dict]:
+        """
+        coredata de cada author_id (o {"error": ...}). IDs repetidos se consultan una
+        vez y los que están frescos en la caché no se consultan.
+        """
+        salida, pendientes = {}, []
+        for author_id in dict.fromkeys(str(i) for i in ids if i):
+            entrada = None if campos else self.cache.buscar(RUTA_AUTOR, author_id)
+            if entrada and entrada.fresca:
+                self.cache.aciertos += 1
+                salida[author_id] = respuestas_autor(entrada.datos)[0].get("coredata", {})
+            else:
+                pendientes.append(author_id)
+        resultados = await asyncio.gather(*[self._lote_seguro(lote, campos) for lote in lotes(pendientes, tamano_lote)])
+        for r in resultados:
+            salida.update(r)
+        return salida
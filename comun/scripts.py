@@ -0,0 +1,37 @@
+"""
+Carga de los scripts del repositorio como módulos.
+
+Las carpetas tienen espacios y guiones en el nombre, así que no se pueden
+importar con `import`. Cada script se carga una sola vez por su ruta; su
+main() no corre porque está protegido por `if __name__ == "__main__"`.
+
+    DNDA = cargar_script("extraer informacion DNDA-/DNDA.py")
+    filas = DNDA.datos_de_texto(texto, "certificado.pdf")
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Optional
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def cargar_script(ruta_relativa: str, nombre: Optional[str] = None) -> ModuleType:
+    """Importa RAIZ/ruta_relativa con el nombre `nombre` (por defecto, el del archivo)."""
+    ruta = RAIZ / ruta_relativa
+    nombre = nombre or ruta.stem
+    if nombre in sys.modules:
+        return sys.modules[nombre]
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"No se puede cargar {ruta}")
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nombre] = modulo  # antes de ejecutarlo, como hace import
+    try:
+        spec.loader.exec_module(modulo)
+    except BaseException:
+        del sys.modules[nombre]
+        raise
+    return modulo
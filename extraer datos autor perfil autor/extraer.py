@@ -1,74 +1,153 @@
 import pandas as pd
-import re
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import load_workbook
 
 # Archivo de entrada y salida
 input_file = "Formato_perfil_autores.xlsx"
 output_file = "autores_consolidados_limpio.xlsx"
 
-# Cargar el archivo original
-excel = pd.ExcelFile(input_file)
-autores = []
+# Columnas que se conservan de cada hoja
+COLUMNAS_CLAVE = [
+    "Nombres", "Apellidos", "Número de identificación",
+    "Nacionalidad", "Correo electrónico", "Teléfono",
+    "Rectoría", "Rol", "Filiación institucional (Si es autor externo)"
+]
+
+# Textos que no son nombres válidos (expresiones regulares, sin distinguir mayúsculas)
+PATRONES_EXCLUIR = [
+    "Huella digital", "Descripción", "CvLAC", "ORCID",
+    "Google Scholar", "ResearchGate", "Código", "https://",
+    "www.", "Autor", "autora"
+]
+RE_EXCLUIR = "|".join(f"(?:{p})" for p in PATRONES_EXCLUIR)
+
+HOJAS_POR_PROCESO = 10   # con menos hojas no compensa abrir el libro en otro proceso
+
+
+def limpiar(valor):
+    return valor.strip() if isinstance(valor, str) else valor
 
-# Recorremos todas las hojas
-for sheet in excel.sheet_names:
-    try:
-        df = excel.parse(sheet, header=None)
 
-        # Buscar la fila que contiene 'Nombres'
-        header_row = None
-        for i, row in df.iterrows():
-            if row.astype(str).str.contains("Nombres", case=False, na=False).any():
-                header_row = i
-                break
+def fila_encabezado(filas):
+    """Índice de la primera fila con una celda que contiene 'Nombres', o None."""
+    for i, fila in enumerate(filas):
+        if any(v is not None and "nombres" in str(v).lower() for v in fila):
+            return i
+    return None
 
-        if header_row is None:
+
+def procesar_hoja(sheet, filas):
+    """
+    (columnas presentes, filas de datos) de una hoja ya leída (lista de tuplas de
+    valores), o None si no tiene encabezado. Cada fila trae todas las
+    COLUMNAS_CLAVE (None si la hoja no la tiene) y al final el nombre de la hoja.
+    """
+    header_row = fila_encabezado(filas)
+    if header_row is None:
+        return None
+
+    # Posición de cada columna relevante (la primera si el encabezado se repite)
+    posiciones = {}
+    for j, valor in enumerate(filas[header_row]):
+        if valor in COLUMNAS_CLAVE and valor not in posiciones:
+            posiciones[valor] = j
+    for obligatoria in ("Nombres", "Apellidos"):
+        if obligatoria not in posiciones:
+            raise KeyError(f"falta la columna '{obligatoria}' en la fila de encabezado")
+    indices = [posiciones.get(col) for col in COLUMNAS_CLAVE]
+
+    # Una sola pasada por las celdas: se toman las columnas y se limpian espacios.
+    # Las filas sin Nombres o Apellidos se descartan aquí mismo.
+    i_nombres, i_apellidos = posiciones["Nombres"], posiciones["Apellidos"]
+    datos = []
+    for fila in filas[header_row + 1:]:
+        if len(fila) <= max(i_nombres, i_apellidos) or fila[i_nombres] is None or fila[i_apellidos] is None:
             continue
+        datos.append([limpiar(fila[j]) if j is not None and j < len(fila) else None for j in indices] + [sheet])
+    return set(posiciones), datos
+
+
+def filtrar(df):
+    """Quita los textos que no son nombres válidos, con una sola expresión para todo el consolidado."""
+    excluir = df["Nombres"].astype("string").str.contains(RE_EXCLUIR, case=False, regex=True, na=False)
+    return df[~excluir].reset_index(drop=True)
+
+
+def procesar_libro(ruta, hojas):
+    """[(hoja, resultado de procesar_hoja, error o None)] leyendo el libro en modo solo lectura, una vez por hoja."""
+    wb = load_workbook(ruta, read_only=True, data_only=True)
+    salida = []
+    try:
+        for sheet in hojas:
+            try:
+                filas = list(wb[sheet].iter_rows(values_only=True))
+                salida.append((sheet, procesar_hoja(sheet, filas), None))
+            except Exception as e:
+                salida.append((sheet, None, str(e)))
+    finally:
+        wb.close()
+    return salida
+
+
+def consolidar(ruta, procesos=None):
+    """DataFrame con los autores de todas las hojas, en el orden del libro."""
+    wb = load_workbook(ruta, read_only=True)
+    hojas = wb.sheetnames
+    wb.close()
+
+    procesos = procesos or min(os.cpu_count() or 1, -(-len(hojas) // HOJAS_POR_PROCESO))
+    procesos = max(1, min(procesos, len(hojas)))
+    if procesos == 1:
+        resultados = procesar_libro(ruta, hojas)
+    else:
+        # hojas intercaladas para repartir parejo las hojas grandes y las pequeñas
+        grupos = [hojas[k::procesos] for k in range(procesos)]
+        with ProcessPoolExecutor(max_workers=procesos) as pool:
+            resultados = [r for parte in pool.map(procesar_libro, [ruta] * procesos, grupos) for r in parte]
+
+    por_hoja = {sheet: (hoja, error) for sheet, hoja, error in resultados}
+    presentes, filas = set(), []
+    for sheet in hojas:
+        hoja, error = por_hoja[sheet]
+        if error:
+            print(f"⚠️ Error en {sheet}: {error}")
+        elif hoja is not None:
+            presentes |= hoja[0]
+            filas.extend(hoja[1])
+    print(f"📑 {len(hojas)} hojas leídas con {procesos} proceso(s)")
+    if not filas:
+        return None
+
+    # Un solo DataFrame para todas las hojas; las columnas que ninguna hoja trae no se incluyen
+    df = pd.DataFrame(filas, columns=COLUMNAS_CLAVE + ["Hoja"], dtype=object)
+    df = df[[col for col in COLUMNAS_CLAVE if col in presentes] + ["Hoja"]]
+    return filtrar(df).infer_objects()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entrada", default=input_file, help="Libro con una hoja de perfil por autor o capítulo")
+    ap.add_argument("--salida", default=output_file)
+    ap.add_argument("--procesos", type=int,
+                    help=f"Procesos en paralelo (por defecto uno por núcleo, con al menos "
+                         f"{HOJAS_POR_PROCESO} hojas por proceso)")
+    args = ap.parse_args()
+
+    inicio = time.time()
+    consolidado = consolidar(args.entrada, args.procesos)
+
+    # Unir todas las hojas
+    if consolidado is not None:
+        consolidado.to_excel(args.salida, index=False)
+        print(f"✅ Consolidado limpio generado: {args.salida} "
+              f"({len(consolidado)} autores en {time.time() - inicio:.1f} s)")
+    else:
+        print("No se encontraron autores válidos.")
+
 
-        # Leer nuevamente la hoja desde esa fila como encabezado
-        df = excel.parse(sheet, header=header_row)
-
-        # Filtrar columnas relevantes
-        columnas_clave = [
-            "Nombres", "Apellidos", "Número de identificación",
-            "Nacionalidad", "Correo electrónico", "Teléfono",
-            "Rectoría", "Rol", "Filiación institucional (Si es autor externo)"
-        ]
-        df = df[[col for col in columnas_clave if col in df.columns]]
-
-        # Agregar nombre de la hoja (capítulo)
-        df["Hoja"] = sheet
-
-        # --- LIMPIEZA ---
-        # Quitar filas completamente vacías
-        df = df.dropna(how="all")
-
-        # Quitar textos que no son nombres válidos
-        patrones_excluir = [
-            "Huella digital", "Descripción", "CvLAC", "ORCID",
-            "Google Scholar", "ResearchGate", "Código", "https://",
-            "www.", "Autor", "autora"
-        ]
-        mask = df["Nombres"].astype(str).apply(
-            lambda x: not any(re.search(pat, x, re.IGNORECASE) for pat in patrones_excluir)
-        )
-        df = df[mask]
-
-        # Quitar filas donde Nombres o Apellidos estén vacíos
-        df = df[df["Nombres"].notna() & df["Apellidos"].notna()]
-
-        # Limpiar espacios
-        df = df.applymap(lambda x: x.strip() if isinstance(x, str) else x)
-
-        # Agregar al consolidado
-        autores.append(df)
-
-    except Exception as e:
-        print(f"⚠️ Error en {sheet}: {e}")
-
-# Unir todas las hojas
-if autores:
-    consolidado = pd.concat(autores, ignore_index=True)
-    consolidado.to_excel(output_file, index=False)
-    print(f"✅ Consolidado limpio generado: {output_file}")
-else:
-    print("No se encontraron autores válidos.")
+if __name__ == "__main__":
+    main()
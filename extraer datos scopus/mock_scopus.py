@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API de Scopus simulada para probar scopus_scraping.py sin gastar cuota.
+
+Implementa lo que usa comun/scopus.py:
+
+  GET /content/author?author_id=id1,id2,...     -> author-retrieval-response-list (máx. 25 IDs)
+  GET /content/author/author_id/<id>            -> author-retrieval-response (un autor, con
+                                                   ETag/Last-Modified y 304 condicional)
+  GET /content/search/scopus?query=AU-ID(<id>)  -> documentos del autor con citedby-count,
+      &cursor=*&count=25[&sort=-citedby-count]     paginados con cursor (count máx. 25)
+
+Se comporta como la API real en lo que importa para el cliente:
+  - exige la cabecera X-ELS-APIKey (401 si falta);
+  - devuelve X-RateLimit-Limit/Remaining/Reset con una cuota por ventana
+    (--cuota, --ventana) y 429 al agotarla o al pasar de --por-segundo;
+  - un ID que empieza por 9 no existe: solo, responde 404; en un lote, 400
+    (el cliente debe partir el lote para aislarlo);
+  - --fallos inyecta 500/503 aleatorios.
+
+Los datos de cada autor se derivan de su ID (siempre los mismos); el 5 % tiene
+entre 500 y 1500 documentos. document-count y citation-count coinciden con
+los documentos que devuelve la búsqueda, y /mock/h/<id> da el h-index exacto.
+
+Uso:
+  python mock_scopus.py --puerto 8766 --por-segundo 5 --fallos 0.05
+  python scopus_scraping.py --api-base http://127.0.0.1:8766
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import formatdate
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+MAX_IDS = 25
+MAX_COUNT = 25
+INICIO = time.time()  # Last-Modified de todos los autores
+
+
+@lru_cache(maxsize=4096)
+def documentos(author_id):
+    """[(scopus_id, citas)] en orden de publicación (más reciente primero)."""
+    rng = random.Random(author_id)
+    n = rng.randint(500, 1500) if rng.random() < 0.05 else rng.randint(1, 150)
+    return [(f"SCOPUS_ID:{85000000000 + rng.randint(0, 10 ** 9)}", int(rng.paretovariate(1.2)) - 1 + rng.randint(0, 3))
+            for _ in range(n)]
+
+
+def h_index(author_id):
+    citas = sorted((c for _, c in documentos(author_id)), reverse=True)
+    return sum(1 for i, c in enumerate(citas, 1) if c >= i)
+
+
+def autor(author_id):
+    docs = documentos(author_id)
+    citas = sum(c for _, c in docs)
+    return {
+        "@_fa": "true",
+        "coredata": {
+            "prism:url": f"https://api.elsevier.com/content/author/author_id/{author_id}",
+            "dc:identifier": f"AUTHOR_ID:{author_id}",
+            "eid": f"9-s2.0-{author_id}",
+            "document-count": str(len(docs)),
+            "cited-by-count": str(int(citas * 0.9)),
+            "citation-count": str(citas),
+        },
+    }
+
+
+def busqueda(author_id, params):
+    """Página de Scopus Search; el cursor es el desplazamiento codificado."""
+    docs = documentos(author_id)
+    if params.get("sort", [""])[0] == "-citedby-count":
+        docs = sorted(docs, key=lambda d: -d[1])
+    cursor = params.get("cursor", ["*"])[0]
+    inicio = 0 if cursor == "*" else int(base64.urlsafe_b64decode(cursor.encode()).decode())
+    count = int(params.get("count", ["25"])[0])
+    trozo = docs[inicio:inicio + count]
+    siguiente = base64.urlsafe_b64encode(str(inicio + count).encode()).decode()
+    entradas = [{"dc:identifier": d, "citedby-count": str(c)} for d, c in trozo] \
+        or [{"@_fa": "true", "error": "Result set was empty"}]
+    return {"search-results": {
+        "opensearch:totalResults": str(len(docs)),
+        "opensearch:startIndex": str(inicio),
+        "opensearch:itemsPerPage": str(len(trozo)),
+        "cursor": {"@current": cursor, "@next": siguiente},
+        "entry": entradas,
+    }}
+
+
+def existe(author_id):
+    return author_id.isdigit() and not author_id.startswith("9")
+
+
+class Cuota:
+    """Cupo por ventana y límite por segundo, compartidos por todos los hilos del servidor."""
+
+    def __init__(self, cuota, ventana, por_segundo):
+        self.cuota = cuota
+        self.ventana = ventana
+        self.por_segundo = por_segundo
+        self.lock = threading.Lock()
+        self.inicio = time.time()
+        self.usadas = 0
+        self.segundo = (0, 0)  # (segundo entero, peticiones en él)
+
+    def consumir(self):
+        """(aceptada, restante, reinicio epoch)."""
+        with self.lock:
+            ahora = time.time()
+            if ahora - self.inicio >= self.ventana:
+                self.inicio, self.usadas = ahora, 0
+            reinicio = self.inicio + self.ventana
+            seg, n = self.segundo
+            if int(ahora) != seg:
+                seg, n = int(ahora), 0
+            if self.usadas >= self.cuota or (self.por_segundo and n >= self.por_segundo):
+                self.segundo = (seg, n)
+                return False, max(0, self.cuota - self.usadas), reinicio
+            self.usadas += 1
+            self.segundo = (seg, n + 1)
+            return True, self.cuota - self.usadas, reinicio
+
+
+class Manejador(BaseHTTPRequestHandler):
+    cuota: Cuota = None
+    latencia = 0.0
+    fallos = 0.0
+    verboso = False
+    contador = Counter()
+    _azar = random.Random(0)
+
+    def log_message(self, formato, *args):
+        if self.verboso:
+            super().log_message(formato, *args)
+
+    def _json(self, datos, estado=200, cabeceras=None):
+        cuerpo = json.dumps(datos).encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for k, v in (cabeceras or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _error(self, estado, mensaje, cabeceras=None):
+        self.contador[estado] += 1
+        self._json({"service-error": {"status": {"statusCode": str(estado), "statusText": mensaje}}},
+                   estado, cabeceras)
+
+    def do_GET(self):
+        if self.latencia:
+            time.sleep(self.latencia)
+        partes = urlsplit(self.path)
+        params = parse_qs(partes.query)
+        ruta = partes.path.rstrip("/")
+
+        if ruta == "/mock/estadisticas":
+            return self._json(dict(self.contador))
+        if ruta.startswith("/mock/h/"):
+            return self._json({"h": h_index(ruta.rsplit("/", 1)[1])})
+        if not self.headers.get("X-ELS-APIKey"):
+            return self._error(401, "AUTHENTICATION_ERROR")
+
+        aceptada, restante, reinicio = self.cuota.consumir()
+        limites = {"X-RateLimit-Limit": str(self.cuota.cuota), "X-RateLimit-Remaining": str(restante),
+                   "X-RateLimit-Reset": str(int(reinicio))}
+        if not aceptada:
+            return self._error(429, "QUOTA_EXCEEDED - Quota Exceeded", limites)
+        with self.cuota.lock:
+            fallar = self._azar.random() < self.fallos
+        if fallar:
+            return self._error(self._azar.choice([500, 503]), "GENERAL_SYSTEM_ERROR", limites)
+
+        if ruta == "/content/search/scopus":
+            m = re.fullmatch(r"AU-ID\((\d+)\)", params.get("query", [""])[0].strip())
+            if not m:
+                return self._error(400, "INVALID_INPUT - solo se simula query=AU-ID(<id>)", limites)
+            if int(params.get("count", ["25"])[0]) > MAX_COUNT:
+                return self._error(400, "INVALID_INPUT - Exceeds the maximum number allowed for the service level",
+                                   limites)
+            self.contador["paginas"] += 1
+            self.contador[200] += 1
+            return self._json(busqueda(m.group(1), params), cabeceras=limites)
+
+        if ruta.startswith("/content/author/author_id/"):
+            author_id = ruta.rsplit("/", 1)[1]
+            self.contador["autores"] += 1
+            if not existe(author_id):
+                return self._error(404, "RESOURCE_NOT_FOUND", limites)
+            datos = {"author-retrieval-response": [autor(author_id)]}
+            etag = '"%s"' % hashlib.md5(json.dumps(datos, sort_keys=True).encode()).hexdigest()
+            validadores = {"ETag": etag, "Last-Modified": formatdate(INICIO, usegmt=True)}
+            if self.headers.get("If-None-Match") == etag:
+                self.contador[304] += 1
+                self.send_response(304)
+                for k, v in {**limites, **validadores}.items():
+                    self.send_header(k, v)
+                return self.end_headers()
+            self.contador[200] += 1
+            return self._json(datos, cabeceras={**limites, **validadores})
+
+        if ruta == "/content/author":
+            ids = [i for i in ",".join(params.get("author_id", [])).split(",") if i]
+            if not ids or len(ids) > MAX_IDS:
+                return self._error(400, f"INVALID_INPUT - se admiten entre 1 y {MAX_IDS} author_id", limites)
+            self.contador["autores"] += len(ids)
+            if not all(existe(i) for i in ids):
+                return self._error(404 if len(ids) == 1 else 400, "RESOURCE_NOT_FOUND", limites)
+            self.contador[200] += 1
+            return self._json({"author-retrieval-response-list": {
+                "author-retrieval-response": [autor(i) for i in ids]}}, cabeceras=limites)
+
+        self._error(404, f"Ruta no soportada por el mock: {ruta}")
+
+
+def crear_servidor(puerto=8766, latencia_ms=0, fallos=0.0, cuota=20000, ventana=3600, por_segundo=0):
+    manejador = type("ManejadorScopus", (Manejador,), {
+        "cuota": Cuota(cuota, ventana, por_segundo), "latencia": latencia_ms / 1000,
+        "fallos": fallos, "contador": Counter(),
+    })
+    return ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--puerto", type=int, default=8766)
+    ap.add_argument("--latencia", type=float, default=0, help="Milisegundos de espera por petición")
+    ap.add_argument("--fallos", type=float, default=0.0, help="Fracción de respuestas 500/503")
+    ap.add_argument("--cuota", type=int, default=20000, help="Peticiones permitidas por ventana")
+    ap.add_argument("--ventana", type=float, default=3600, help="Segundos hasta que se renueva la cuota")
+    ap.add_argument("--por-segundo", type=int, default=0, help="Límite de peticiones por segundo (0 = sin límite)")
+    ap.add_argument("--verboso", action="store_true", help="Muestra cada petición")
+    args = ap.parse_args()
+
+    Manejador.verboso = args.verboso
+    servidor = crear_servidor(args.puerto, args.latencia, args.fallos, args.cuota, args.ventana, args.por_segundo)
+    print(f"🧪 Scopus simulado en http://127.0.0.1:{args.puerto} (Ctrl+C para terminar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("📊", dict(servidor.RequestHandlerClass.contador))
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
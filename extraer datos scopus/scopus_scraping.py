@@ -1,7 +1,14 @@
-import pandas as pd
-import requests
-import re
+import os
+import sys
 import time
+import asyncio
+import argparse
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.bitacora import Bitacora
+from comun.cache_http import SIN_CACHE, CacheHTTP
+from comun.scopus import BASE, MAX_IDS_POR_LOTE, MAX_POR_PAGINA, ClienteScopus
 
 # ===============================
 # CREDENCIALES SCOPUS (INSTITUCIONAL)
@@ -15,42 +22,71 @@ INST_TOKEN = "87453dca35793144e15c757c9d486db5"
 EXCEL_IN = "scopus.xlsx"
 EXCEL_OUT = "scopus_completo_api.xlsx"
 
-
 # ===============================
-# UTILIDADES
+# RITMO DE CONSULTA
 # ===============================
-def extraer_author_id(url):
-    if pd.isna(url):
-        return None
-    m = re.search(r"authorId=(\d+)", str(url))
-    return m.group(1) if m else None
-
-
-def consultar_autor_scopus(author_id):
-    url = f"https://api.elsevier.com/content/author/author_id/{author_id}"
-
-    headers = {
-        "X-ELS-APIKey": API_KEY,
-        "X-ELS-Insttoken": INST_TOKEN,
-        "Accept": "application/json"
-    }
-
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-
-    data = r.json()["author-retrieval-response"][0]["coredata"]
+TASA = 2            # peticiones por segundo como máximo (se reduce según X-RateLimit)
+CONCURRENCIA = 3    # lotes en vuelo a la vez
 
-    documentos = int(data.get("document-count", 0))
-    citaciones = int(data.get("citation-count", 0))
 
-    return documentos, citaciones
+# ===============================
+# UTILIDADES
+# ===============================
+RE_AUTHOR_ID = r"authorId=(\d+)"
+
+
+def extraer_author_ids(urls):
+    """authorId de cada URL de la columna (NA si no hay), con una sola pasada vectorizada."""
+    return urls.astype("string").str.extract(RE_AUTHOR_ID, expand=False)
+
+
+def consultar_autores_scopus(author_ids, api_base=BASE, tasa=TASA, concurrencia=CONCURRENCIA,
+                             tamano_lote=MAX_IDS_POR_LOTE, cache=SIN_CACHE, calcular_h=True,
+                             por_pagina=MAX_POR_PAGINA, registrar=None):
+    """
+    ({author_id: coredata}, {author_id: h-index}, cliente) consultando cada ID una
+    sola vez, en lotes y en paralelo. El h-index se calcula con Scopus Search.
+    registrar(author_id, coredata, h) se llama con cada autor según termina.
+    """
+    async def consultar():
+        async with ClienteScopus(API_KEY, INST_TOKEN, base=api_base, tasa=tasa,
+                                 concurrencia=concurrencia, cache=cache) as cliente:
+            datos = await cliente.autores(author_ids, tamano_lote)
+            encontrados = {k: v for k, v in datos.items() if "error" not in v}
+            if registrar:
+                for author_id, coredata in datos.items():
+                    if author_id not in encontrados or not calcular_h:
+                        registrar(author_id, coredata, None)
+            hs = {}
+            if calcular_h:
+                hs = await cliente.h_indices(
+                    encontrados, por_pagina,
+                    al_terminar=(lambda author_id, h: registrar(author_id, datos[author_id], h)) if registrar else None)
+            return datos, hs, cliente
+
+    return asyncio.run(consultar())
 
 
 # ===============================
 # PROCESO PRINCIPAL
 # ===============================
 def main():
-    df = pd.read_excel(EXCEL_IN)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--entrada", default=EXCEL_IN)
+    ap.add_argument("--salida", default=EXCEL_OUT)
+    ap.add_argument("--api-base", default=BASE, help="Raíz de la API (p. ej. http://127.0.0.1:8766 para el mock)")
+    ap.add_argument("--tasa", type=float, default=TASA, help="Peticiones por segundo como máximo")
+    ap.add_argument("--concurrencia", type=int, default=CONCURRENCIA, help="Lotes consultados en paralelo")
+    ap.add_argument("--lote", type=int, default=MAX_IDS_POR_LOTE, help=f"author_id por llamada (máx. {MAX_IDS_POR_LOTE})")
+    ap.add_argument("--sin-h", action="store_true", help="No calcular el h-index (ahorra llamadas a Scopus Search)")
+    ap.add_argument("--por-pagina", type=int, default=MAX_POR_PAGINA,
+                    help=f"Documentos por página de Scopus Search (máx. {MAX_POR_PAGINA})")
+    CacheHTTP.agregar_argumentos(ap)
+    Bitacora.agregar_argumentos(ap, vigencia=False)  # usa --max-age
+    args = ap.parse_args()
+    cache = CacheHTTP.desde_args(args)
+
+    df = pd.read_excel(args.entrada)
 
     if "Citaciones en Scopus" not in df.columns:
         df["Citaciones en Scopus"] = ""
@@ -60,29 +96,77 @@ def main():
 
     if "Índice H Scopus" not in df.columns:
         df["Índice H Scopus"] = "NO DISPONIBLE (API SCOPUS)"
-
-    for i, row in df.iterrows():
-        nombre = row.get("Nombre Apellido", f"Fila {i}")
-        author_id = extraer_author_id(row.get("Scopus"))
-
-        if not author_id:
-            print(f"⏭️ {nombre} — sin authorId")
+    df["Índice H Scopus"] = df["Índice H Scopus"].astype(object)
+
+    ids = extraer_author_ids(df["Scopus"]) if "Scopus" in df.columns else pd.Series(pd.NA, index=df.index,
+                                                                                     dtype="string")
+    unicos = ids.dropna().unique().tolist()
+    lote = max(1, min(args.lote, MAX_IDS_POR_LOTE))
+    print(f"🔎 {len(unicos)} authorId únicos en {len(df)} filas → {-(-len(unicos) // lote)} lotes de hasta {lote}")
+
+    # autores terminados en una corrida anterior (sin h-index no cuentan si ahora se pide); pasado
+    # --max-age se vuelven a consultar, igual que las respuestas de la caché HTTP
+    bitacora = Bitacora.desde_args(args, args.salida, vigencia=args.max_age)
+    hechos = {a: bitacora.datos(a) for a in unicos
+              if bitacora.hecha(a) and (args.sin_h or bitacora.datos(a).get("h") is not None)}
+    pendientes = [a for a in unicos if a not in hechos]
+
+    def registrar(author_id, coredata, h):
+        if "error" in coredata:
+            bitacora.registrar(author_id, error=coredata["error"])
+        elif isinstance(h, str):
+            bitacora.registrar(author_id, error=h)
+        else:
+            bitacora.registrar(author_id, {"document-count": coredata.get("document-count", 0),
+                                           "citation-count": coredata.get("citation-count", 0), "h": h})
+
+    inicio = time.time()
+    try:
+        datos, hs, cliente = consultar_autores_scopus(pendientes, args.api_base, args.tasa, args.concurrencia, lote,
+                                                      cache, not args.sin_h, args.por_pagina, registrar)
+    finally:
+        bitacora.cerrar()
+    for author_id, hecho in hechos.items():
+        datos[author_id] = hecho
+        if hecho.get("h") is not None:
+            hs[author_id] = hecho["h"]
+
+    # Un resultado por authorId; se reparte a todas las filas que lo comparten con un join
+    nombres = df["Nombre Apellido"] if "Nombre Apellido" in df.columns else pd.Series(
+        [f"Fila {i}" for i in df.index], index=df.index)
+    for nombre in nombres[ids.isna()]:
+        print(f"⏭️ {nombre} — sin authorId")
+    nombre_de = nombres[ids.notna()].groupby(ids[ids.notna()]).agg(lambda n: ", ".join(map(str, n)))
+
+    resultados = {}
+    for author_id in unicos:
+        data = datos.get(author_id, {})
+        if "error" in data:
+            print(f"❌ ERROR {nombre_de[author_id]}: {data['error']}")
             continue
-
-        try:
-            docs, cites = consultar_autor_scopus(author_id)
-
-            df.at[i, "Número de documentos en Scopus con citaciones"] = docs
-            df.at[i, "Citaciones en Scopus"] = cites
-
-            print(f"✔ {nombre} → Docs: {docs} | Citas: {cites}")
-            time.sleep(1)
-
-        except Exception as e:
-            print(f"❌ ERROR {nombre}: {e}")
-
-    df.to_excel(EXCEL_OUT, index=False)
-    print("\n✅ Archivo generado:", EXCEL_OUT)
+        docs = int(data.get("document-count", 0))
+        cites = int(data.get("citation-count", 0))
+        h = hs.get(author_id)
+        resultados[author_id] = (docs, cites, h)
+        print(f"✔ {nombre_de[author_id]} → Docs: {docs} | Citas: {cites}" + (f" | H: {h}" if h is not None else ""))
+
+    columnas = ["Número de documentos en Scopus con citaciones", "Citaciones en Scopus", "Índice H Scopus"]
+    tabla = pd.DataFrame.from_dict(resultados, orient="index", columns=columnas)
+    unido = ids.to_frame("authorId").join(tabla, on="authorId")
+    encontradas = unido[columnas[0]].notna()
+    df.loc[encontradas, columnas[:2]] = unido.loc[encontradas, columnas[:2]].astype(int)
+    con_h = unido[columnas[2]].notna()
+    df.loc[con_h, columnas[2]] = unido.loc[con_h, columnas[2]]
+
+    errores = sum("error" in d for d in datos.values())
+    print(f"\n📊 {len(unicos) - errores}/{len(unicos)} autores en {cliente.llamadas} llamadas "
+          f"({time.time() - inicio:.1f} s); cuota restante: {cliente.restante if cliente.restante is not None else '?'}")
+    print(f"🗄️ {cache.resumen()}")
+    print(f"🗒️ {bitacora.resumen()}")
+    cache.cerrar()
+
+    df.to_excel(args.salida, index=False)
+    print("\n✅ Archivo generado:", args.salida)
 
 
 if __name__ == "__main__":
@@ -1,13 +1,42 @@
 import pandas as pd
-import requests
-import time
+import argparse
+import hashlib
+import json
 import os
 import re
+import shutil
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup
 
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
-from selenium.webdriver.common.by import By
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.bitacora import Bitacora
+from comun.descargas import Descargador, Tarea, extension_imagen, validar_imagen
+from comun.limites import CuboTokensHilos
+
+
+# -------------------------------------------------
+# Configuración
+# -------------------------------------------------
+
+EXCEL_IN = "urls.xlsx"
+EXCEL_OUT = "urls_con_fotos.xlsx"
+CARPETA = "fotos"
+HILOS = 4
+TASA = 2            # perfiles por segundo a Google Scholar (más rápido dispara el captcha)
+UMBRAL_AVATAR = 3   # una misma imagen en 3 o más perfiles es el avatar por defecto
+RE_AVATAR = re.compile(r"avatar_scholar|/citations/images/", re.IGNORECASE)
+CABECERAS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                  "(KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Referer": "https://scholar.google.com/",
+    "Accept-Language": "es-CO,es;q=0.9",
+}
 
 
 # -------------------------------------------------
@@ -17,94 +46,282 @@ from selenium.webdriver.common.by import By
 def sanitize_filename(name: str) -> str:
     return re.sub(r'[\\/*?:"<>|]', "", name).replace(" ", "_")
 
-def download_image_with_cookies(driver, url, filename, folder="fotos"):
-    os.makedirs(folder, exist_ok=True)
-    path = os.path.join(folder, filename)
-
-    session = requests.Session()
-    for cookie in driver.get_cookies():
-        session.cookies.set(cookie['name'], cookie['value'])
 
-    headers = {
-        "User-Agent": "Mozilla/5.0",
-        "Referer": "https://scholar.google.com/"
-    }
+def sha256_archivo(ruta):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for trozo in iter(lambda: f.read(1 << 16), b""):
+            h.update(trozo)
+    return h.hexdigest()
+
+
+def datos_perfil(html, url_perfil):
+    """(nombre, url de la foto) desde el HTML del perfil (#gsc_prf_in, #gsc_prf_pup-img)."""
+    soup = BeautifulSoup(html, "html.parser")
+    nombre = soup.select_one("#gsc_prf_in")
+    foto = soup.select_one("#gsc_prf_pup-img")
+    if nombre is None or foto is None or not foto.get("src"):
+        if "captcha" in html.lower() or "not a robot" in html.lower():
+            raise RuntimeError("Google Scholar pidió captcha (baje --tasa o use --modo navegador)")
+        raise RuntimeError("La página no tiene el bloque de perfil de Scholar")
+    return nombre.get_text(strip=True), urljoin(url_perfil, foto["src"])
+
+
+class AlmacenFotos:
+    """
+    Fotos guardadas por contenido: fotos/_objetos/<sha256>.<ext> existe una sola
+    vez y cada cédula es un enlace duro (o copia) a su objeto. _indice.json
+    recuerda qué URL dio qué hash (no se vuelve a descargar) y qué hashes son
+    el avatar por defecto de Scholar.
+    """
+
+    def __init__(self, carpeta):
+        self.carpeta = carpeta
+        self.objetos = os.path.join(carpeta, "_objetos")
+        self.temporal = os.path.join(carpeta, "_descargas")
+        self.ruta_indice = os.path.join(carpeta, "_indice.json")
+        os.makedirs(self.objetos, exist_ok=True)
+        self._lock = threading.Lock()
+        try:
+            with open(self.ruta_indice, encoding="utf-8") as f:
+                indice = json.load(f)
+        except (OSError, ValueError):
+            indice = {}
+        self.urls = indice.get("urls", {})               # url -> nombre del objeto
+        self.avatares = set(indice.get("avatares", []))  # nombres de objeto marcados
+
+    def buscar(self, url):
+        with self._lock:
+            objeto = self.urls.get(url)
+        return objeto if objeto and os.path.exists(os.path.join(self.objetos, objeto)) else None
+
+    def guardar(self, url, ruta_descarga):
+        """Mueve la descarga a su objeto por hash (si ya existía se descarta) y devuelve el nombre."""
+        objeto = sha256_archivo(ruta_descarga) + (extension_imagen(ruta_descarga) or ".img")
+        destino = os.path.join(self.objetos, objeto)
+        with self._lock:
+            if os.path.exists(destino):
+                os.remove(ruta_descarga)
+            else:
+                os.replace(ruta_descarga, destino)
+            self.urls[url] = objeto
+            if RE_AVATAR.search(url):
+                self.avatares.add(objeto)
+        return objeto
+
+    def enlazar(self, objeto, nombre):
+        """Crea <carpeta>/<nombre> apuntando al objeto (enlace duro; copia si no se puede)."""
+        origen = os.path.join(self.objetos, objeto)
+        destino = os.path.join(self.carpeta, nombre)
+        if os.path.exists(destino):
+            if os.path.samefile(origen, destino):
+                return
+            os.remove(destino)
+        try:
+            os.link(origen, destino)
+        except OSError:
+            shutil.copyfile(origen, destino)
+
+    def marcar_avatares(self, objetos_por_fila, umbral=UMBRAL_AVATAR):
+        """Marca como avatar los objetos que aparecen en `umbral` o más perfiles."""
+        for objeto, n in Counter(o for o in objetos_por_fila if o).items():
+            if n >= umbral:
+                self.avatares.add(objeto)
+        return self.avatares
+
+    def guardar_indice(self):
+        tmp = self.ruta_indice + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"urls": self.urls, "avatares": sorted(self.avatares)}, f, indent=1)
+        os.replace(tmp, self.ruta_indice)
 
-    response = session.get(url, headers=headers)
 
-    if response.status_code == 200:
-        with open(path, "wb") as f:
-            f.write(response.content)
-        return path
+# -------------------------------------------------
+# Descarga de una foto (compartida por ambos modos)
+# -------------------------------------------------
 
-    return None
+def descargar_foto(descargador, almacen, foto_url, cedula):
+    """Nombre del objeto de la foto (sin descargar si la URL ya está en el almacén)."""
+    objeto = almacen.buscar(foto_url)
+    if objeto:
+        return objeto
+    temporal = os.path.join(almacen.temporal, f"{cedula}.img")
+    resultado = descargador.descargar(Tarea(foto_url, temporal, validar=validar_imagen))
+    if not resultado.ok:
+        raise RuntimeError(resultado.error)
+    return almacen.guardar(foto_url, temporal)
 
 
 # -------------------------------------------------
-# Configurar Selenium
+# Modo http: HTML del perfil con requests, sin navegador
 # -------------------------------------------------
 
-options = webdriver.ChromeOptions()
-options.add_argument("--headless=new")
-options.add_argument("--disable-blink-features=AutomationControlled")
-
-driver = webdriver.Chrome(
-    service=Service(ChromeDriverManager().install()),
-    options=options
-)
+def procesar_http(filas, descargador, almacen, hilos, tasa, registrar):
+    """
+    {idx: (nombre, objeto) o Exception} bajando perfiles y fotos en un pool
+    acotado; registrar(idx, resultado) se llama con cada fila según termina.
+    """
+    cubo = CuboTokensHilos(tasa, rafaga=hilos)
+
+    def uno(url, cedula):
+        cubo.adquirir()
+        r = descargador.sesion.get(url, timeout=30)
+        if r.status_code == 429:
+            cubo.pausar(60)
+        r.raise_for_status()
+        nombre, foto_url = datos_perfil(r.text, url)
+        return nombre, descargar_foto(descargador, almacen, foto_url, cedula)
+
+    salida = {}
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        futuros = {pool.submit(uno, url, cedula): idx for idx, url, cedula in filas}
+        for f in as_completed(futuros):
+            salida[futuros[f]] = f.exception() or f.result()
+            registrar(futuros[f], salida[futuros[f]])
+    return salida
 
 
 # -------------------------------------------------
-# Leer Excel
+# Modo navegador: Selenium (por si Scholar bloquea las peticiones directas)
 # -------------------------------------------------
 
-df = pd.read_excel("urls.xlsx")
-df["foto_archivo"] = ""
+def procesar_navegador(filas, descargador, almacen, hilos, registrar):
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from webdriver_manager.chrome import ChromeDriverManager
+
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless=new")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+
+    salida, pendientes = {}, {}
+    # las fotos bajan en segundo plano mientras Selenium abre el siguiente perfil
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        for idx, url, cedula in filas:
+            print(f"Procesando: {url}")
+            try:
+                driver.get(url)
+                foto_element = WebDriverWait(driver, 15).until(
+                    EC.presence_of_element_located((By.CSS_SELECTOR, "#gsc_prf_pup-img")))
+                nombre = driver.find_element(By.CSS_SELECTOR, "#gsc_prf_in").text
+                foto_url = foto_element.get_attribute("src")
+                for cookie in driver.get_cookies():
+                    descargador.sesion.cookies.set(cookie['name'], cookie['value'])
+                futuro = pool.submit(descargar_foto, descargador, almacen, foto_url, cedula)
+                futuro.add_done_callback(
+                    lambda f, idx=idx, nombre=nombre: registrar(idx, f.exception() or (nombre, f.result())))
+                pendientes[idx] = (nombre, futuro)
+            except Exception as e:
+                salida[idx] = e
+                registrar(idx, e)
+    driver.quit()
+
+    for idx, (nombre, futuro) in pendientes.items():
+        salida[idx] = futuro.exception() or (nombre, futuro.result())
+    return salida
 
 
 # -------------------------------------------------
-# Procesar cada perfil
+# Proceso principal
 # -------------------------------------------------
 
-for idx, row in df.iterrows():
-    url = row["Google Scholar"]
-    cedula = str(row["Cédula"]).strip()
-
-    print(f"Procesando: {url}")
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--excel", default=EXCEL_IN, help="Excel con las columnas 'Google Scholar' y 'Cédula'")
+    ap.add_argument("--salida", default=EXCEL_OUT)
+    ap.add_argument("--carpeta", default=CARPETA, help="Carpeta de fotos (una por cédula)")
+    ap.add_argument("--modo", choices=["http", "navegador"], default="http",
+                    help="http: HTML del perfil sin navegador (rápido); navegador: Selenium con Chrome headless")
+    ap.add_argument("--hilos", type=int, default=HILOS, help="Perfiles/fotos en paralelo")
+    ap.add_argument("--tasa", type=float, default=TASA, help="Perfiles por segundo como máximo (modo http)")
+    Bitacora.agregar_argumentos(ap)
+    args = ap.parse_args()
+
+    df = pd.read_excel(args.excel)
+    for col in ("foto_archivo", "foto_hash", "foto_estado"):
+        df[col] = ""
+
+    almacen = AlmacenFotos(args.carpeta)
+    bitacora = Bitacora.desde_args(args, args.salida)
+    filas, resultados = [], {}
+    for idx, row in df.iterrows():
+        url = str(row["Google Scholar"]).strip()
+        if not url.startswith("http"):
+            df.at[idx, "foto_estado"] = "sin perfil de Scholar"
+            continue
+        cedula = str(row["Cédula"]).strip()
+        hecha = bitacora.datos(f"{cedula}|{url}")
+        if hecha is not None and os.path.exists(os.path.join(almacen.objetos, hecha["objeto"])):
+            resultados[idx] = (hecha["nombre"], hecha["objeto"])
+            continue
+        filas.append((idx, url, cedula))
+    cedulas = {idx: str(df.at[idx, "Cédula"]).strip() for idx in df.index}
+    urls = {idx: url for idx, url, _ in filas}
+
+    def registrar(idx, resultado):
+        clave = f"{cedulas[idx]}|{urls[idx]}"
+        if isinstance(resultado, Exception):
+            bitacora.registrar(clave, error=resultado)
+        else:
+            bitacora.registrar(clave, {"nombre": resultado[0], "objeto": resultado[1]})
 
+    descargador = Descargador(hilos=args.hilos, cabeceras=CABECERAS, reintentos=2)
+    inicio = time.time()
+    print(f"🔎 {len(filas)} perfiles por procesar ({len(resultados)} ya hechos)")
     try:
-        driver.get(url)
-        time.sleep(3)
-
-        nombre = driver.find_element(By.CSS_SELECTOR, "#gsc_prf_in").text
-        print("Nombre detectado:", nombre)
-
-        foto_element = driver.find_element(By.CSS_SELECTOR, "#gsc_prf_pup-img")
-        foto_url = foto_element.get_attribute("src")
-        print("Foto encontrada:", foto_url)
-
+        if args.modo == "http":
+            resultados.update(procesar_http(filas, descargador, almacen, args.hilos, args.tasa, registrar))
+        else:
+            resultados.update(procesar_navegador(filas, descargador, almacen, args.hilos, registrar))
+    finally:
+        # el índice del almacén y la bitácora deben coincidir si la corrida se interrumpe
+        almacen.guardar_indice()
+        bitacora.cerrar()
+
+    avatares = almacen.marcar_avatares(
+        [r[1] for r in resultados.values() if not isinstance(r, Exception)])
+
+    for idx, resultado in resultados.items():
+        cedula = cedulas[idx]
+        if isinstance(resultado, Exception):
+            print(f"❌ {cedula}: {resultado}")
+            df.at[idx, "foto_estado"] = f"error: {resultado}"
+            continue
+        nombre, objeto = resultado
+        df.at[idx, "foto_hash"] = objeto.split(".")[0]
+        if objeto in avatares:
+            # no se guarda una copia del avatar genérico por cada cédula (y se quita la de corridas viejas)
+            for viejo in {f"{cedula}{os.path.splitext(objeto)[1]}", f"{cedula}.jpg"}:
+                if os.path.exists(os.path.join(args.carpeta, viejo)):
+                    os.remove(os.path.join(args.carpeta, viejo))
+            df.at[idx, "foto_estado"] = "avatar por defecto"
+            print(f"👤 {cedula} ({nombre}): sin foto propia")
+            continue
         # Guardar la foto usando la CÉDULA, no el nombre
-        file_name = f"{cedula}.jpg"
-
-        saved_path = download_image_with_cookies(driver, foto_url, file_name)
+        archivo = f"{cedula}{os.path.splitext(objeto)[1]}"
+        almacen.enlazar(objeto, archivo)
+        df.at[idx, "foto_archivo"] = archivo
+        df.at[idx, "foto_estado"] = "ok"
+        print(f"✅ {cedula} ({nombre}) → {archivo}")
 
-        if saved_path:
-            print("Foto guardada como:", file_name)
-            df.at[idx, "foto_archivo"] = file_name
-        else:
-            print("No se pudo descargar la foto")
+    almacen.guardar_indice()
+    descargador.cerrar()
 
-    except Exception as e:
-        print("Error procesando URL:", e)
-        continue
+    estados = Counter(e.split(":")[0] for e in df["foto_estado"])
+    print(f"\n🗒️ {bitacora.resumen()}")
+    print(f"📊 {len(resultados)} perfiles en {time.time() - inicio:.1f} s: " +
+          ", ".join(f"{n} {estado}" for estado, n in estados.most_common()) +
+          f"; {len(os.listdir(almacen.objetos))} imágenes distintas en {almacen.objetos}")
 
+    df.to_excel(args.salida, index=False)
 
-# -------------------------------------------------
-# Guardar Excel actualizado
-# -------------------------------------------------
+    print("Proceso completado.")
+    print("Archivo final:", args.salida)
 
-output_path = "urls_con_fotos.xlsx"
-df.to_excel(output_path, index=False)
 
-print("Proceso completado.")
-print("Archivo final:", output_path)
+if __name__ == "__main__":
+    main()
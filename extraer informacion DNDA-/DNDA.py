@@ -1,16 +1,35 @@
 import os
 import re
+import sys
+import argparse
 import pandas as pd
 import pdfplumber
-from pdf2image import convert_from_path
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pdf2image import convert_from_path, pdfinfo_from_path
 import pytesseract
 from tempfile import TemporaryDirectory
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.cache_texto import CacheTexto, SIN_CACHE
+from comun.campos import Campo, Extractor
+from comun.manifiesto import Manifiesto, combinar, leer_tabla
+
 # -------------------------------
 # CONFIGURACIÓN
 # -------------------------------
 CARPETA_PDF = r"C:\Users\andres.guerra.d\Downloads\scripts\extraer informacion DNDA\DNDA"
 SALIDA_EXCEL = r"C:\Users\andres.guerra.d\Downloads\scripts\extraer informacion DNDA\autores_DNDA.xlsx"
+COLUMNAS = ["Archivo", "Obra", "Nombre completo", "Identificación", "Nacionalidad", "Ciudad", "Año", "Ámbito"]
+OCR_DPI = 200
+OCR_IDIOMA = "spa"
+MIN_CARACTERES_PAGINA = 50  # con menos texto la página se trata como escaneada
+OCR_HILOS = os.cpu_count() or 1
+AJUSTES_OCR = {"dpi": OCR_DPI, "lang": OCR_IDIOMA}  # parte de la clave en la caché
+
+# Cada página ya corre en su propio proceso de tesseract; evita que cada uno
+# abra además varios hilos OpenMP y se peleen por los mismos núcleos.
+os.environ.setdefault("OMP_THREAD_LIMIT", "1")
 
 # -------------------------------
 # FUNCIONES AUXILIARES
@@ -25,98 +44,181 @@ def limpiar_texto(txt):
     return txt.strip()
 
 
-def extraer_texto(pdf_path):
-    """Extrae texto con pdfplumber o, si falla, con OCR."""
-    texto = ""
+def paginas_pdfplumber(pdf_path):
+    """Texto de cada página según la capa de texto del PDF."""
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page.extract_text() or "" for page in pdf.pages]
+
+
+def ocr_pagina(pdf_path, numero):
+    """OCR de una sola página (índice desde 0). Solo se rasteriza esa página."""
+    with TemporaryDirectory() as tmpdir:
+        images = convert_from_path(pdf_path, dpi=OCR_DPI, output_folder=tmpdir,
+                                   first_page=numero + 1, last_page=numero + 1)
+        return "\n".join(pytesseract.image_to_string(img, lang=OCR_IDIOMA) for img in images)
+
+
+def completar_ocr(pdf_path, paginas, cache=SIN_CACHE, ocr_hilos=OCR_HILOS):
+    """
+    Reemplaza en `paginas` (en el lugar) el texto de las páginas sin capa de
+    texto útil por su OCR. Las páginas escaneadas se procesan en paralelo, una
+    imagen por hilo, así que en memoria hay como mucho `ocr_hilos` páginas
+    rasterizadas.
+    """
+    escaneadas = [i for i, t in enumerate(paginas) if len(t.strip()) < MIN_CARACTERES_PAGINA]
+    if not escaneadas:
+        return paginas
+    print(f"🧠 Aplicando OCR en {len(escaneadas)}/{len(paginas)} página(s) de {os.path.basename(pdf_path)}...")
+    faltan = []
+    for i in escaneadas:
+        texto = cache.buscar_pagina(pdf_path, "tesseract", AJUSTES_OCR, i)
+        if texto is None:
+            faltan.append(i)
+        else:
+            paginas[i] = texto
+    if faltan:
+        # tesseract y pdftoppm corren como procesos externos: los hilos bastan
+        with ThreadPoolExecutor(max_workers=max(1, min(ocr_hilos, len(faltan)))) as ex:
+            for i, texto in zip(faltan, ex.map(partial(ocr_pagina, pdf_path), faltan)):
+                cache.guardar_pagina(pdf_path, "tesseract", AJUSTES_OCR, i, texto)
+                paginas[i] = texto
+    return paginas
+
+
+def extraer_texto(pdf_path, cache=SIN_CACHE, ocr_hilos=OCR_HILOS):
+    """Extrae texto con pdfplumber y aplica OCR solo a las páginas sin capa de texto útil."""
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                texto += page.extract_text() or ""
+        paginas = list(cache.paginas(pdf_path, "pdfplumber", {}, paginas_pdfplumber))
     except Exception as e:
         print(f"⚠️ Error leyendo {pdf_path}: {e}")
+        paginas = [""] * pdfinfo_from_path(pdf_path)["Pages"]
 
-    if len(texto.strip()) < 50:
-        print(f"🧠 Aplicando OCR en {os.path.basename(pdf_path)}...")
-        with TemporaryDirectory() as tmpdir:
-            images = convert_from_path(pdf_path, dpi=200, output_folder=tmpdir)
-            ocr_texts = [pytesseract.image_to_string(img, lang="spa") for img in images]
-            texto = "\n".join(ocr_texts)
-
-    return limpiar_texto(texto)
+    completar_ocr(pdf_path, paginas, cache, ocr_hilos)
+    return limpiar_texto("\n".join(paginas))
 
 
-def extraer_datos(pdf_path):
+# -------------------------------
+# CAMPOS DEL CERTIFICADO
+# -------------------------------
+CAMPOS_CERTIFICADO = Extractor([
+    Campo("obra", r"T[ií]tulo\s+Original\s+(.+?)\s+Año\s+de\s+Creaci[oó]n", post=str.strip),
+    Campo("anio", r"Año\s+de\s+Creaci[oó]n\s+(\d{4})"),
+    Campo("ambito", r"AMBITO\s+([A-ZÁÉÍÓÚÑa-z\s\-\–]+)", post=str.strip),
+])
+
+# Cada autor empieza en "Nombres y Apellidos" (con o sin el rótulo AUTOR antes).
+# El texto se corta primero en bloques por esa ancla y cada bloque se analiza
+# por separado: los patrones ya no pueden recorrer el certificado completo ni
+# mezclar datos de dos autores.
+ANCLA_AUTOR = re.compile(r"(?:AUTOR[\s\-]*)?Nombres\s*y\s*Apellidos")
+
+# Dentro del bloque cada dato se busca por separado (búsquedas lineales, sin
+# tramos .*? que retrocedan entre campos).
+CAMPOS_AUTOR = Extractor([
+    Campo("autor",
+          r"Nombres\s*y\s*Apellidos\s*([A-ZÁÉÍÓÚÑ\s]+?)\s*No\s*de\s*identificaci[oó]n\s*(?:C\.?C\.?|C[eé]dula)\s*:?(\d+)",
+          grupo=None),
+    Campo("nacionalidad", r"Nacional\s*de\s*([A-ZÁÉÍÓÚÑa-z]+)"),
+    Campo("ciudad", r"Ciudad[:\s\-]*([A-ZÁÉÍÓÚÑa-z\.\s\-]*)"),
+])
+
+
+def bloques_autor(texto):
+    """Divide el texto en bloques que empiezan en cada ancla de autor."""
+    inicios = [m.start() for m in ANCLA_AUTOR.finditer(texto)]
+    for inicio, fin in zip(inicios, inicios[1:] + [len(texto)]):
+        yield texto[inicio:fin]
+
+
+def extraer_datos(pdf_path, cache=SIN_CACHE, ocr_hilos=OCR_HILOS):
     """Extrae información estructurada desde un certificado DNDA."""
-    texto = extraer_texto(pdf_path)
+    return datos_de_texto(extraer_texto(pdf_path, cache, ocr_hilos), os.path.basename(pdf_path))
 
-    # -------------------------------
-    # DATOS DE LA OBRA
-    # -------------------------------
-    obra = re.search(r"T[ií]tulo\s+Original\s+(.+?)\s+Año\s+de\s+Creaci[oó]n", texto)
-    obra = obra.group(1).strip() if obra else ""
 
-    anio = re.search(r"Año\s+de\s+Creaci[oó]n\s+(\d{4})", texto)
-    anio = anio.group(1) if anio else ""
+def datos_de_texto(texto, archivo):
+    """Una fila por autor a partir del texto ya limpio del certificado."""
+    v = CAMPOS_CERTIFICADO.extraer(texto)
 
-    ambito = re.search(r"AMBITO\s+([A-ZÁÉÍÓÚÑa-z\s\-\–]+)", texto)
-    ambito = ambito.group(1).strip() if ambito else ""
+    obra = limpiar_texto(v["obra"] or "")
+    anio = limpiar_texto(v["anio"] or "")
+    ambito = limpiar_texto(v["ambito"] or "")
 
     autores = []
-
-    # --- NUEVO patrón general robusto (multi-autor)
-    patron_general = re.findall(
-        r"AUTOR[\s\-]*Nombres\s*y\s*Apellidos\s*([A-ZÁÉÍÓÚÑ\s]+?)\s*No\s*de\s*identificaci[oó]n\s*(?:C\.?C\.?|C[eé]dula)\s*:?(\d+)"
-        r".*?Nacional\s*de\s*([A-ZÁÉÍÓÚÑa-z]+).*?Ciudad[:\s\-]*([A-ZÁÉÍÓÚÑa-z\.\s\-]*)",
-        texto, flags=re.DOTALL
-    )
-
-    # --- Patrón adicional sin palabra AUTOR
-    patron_sin_autor = re.findall(
-        r"Nombres\s*y\s*Apellidos\s*([A-ZÁÉÍÓÚÑ\s]+?)\s*No\s*de\s*identificaci[oó]n\s*(?:C\.?C\.?|C[eé]dula)\s*:?(\d+)"
-        r".*?Nacional\s*de\s*([A-ZÁÉÍÓÚÑa-z]+).*?Ciudad[:\s\-]*([A-ZÁÉÍÓÚÑa-z\.\s\-]*)",
-        texto, flags=re.DOTALL
-    )
-
-    # Combinar resultados
-    for patron in [patron_general, patron_sin_autor]:
-        for a in patron:
-            nombre, identificacion, nacionalidad, ciudad = a
-            autores.append({
-                "Obra": limpiar_texto(obra),
-                "Nombre completo": limpiar_texto(nombre),
-                "Identificación": "CC " + limpiar_texto(identificacion),
-                "Nacionalidad": limpiar_texto(nacionalidad),
-                "Ciudad": limpiar_texto(ciudad),
-                "Año": limpiar_texto(anio),
-                "Ámbito": limpiar_texto(ambito)
-            })
+    vistos = set()
+    for bloque in bloques_autor(texto):
+        r = CAMPOS_AUTOR.evaluar(bloque)
+        if len(r.encontrados) < len(CAMPOS_AUTOR.campos):
+            continue
+        nombre, identificacion = r.valores["autor"]
+        nacionalidad, ciudad = r.valores["nacionalidad"], r.valores["ciudad"]
+        # el mismo autor puede aparecer en varias secciones del certificado
+        if identificacion in vistos:
+            continue
+        vistos.add(identificacion)
+        autores.append({
+            "Archivo": archivo,
+            "Obra": obra,
+            "Nombre completo": limpiar_texto(nombre),
+            "Identificación": "CC " + limpiar_texto(identificacion),
+            "Nacionalidad": limpiar_texto(nacionalidad),
+            "Ciudad": limpiar_texto(ciudad),
+            "Año": anio,
+            "Ámbito": ambito
+        })
 
     return autores
 
 
-# -------------------------------
-# PROCESAMIENTO MASIVO
-# -------------------------------
-todos_autores = []
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--dir", default=CARPETA_PDF, help="Carpeta con los certificados DNDA en PDF")
+    ap.add_argument("--out", default=SALIDA_EXCEL, help="Ruta del Excel de salida")
+    ap.add_argument("--ocr-hilos", type=int, default=OCR_HILOS,
+                    help="Páginas escaneadas procesadas con OCR a la vez (por defecto, núcleos)")
+    CacheTexto.agregar_argumentos(ap)
+    Manifiesto.agregar_argumentos(ap)
+    args = ap.parse_args()
+    cache = CacheTexto.desde_args(args)
+    manifiesto = Manifiesto.desde_args(args, args.out, args.dir)
+
+    # -------------------------------
+    # PROCESAMIENTO MASIVO
+    # -------------------------------
+    pdfs = [os.path.join(args.dir, a) for a in sorted(os.listdir(args.dir)) if a.lower().endswith(".pdf")]
+    cambios = manifiesto.clasificar(pdfs)
+    print(cambios.resumen())
+
+    todos_autores = []
 
-for archivo in os.listdir(CARPETA_PDF):
-    if archivo.lower().endswith(".pdf"):
-        ruta = os.path.join(CARPETA_PDF, archivo)
+    for ruta in cambios.pendientes:
+        archivo = os.path.basename(ruta)
         try:
-            datos = extraer_datos(ruta)
+            datos = extraer_datos(ruta, cache, args.ocr_hilos)
             todos_autores.extend(datos)
+            manifiesto.registrar(ruta)
             print(f"✅ Procesado: {archivo} ({len(datos)} autores)")
         except Exception as e:
             print(f"⚠️ Error procesando {archivo}: {e}")
 
-# -------------------------------
-# EXPORTAR RESULTADOS
-# -------------------------------
-if todos_autores:
-    df = pd.DataFrame(todos_autores)
-    columnas = ["Obra", "Nombre completo", "Identificación", "Nacionalidad", "Ciudad", "Año", "Ámbito"]
-    df = df[columnas]
-    df.to_excel(SALIDA_EXCEL, index=False)
-    print(f"\n📘 Archivo generado correctamente:\n{SALIDA_EXCEL}")
-else:
-    print("\n⚠️ No se detectaron autores en ningún PDF.")
+    print(cache.resumen())
+    print(CAMPOS_CERTIFICADO.resumen())
+    print(CAMPOS_AUTOR.resumen())
+
+    # -------------------------------
+    # EXPORTAR RESULTADOS
+    # -------------------------------
+    df = pd.DataFrame(todos_autores, columns=COLUMNAS)
+    if manifiesto.incremental:
+        df = combinar(leer_tabla(args.out), df, "Archivo", cambios.conservar, cambios.orden)
+    if not df.empty:
+        df = df[COLUMNAS]
+        df.to_excel(args.out, index=False)
+        manifiesto.guardar()
+        print(f"\n📘 Archivo generado correctamente:\n{args.out}")
+    else:
+        print("\n⚠️ No se detectaron autores en ningún PDF.")
+
+
+if __name__ == "__main__":
+    main()
+
@@ -2,21 +2,42 @@ import pandas as pd
 import time
 import random
 import os
+import sys
+import argparse
+import asyncio
+import multiprocessing as mp
+import queue
+from urllib.parse import urljoin
 from tqdm import tqdm
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.bitacora import Bitacora
+from comun.dspace import ErrorDSpace, api_de_url, ruta_api_item
+from comun.limites import LimitadorPorHost
 
 # ========== CONFIG ==========
 INPUT_FILE = "Palabras Clave.xlsx"
 OUTPUT_FILE = "Palabras_Claves_Completas.xlsx"
 URL_COLUMN = " URL repositorio"   # cuidado con espacio inicial
 SLEEP_MIN, SLEEP_MAX = 1.5, 3.5
-SAVE_EVERY = 10
+PROCESOS = 4            # navegadores headless en paralelo
+ESPERA_MAX = 20         # segundos máximos esperando a que Angular pinte los metadatos
+ESPERA_URI = 3          # margen extra para el bloque URI (el último que se lee)
+# Modo API (sin navegador)
+CAMPOS_PALABRAS = ("dc.subject",)   # lo que la página muestra bajo "Palabras clave"
+TASA = 5                # peticiones por segundo a cada host
+RAFAGA = 10             # peticiones que pueden salir de golpe antes de aplicar la tasa
+CONCURRENCIA = 8        # peticiones en vuelo a la vez
+REINTENTOS = 4
+# Valores que no cuentan como fila hecha al retomar desde una salida anterior
+SIN_RESULTADO = ("", "nan", "No encontradas", "URL inválida")
 # =============================
 
 def iniciar_driver():
     """Inicia Chrome en modo headless (sin ventana visible)."""
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+
     chrome_opts = Options()
     chrome_opts.add_argument("--headless=new")
     chrome_opts.add_argument("--no-sandbox")
@@ -29,9 +50,25 @@ def iniciar_driver():
 
 def extraer_datos(driver, url):
     """Extrae Palabras clave y DOI desde una página del repositorio UNIMINUTO."""
+    from bs4 import BeautifulSoup
+    from selenium.common.exceptions import TimeoutException
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
     try:
         driver.get(url)
-        time.sleep(4)  # esperar a que Angular cargue el contenido
+        # esperar a que Angular pinte los metadatos en lugar de un sleep fijo
+        try:
+            WebDriverWait(driver, ESPERA_MAX).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div.simple-view-element-body"))
+            )
+            WebDriverWait(driver, ESPERA_URI).until(
+                EC.presence_of_element_located(
+                    (By.XPATH, "//h2[contains(translate(., 'URI', 'uri'), 'uri')]"))
+            )
+        except TimeoutException:
+            pass  # se analiza lo que haya cargado (ítem sin URI, página de error...)
 
         soup = BeautifulSoup(driver.page_source, "html.parser")
 
@@ -65,9 +102,174 @@ def extraer_datos(driver, url):
         return f"Error: {e}", "Error"
 
 
+def sembrar_desde_salida(bitacora, ruta):
+    """
+    Pasa a la bitácora las filas ya llenas de un Excel de salida anterior (la
+    clave es la URL), como hacía el script antes de tener bitácora. Toman la
+    fecha del archivo, así que vencen con --vigencia como las demás.
+    """
+    if not os.path.exists(ruta):
+        return 0
+    previo = pd.read_excel(ruta)
+    if not {URL_COLUMN, "Palabras Clave Scrapeadas", "DOI"} <= set(previo.columns):
+        return 0
+    fecha = os.path.getmtime(ruta)
+    sembradas = 0
+    for _, row in previo.iterrows():
+        url = str(row[URL_COLUMN]).strip()
+        palabras = str(row["Palabras Clave Scrapeadas"]).strip()
+        if not url.startswith("http") or palabras in SIN_RESULTADO or palabras.startswith("Error:"):
+            continue
+        doi = row["DOI"]
+        doi = "No encontrado" if pd.isna(doi) else str(doi)
+        sembradas += bitacora.sembrar(url, {"palabras": palabras, "doi": doi}, fecha)
+    return sembradas
+
+
+# ---------- Modo API: JSON de DSpace 7 con aiohttp ----------
+
+def palabras_y_doi(metadata):
+    """Las mismas columnas que extraer_datos, a partir de los metadatos JSON del ítem."""
+    lista = [v["value"].strip() for campo in CAMPOS_PALABRAS
+             for v in metadata.get(campo, []) if (v.get("value") or "").strip()]
+    palabras = ", ".join(lista) if lista else "No encontradas"
+
+    doi = "No encontrado"
+    for v in metadata.get("dc.identifier.uri", []):
+        if "doi.org" in (v.get("value") or ""):
+            doi = v["value"].strip()
+            break
+    else:
+        for v in metadata.get("dc.identifier.doi", []):
+            valor = (v.get("value") or "").strip()
+            if valor:
+                doi = valor if valor.startswith("http") else "https://doi.org/" + valor
+                break
+    return palabras, doi
+
+
+async def obtener_json(sesion, limitador, url):
+    """GET con token del cubo por cada petición (incluidas redirecciones) y reintentos en 429/5xx."""
+    intento = 0
+    for _ in range(10):  # tope de redirecciones + reintentos
+        await limitador.adquirir(url)
+        async with sesion.get(url, allow_redirects=False, headers={"Accept": "application/json"}) as r:
+            if r.status in (301, 302, 303, 307, 308):
+                url = urljoin(url, r.headers["Location"])
+                continue
+            if r.status == 404:
+                raise ErrorDSpace(f"No existe en el repositorio: {url}")
+            if r.status == 429 or r.status >= 500:
+                if intento >= REINTENTOS:
+                    r.raise_for_status()
+                try:
+                    espera = float(r.headers.get("Retry-After", ""))
+                except ValueError:
+                    espera = 2 ** intento
+                limitador.cubo(url).pausar(espera)
+                intento += 1
+                continue
+            r.raise_for_status()
+            return await r.json(content_type=None)
+    raise ErrorDSpace(f"Demasiadas redirecciones o reintentos: {url}")
+
+
+async def extraer_api(pendientes, registrar, api_base, tasa, rafaga, concurrencia):
+    """Consulta /core/items de cada fila y llama registrar(i, palabras, doi) según van llegando."""
+    import aiohttp
+
+    limitador = LimitadorPorHost(tasa, rafaga)
+    en_vuelo = asyncio.Semaphore(concurrencia)
+    conector = aiohttp.TCPConnector(limit=concurrencia)
+    async with aiohttp.ClientSession(connector=conector, timeout=aiohttp.ClientTimeout(total=60)) as sesion:
+
+        async def una(i, url):
+            async with en_vuelo:
+                try:
+                    item = await obtener_json(sesion, limitador, (api_base or api_de_url(url)) + ruta_api_item(url))
+                    return (i, *palabras_y_doi(item.get("metadata", {})))
+                except Exception as e:
+                    return i, f"Error: {e}", "Error"
+
+        for futuro in asyncio.as_completed([una(i, url) for i, url in pendientes]):
+            registrar(*await futuro)
+
+
+# ---------- Modo navegador: Selenium ----------
+
+def trabajador(tareas, resultados, pausa):
+    """Proceso con su propio Chrome: toma filas de la cola hasta recibir None."""
+    driver = iniciar_driver()
+    try:
+        while True:
+            tarea = tareas.get()
+            if tarea is None:
+                break
+            i, url = tarea
+            palabras, doi = extraer_datos(driver, url)
+            resultados.put((i, palabras, doi))
+            time.sleep(random.uniform(*pausa))
+    finally:
+        driver.quit()
+
+
+def siguiente_resultado(resultados, workers):
+    """Espera el próximo resultado; None si ya no queda ningún navegador vivo."""
+    while True:
+        try:
+            return resultados.get(timeout=5)
+        except queue.Empty:
+            if not any(w.is_alive() for w in workers):
+                return None
+
+
+def extraer_navegador(pendientes, registrar, procesos, pausa):
+    """Reparte las filas entre varios Chrome headless, cada uno en su proceso."""
+    procesos = max(1, min(procesos, len(pendientes)))
+    print(f"🚀 Iniciando Selenium scraping: {len(pendientes)} filas con {procesos} navegadores...\n")
+
+    tareas, resultados = mp.Queue(), mp.Queue()
+    for tarea in pendientes:
+        tareas.put(tarea)
+    for _ in range(procesos):
+        tareas.put(None)
+    workers = [mp.Process(target=trabajador, args=(tareas, resultados, pausa), daemon=True)
+               for _ in range(procesos)]
+    for w in workers:
+        w.start()
+
+    try:
+        for _ in range(len(pendientes)):
+            resultado = siguiente_resultado(resultados, workers)
+            if resultado is None:
+                print("⚠️ Todos los navegadores terminaron antes de tiempo; se guarda lo avanzado")
+                break
+            registrar(*resultado)
+    finally:
+        for w in workers:
+            w.join(timeout=30)
+            if w.is_alive():
+                w.terminate()
+
+
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--input", default=INPUT_FILE)
+    ap.add_argument("--output", default=OUTPUT_FILE)
+    ap.add_argument("--modo", choices=["api", "navegador"], default="api",
+                    help="api: JSON de la API REST de DSpace 7 (rápido); navegador: Selenium con Chrome headless")
+    ap.add_argument("--api-base", help="URL de la API (p. ej. el mock); por defecto se deduce de cada URL")
+    ap.add_argument("--tasa", type=float, default=TASA, help="Peticiones por segundo a cada host (modo api)")
+    ap.add_argument("--rafaga", type=float, default=RAFAGA, help="Ráfaga máxima del cubo de tokens (modo api)")
+    ap.add_argument("--concurrencia", type=int, default=CONCURRENCIA, help="Peticiones en vuelo (modo api)")
+    ap.add_argument("--procesos", type=int, default=PROCESOS, help="Navegadores en paralelo (modo navegador)")
+    ap.add_argument("--pausa", type=float, nargs=2, default=(SLEEP_MIN, SLEEP_MAX), metavar=("MIN", "MAX"),
+                    help="Pausa aleatoria de cada navegador entre filas (segundos, modo navegador)")
+    Bitacora.agregar_argumentos(ap)
+    args = ap.parse_args()
+
     print("🔍 Cargando archivo Excel...")
-    df = pd.read_excel(INPUT_FILE)
+    df = pd.read_excel(args.input)
 
     # Añadir columnas si no existen
     if "Palabras Clave Scrapeadas" not in df.columns:
@@ -75,42 +277,54 @@ def main():
     if "DOI" not in df.columns:
         df["DOI"] = ""
 
-    # Si ya hay archivo previo, retomamos el progreso
-    if os.path.exists(OUTPUT_FILE):
-        print("♻️ Retomando progreso anterior...")
-        df_out = pd.read_excel(OUTPUT_FILE)
-        for col in ["Palabras Clave Scrapeadas", "DOI"]:
-            if col in df_out.columns:
-                df[col] = df_out[col]
-
-    driver = iniciar_driver()
-    print("🚀 Iniciando Selenium scraping...\n")
-
-    for i, row in tqdm(df.iterrows(), total=len(df)):
-        # Saltar si ya está completado
-        if pd.notna(row.get("Palabras Clave Scrapeadas")) and str(row["Palabras Clave Scrapeadas"]).strip() not in ["", "No encontradas"]:
-            continue
-
+    # Las filas ya hechas en una corrida anterior salen de la bitácora (la clave es la URL)
+    bitacora = Bitacora.desde_args(args, args.output)
+    if not args.reiniciar:
+        sembradas = sembrar_desde_salida(bitacora, args.output)
+        if sembradas:
+            print(f"♻️ {sembradas} filas ya llenas en {args.output} se saltan")
+    pendientes = []
+    for i, row in df.iterrows():
         url = str(row[URL_COLUMN]).strip()
         if not url.startswith("http"):
             df.at[i, "Palabras Clave Scrapeadas"] = "URL inválida"
             df.at[i, "DOI"] = "URL inválida"
             continue
+        hecha = bitacora.datos(url)
+        if hecha is not None:
+            df.at[i, "Palabras Clave Scrapeadas"] = hecha["palabras"]
+            df.at[i, "DOI"] = hecha["doi"]
+            continue
+        pendientes.append((i, url))
+
+    progreso = tqdm(total=len(pendientes))
+    urls = dict(pendientes)
 
-        palabras, doi = extraer_datos(driver, url)
+    def registrar(i, palabras, doi):
         df.at[i, "Palabras Clave Scrapeadas"] = palabras
         df.at[i, "DOI"] = doi
+        # cada fila queda en la bitácora al terminar; las de error se reintentan en la próxima corrida.
+        # "No encontradas" también: puede ser una página que no terminó de cargar antes del timeout
+        if palabras.startswith("Error:") or palabras == "No encontradas":
+            bitacora.registrar(urls[i], error=palabras)
+        else:
+            bitacora.registrar(urls[i], {"palabras": palabras, "doi": doi})
+        progreso.update(1)
 
-        # Guardado incremental
-        if (i + 1) % SAVE_EVERY == 0:
-            df.to_excel(OUTPUT_FILE, index=False)
-            print(f"💾 Guardado parcial en fila {i + 1}")
-
-        time.sleep(random.uniform(SLEEP_MIN, SLEEP_MAX))
+    # Solo este proceso escribe la bitácora y el Excel
+    try:
+        if args.modo == "api":
+            print(f"🚀 Consultando la API: {len(pendientes)} filas, {args.tasa:g} peticiones/s por host...\n")
+            asyncio.run(extraer_api(pendientes, registrar, args.api_base, args.tasa, args.rafaga, args.concurrencia))
+        else:
+            extraer_navegador(pendientes, registrar, args.procesos, tuple(args.pausa))
+    finally:
+        progreso.close()
+        bitacora.cerrar()
+        df.to_excel(args.output, index=False)
 
-    driver.quit()
-    df.to_excel(OUTPUT_FILE, index=False)
-    print(f"\n✅ Proceso completado. Archivo guardado como: {OUTPUT_FILE}")
+    print(f"🗒️ {bitacora.resumen()}")
+    print(f"\n✅ Proceso completado. Archivo guardado como: {args.output}")
 
 
 if __name__ == "__main__":
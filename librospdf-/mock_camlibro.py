@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Sitio de camlibro simulado para probar scrapper.py sin la cuenta real.
+
+  GET  /index.php                                    -> página con el formulario de login
+  POST /index.php  usuario=...&contrasena=...        -> cookie PHPSESSID y redirección a user.php
+  GET  /user.php?mode=listado_titulos&currentPage=N  -> 20 títulos con onclick="pdfTitulo(ID)",
+                                                        paginación con ventana de 10 páginas, "›" y "»"
+  GET  /pdfisbn.php?idTitulo=ID&numShow=0            -> el PDF del título
+  GET  /mock/estadisticas                            -> peticiones atendidas por tipo
+
+Sin sesión, el listado y los PDF devuelven el formulario de login (como el
+sitio real). Los títulos van del más reciente al más antiguo; --nuevos N
+agrega N títulos más recientes que los --titulos base, para probar el modo
+incremental: primera corrida con --nuevos 0 y luego con --nuevos 5.
+
+Uso:
+  python mock_camlibro.py --puerto 8790 --titulos 3000 --latencia 300
+  python scrapper.py --base http://127.0.0.1:8790 --login http --carpeta /tmp/pdfs
+"""
+
+import argparse
+import secrets
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+POR_PAGINA = 20
+VENTANA = 10
+ID_BASE = 481905
+USUARIO, CONTRASENA = "8001162172", "lib2017"
+
+FORMULARIO = """<html><body><a href="#login">Iniciar sesión</a>
+<form method="post" action="/index.php" id="login">
+<input name="usuario"><input name="contrasena" type="password"><button>Entrar</button>
+</form></body></html>"""
+
+
+def pdf_de(id_titulo):
+    return (b"%PDF-1.4\n% titulo " + id_titulo.encode() + b"\n" + b"0" * 2048 + b"\n%%EOF\n")
+
+
+class Manejador(BaseHTTPRequestHandler):
+    ids = []
+    conjunto = set()
+    latencia = 0.0
+    verboso = False
+    sesiones = set()
+    contador = Counter()
+    _lock = threading.Lock()
+
+    def log_message(self, formato, *args):
+        if self.verboso:
+            super().log_message(formato, *args)
+
+    def _responder(self, cuerpo, tipo="text/html; charset=utf-8", estado=200, cabeceras=None):
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for k, v in (cabeceras or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _con_sesion(self):
+        cookies = dict(c.strip().split("=", 1) for c in self.headers.get("Cookie", "").split(";") if "=" in c)
+        return cookies.get("PHPSESSID") in self.sesiones
+
+    def _contar(self, clave):
+        with self._lock:
+            self.contador[clave] += 1
+
+    def do_POST(self):
+        largo = int(self.headers.get("Content-Length", 0))
+        datos = parse_qs(self.rfile.read(largo).decode("utf-8"))
+        if datos.get("usuario", [""])[0] != USUARIO or datos.get("contrasena", [""])[0] != CONTRASENA:
+            self._contar("login_fallido")
+            return self._responder(FORMULARIO.encode("utf-8"))
+        sesion = secrets.token_hex(16)
+        self.sesiones.add(sesion)
+        self._contar("login")
+        self._responder(b"", estado=302, cabeceras={
+            "Set-Cookie": f"PHPSESSID={sesion}; Path=/", "Location": "/user.php"})
+
+    def do_GET(self):
+        partes = urlsplit(self.path)
+        params = parse_qs(partes.query)
+        if partes.path == "/mock/estadisticas":
+            return self._responder(repr(dict(self.contador)).encode(), "text/plain")
+        if partes.path in ("/", "/index.php"):
+            return self._responder(FORMULARIO.encode("utf-8"))
+        if not self._con_sesion():
+            self._contar("sin_sesion")
+            return self._responder(FORMULARIO.encode("utf-8"))
+        if self.latencia:
+            time.sleep(self.latencia)
+
+        if partes.path == "/pdfisbn.php":
+            id_titulo = params.get("idTitulo", [""])[0]
+            if id_titulo not in self.conjunto:
+                self._contar(404)
+                return self._responder(b"No existe", "text/plain", 404)
+            self._contar("pdfs")
+            return self._responder(pdf_de(id_titulo), "application/pdf")
+
+        if partes.path == "/user.php" and params.get("mode", [""])[0] == "listado_titulos":
+            total = max(1, -(-len(self.ids) // POR_PAGINA))
+            pagina = min(max(1, int(params.get("currentPage", ["1"])[0])), total)
+            self._contar("paginas")
+            filas = "".join(
+                f'<tr><td>978-958-{i}</td><td>Título {i}</td>'
+                f'<td><a href="#" onclick="pdfTitulo({i})"><img src="pdf.png"></a></td></tr>'
+                for i in self.ids[(pagina - 1) * POR_PAGINA:pagina * POR_PAGINA])
+            desde = max(1, pagina - VENTANA // 2)
+            enlaces = "".join(f'<a href="user.php?mode=listado_titulos&currentPage={n}">{n}</a> '
+                              for n in range(desde, min(total, desde + VENTANA - 1) + 1))
+            if pagina < total:
+                enlaces += (f'<a href="user.php?mode=listado_titulos&currentPage={pagina + 1}">›</a> '
+                            f'<a href="user.php?mode=listado_titulos&currentPage={total}">»</a>')
+            return self._responder(f"<html><body><table>{filas}</table><div class='paginacion'>{enlaces}</div>"
+                                   f"</body></html>".encode("utf-8"))
+        if partes.path == "/user.php":
+            return self._responder(b"<html><body>Bienvenido</body></html>")
+
+        self._responder(b"No existe", "text/plain", 404)
+
+
+def crear_servidor(puerto=8790, latencia_ms=0, titulos=3000, nuevos=0):
+    # del más reciente (ID más alto) al más antiguo
+    ids = [str(ID_BASE + titulos + nuevos - n) for n in range(titulos + nuevos)]
+    manejador = type("ManejadorCamlibro", (Manejador,), {
+        "ids": ids, "conjunto": set(ids), "latencia": latencia_ms / 1000,
+        "sesiones": set(), "contador": Counter(),
+    })
+    return ThreadingHTTPServer(("127.0.0.1", puerto), manejador)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--puerto", type=int, default=8790)
+    ap.add_argument("--latencia", type=float, default=0, help="Milisegundos de espera por petición con sesión")
+    ap.add_argument("--titulos", type=int, default=3000, help="Títulos de la cuenta")
+    ap.add_argument("--nuevos", type=int, default=0, help="Títulos adicionales más recientes que los anteriores")
+    ap.add_argument("--verboso", action="store_true", help="Muestra cada petición")
+    args = ap.parse_args()
+
+    Manejador.verboso = args.verboso
+    servidor = crear_servidor(args.puerto, args.latencia, args.titulos, args.nuevos)
+    print(f"🧪 camlibro simulado en http://127.0.0.1:{args.puerto} "
+          f"({len(servidor.RequestHandlerClass.ids)} títulos; Ctrl+C para terminar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("📊", dict(servidor.RequestHandlerClass.contador))
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,92 +1,209 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import requests, os, time
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.descargas import Descargador, Tarea, validar_pdf
 
 # ---------------- CONFIG ----------------
 USER = "8001162172"
 PASSWORD = "lib2017"
-LOGIN_URL = "https://isbn.camlibro.com.co/index.php"
-LISTADO_URL = "https://isbn.camlibro.com.co/user.php?mode=listado_titulos&currentPage=1"
+BASE = "https://isbn.camlibro.com.co"
+LOGIN = "/index.php"
+LISTADO = "/user.php?mode=listado_titulos&currentPage={}"
+PDF = "/pdfisbn.php?idTitulo={}&numShow=0"
+CARPETA = "pdfs"
+HILOS_DESCARGA = 4
+HILOS_LISTADO = 6
 # ----------------------------------------
 
-# Configurar navegador
-options = webdriver.ChromeOptions()
-# options.add_argument("--headless")  # si quieres que no se vea la ventana
-driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+RE_ID = re.compile(r"pdfTitulo\(\s*'?(\d+)'?\s*\)")
+RE_PAGINA = re.compile(r"currentPage=(\d+)")
 
-wait = WebDriverWait(driver, 15)
 
-# 1. Abrir página
-print("👉 Abriendo página...")
-driver.get(LOGIN_URL)
+# ---------------- LOGIN ----------------
 
-# 2. Click en "Iniciar sesión"
-print("👉 Buscando botón de login...")
-login_btn = wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Iniciar sesión")))
-login_btn.click()
+def login_navegador(base, usuario, contrasena):
+    """Inicia sesión con Chrome y devuelve sus cookies (el listado se lee luego sin navegador)."""
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from webdriver_manager.chrome import ChromeDriverManager
 
-# 3. Esperar a que aparezca el formulario
-print("👉 Esperando formulario...")
-usuario_input = wait.until(EC.visibility_of_element_located((By.NAME, "usuario")))
-contrasena_input = wait.until(EC.visibility_of_element_located((By.NAME, "contrasena")))
+    options = webdriver.ChromeOptions()
+    # options.add_argument("--headless")  # si quieres que no se vea la ventana
+    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
+    wait = WebDriverWait(driver, 15)
+    try:
+        print("👉 Abriendo página...")
+        driver.get(base + LOGIN)
 
-# 4. Enviar credenciales
-print("👉 Enviando credenciales...")
-usuario_input.send_keys(USER)
-contrasena_input.send_keys(PASSWORD + Keys.RETURN)
+        print("👉 Buscando botón de login...")
+        wait.until(EC.element_to_be_clickable((By.LINK_TEXT, "Iniciar sesión"))).click()
 
-# 5. Ir al listado
-print("👉 Esperando login exitoso...")
-wait.until(EC.url_changes(LOGIN_URL))
-driver.get(LISTADO_URL)
-time.sleep(3)
+        print("👉 Enviando credenciales...")
+        wait.until(EC.visibility_of_element_located((By.NAME, "usuario"))).send_keys(usuario)
+        wait.until(EC.visibility_of_element_located((By.NAME, "contrasena"))).send_keys(contrasena + Keys.RETURN)
 
-pdf_links = set()
-page = 1
+        print("👉 Esperando login exitoso...")
+        wait.until(EC.url_changes(base + LOGIN))
+        return driver.get_cookies()
+    finally:
+        driver.quit()
 
-# 6. Recorrer todas las páginas
-while True:
-    time.sleep(2)
 
-    # capturar íconos con onclick=pdfTitulo(ID)
-    icons = driver.find_elements(By.CSS_SELECTOR, "a[onclick^='pdfTitulo']")
-    for icon in icons:
-        onclick_value = icon.get_attribute("onclick")  # ej: "pdfTitulo(481905)"
-        book_id = onclick_value.split("(")[1].split(")")[0]
-        link = f"https://isbn.camlibro.com.co/pdfisbn.php?idTitulo={book_id}&numShow=0"
-        pdf_links.add(link)
+def login_http(sesion, base, usuario, contrasena):
+    """Envía el mismo formulario (usuario, contrasena) sin navegador."""
+    sesion.get(base + LOGIN, timeout=30)
+    r = sesion.post(base + LOGIN, data={"usuario": usuario, "contrasena": contrasena}, timeout=30)
+    r.raise_for_status()
+    if 'name="contrasena"' in r.text:
+        raise RuntimeError("El sitio rechazó el usuario o la contraseña")
 
-    print(f"✅ Página {page} procesada, total acumulado: {len(pdf_links)} PDFs")
-    page += 1
 
-    try:
-        next_btn = driver.find_element(By.LINK_TEXT, "›")
-        next_btn.click()
-    except:
-        break
+# ---------------- LISTADO ----------------
+
+def ids_de_pagina(html):
+    """IDs de los íconos onclick="pdfTitulo(ID)", en el orden del listado y sin repetir."""
+    return list(dict.fromkeys(RE_ID.findall(html)))
+
+
+def total_paginas(html):
+    """La página más alta enlazada en la paginación (el enlace "»" apunta a la última)."""
+    return max((int(n) for n in RE_PAGINA.findall(html)), default=1)
 
-driver.quit()
 
-print(f"🔎 Se encontraron {len(pdf_links)} PDFs en total")
+def leer_pagina(sesion, base, n):
+    r = sesion.get(base + LISTADO.format(n), timeout=30)
+    r.raise_for_status()
+    if 'name="contrasena"' in r.text:
+        raise RuntimeError("La sesión no está iniciada (el listado devolvió el formulario de login)")
+    return r.text
 
-# 7. Descargar PDFs
-os.makedirs("pdfs", exist_ok=True)
 
-for link in pdf_links:
+def recorrer_listado(sesion, base, hilos, conocidos=frozenset()):
+    """
+    IDs de todas las páginas del listado, pidiendo varias a la vez.
+
+    Con `conocidos` (modo incremental) se avanza por tandas de `hilos` páginas
+    y se para en la primera tanda que ya trae un ID conocido: el listado
+    muestra primero los títulos más recientes, así que lo que sigue ya se
+    procesó en corridas anteriores.
+    """
+    primera = leer_pagina(sesion, base, 1)
+    total = total_paginas(primera)
+    paginas = {1: ids_de_pagina(primera)}
+    print(f"📄 {total} páginas en el listado")
+
+    with ThreadPoolExecutor(max_workers=hilos) as pool:
+        siguiente = 2
+        while siguiente <= total and not (conocidos and any(i in conocidos for ids in paginas.values()
+                                                             for i in ids)):
+            tanda = range(siguiente, min(total, siguiente + hilos - 1) + 1) if conocidos \
+                else range(siguiente, total + 1)
+            for n, html in zip(tanda, pool.map(lambda n: leer_pagina(sesion, base, n), tanda)):
+                paginas[n] = ids_de_pagina(html)
+                # si la paginación muestra solo una ventana de páginas, las siguientes amplían el total
+                total = max(total, total_paginas(html))
+            siguiente = tanda[-1] + 1
+            print(f"✅ Páginas hasta {tanda[-1]} leídas, total acumulado: "
+                  f"{sum(len(v) for v in paginas.values())} títulos")
+
+    if conocidos and len(paginas) < total:
+        print(f"⏭️ Se encontraron títulos conocidos: no se leen las páginas {len(paginas) + 1} a {total}")
+    return list(dict.fromkeys(i for n in sorted(paginas) for i in paginas[n]))
+
+
+# ---------------- REGISTRO DE TÍTULOS ----------------
+
+def cargar_conocidos(carpeta):
+    """IDs vistos en corridas anteriores (registro en la carpeta) más los PDFs ya descargados."""
+    try:
+        with open(os.path.join(carpeta, "_titulos.json"), encoding="utf-8") as f:
+            ids = set(json.load(f))
+    except (OSError, ValueError):
+        ids = set()
+    if os.path.isdir(carpeta):
+        ids.update(n[:-4] for n in os.listdir(carpeta) if n.endswith(".pdf") and n[:-4].isdigit())
+    return ids
+
+
+def guardar_conocidos(carpeta, ids):
+    ruta = os.path.join(carpeta, "_titulos.json")
+    with open(ruta + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(sorted(ids, key=int, reverse=True), f)
+    os.replace(ruta + ".tmp", ruta)
+
+
+def pdf_listo(ruta):
+    return os.path.exists(ruta) and validar_pdf(ruta) is None
+
+
+# ---------------- PRINCIPAL ----------------
+
+def main():
+    ap = argparse.ArgumentParser(description="Descarga los PDF de los títulos ISBN de la cuenta en camlibro")
+    ap.add_argument("--usuario", default=USER)
+    ap.add_argument("--contrasena", default=PASSWORD)
+    ap.add_argument("--base", default=BASE, help="Sitio de camlibro (o el mock_camlibro.py local)")
+    ap.add_argument("--login", choices=["navegador", "http"], default="navegador",
+                    help="navegador: Chrome con Selenium; http: envía el formulario directamente")
+    ap.add_argument("--carpeta", default=CARPETA)
+    ap.add_argument("--completo", action="store_true",
+                    help="Leer todas las páginas del listado aunque ya haya títulos conocidos")
+    ap.add_argument("--hilos-listado", type=int, default=HILOS_LISTADO, help="Páginas del listado en paralelo")
+    ap.add_argument("--hilos", type=int, default=HILOS_DESCARGA, help="PDFs en paralelo")
+    args = ap.parse_args()
+    base = args.base.rstrip("/")
+    inicio = time.time()
+
+    # 1. Sesión HTTP con pool de conexiones, autenticada con las cookies del login
+    descargador = Descargador(hilos=args.hilos, timeout=20)
+    os.makedirs(args.carpeta, exist_ok=True)
+    conocidos = cargar_conocidos(args.carpeta)
+    modo = "completo" if args.completo or not conocidos else "incremental"
     try:
-        book_id = link.split("idTitulo=")[1].split("&")[0]
-        print(f"⬇️ Descargando {book_id} ...")
-        r = requests.get(link, timeout=20)
-        if r.status_code == 200:
-            with open(f"pdfs/{book_id}.pdf", "wb") as f:
-                f.write(r.content)
-            print(f"✅ {book_id} descargado")
+        if args.login == "navegador":
+            for cookie in login_navegador(base, args.usuario, args.contrasena):
+                descargador.sesion.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"))
         else:
-            print(f"❌ Error con {link}")
-    except Exception as e:
-        print(f"⚠️ Falló {link}: {e}")
+            login_http(descargador.sesion, base, args.usuario, args.contrasena)
+
+        # 2. Listado (completo o hasta los títulos ya conocidos)
+        print(f"🔎 Leyendo el listado ({modo}; {len(conocidos)} títulos conocidos)...")
+        ids = recorrer_listado(descargador.sesion, base, args.hilos_listado,
+                               frozenset() if modo == "completo" else frozenset(conocidos))
+    except (RuntimeError, requests.RequestException) as e:
+        sys.exit(f"❌ {e}")
+    nuevos = [i for i in ids if i not in conocidos]
+    todos = conocidos | set(ids)
+    guardar_conocidos(args.carpeta, todos)
+    print(f"🔎 {len(ids)} títulos leídos, {len(nuevos)} nuevos en {time.time() - inicio:.1f} s")
+
+    # 3. Descargar los PDF que faltan (nuevos o de corridas que fallaron), sin pedir los que ya están
+    pendientes = [i for i in sorted(todos, key=int, reverse=True)
+                  if not pdf_listo(os.path.join(args.carpeta, f"{i}.pdf"))]
+    print(f"📥 {len(pendientes)} PDFs por descargar ({len(todos) - len(pendientes)} ya en {args.carpeta})")
+    for book_id in pendientes:
+        descargador.enviar(Tarea(base + PDF.format(book_id), os.path.join(args.carpeta, f"{book_id}.pdf"),
+                                 validar=validar_pdf))
+
+    resultados = descargador.resultados()
+    descargador.cerrar()
+    for r in resultados:
+        print(r.resumen())
+    print(f"📦 {sum(r.ok for r in resultados)}/{len(resultados)} PDFs listos "
+          f"en {time.time() - inicio:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
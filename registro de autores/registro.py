@@ -0,0 +1,152 @@
+"""
+Registro único de autores a partir de las salidas de los demás scripts.
+
+Une por cédula los autores de los certificados DNDA, las cesiones de derecho,
+los perfiles de autor, las URLs de Google Scholar y la hoja de Scopus, en una
+base SQLite (--bd) y un Excel (--salida) con una fila por autor, las fuentes
+donde aparece y la fila de cada una. Solo se vuelven a leer las fuentes cuyo
+archivo cambió desde la corrida anterior.
+
+La hoja Coincidencias agrupa los autores cuyos nombres parecen de la misma
+persona aunque no coincidan exactamente (OCR, tildes, segundo nombre que
+falta, sin cédula); ver comun/resolucion.py. Dos cédulas distintas nunca se
+agrupan: esos pares se listan aparte para revisar la cédula.
+
+Uso:
+  python registro.py                                   # actualiza la base y escribe el Excel
+  python registro.py --buscar "CC 79.528.190" --buscar "orlando baron"
+  python registro.py --fuente perfiles=otra_carpeta/autores_consolidados_limpio.xlsx
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from comun.autores import CAMPOS, Fuente, RegistroAutores
+from comun.resolucion import UMBRAL, resolver
+from comun.scripts import RAIZ
+
+BD = "registro_autores.sqlite"
+SALIDA = "registro_autores.xlsx"
+
+# Las rutas son las salidas por defecto de cada script, dentro de su carpeta.
+# El orden es la prioridad al elegir el nombre y los datos de un autor: los
+# perfiles se llenan a mano (con tildes); los certificados pasan por OCR.
+FUENTES = [
+    Fuente("perfiles", str(RAIZ / "extraer datos autor perfil autor" / "autores_consolidados_limpio.xlsx"),
+           cedula="Número de identificación", nombre=("Nombres", "Apellidos"),
+           campos={"correo": "Correo electrónico", "telefono": "Teléfono", "nacionalidad": "Nacionalidad",
+                   "rectoria": "Rectoría", "rol": "Rol",
+                   "filiacion": "Filiación institucional (Si es autor externo)"}),
+    Fuente("scholar", str(RAIZ / "extraer fotos google scholar-" / "urls_con_fotos.xlsx"),
+           cedula="Cédula", nombre=("Nombres", "Apellidos"),
+           campos={"scholar": "Google Scholar", "foto": "foto_archivo"}),
+    Fuente("scopus", str(RAIZ / "extraer datos scopus" / "scopus_completo_api.xlsx"),
+           cedula="Cédula", nombre="Nombre Apellido",
+           campos={"scopus": "Scopus", "documentos_scopus": "Número de documentos en Scopus con citaciones",
+                   "citas_scopus": "Citaciones en Scopus", "h_scopus": "Índice H Scopus"}),
+    # SALIDA_CSV de Cesion.py (se escribe el nombre para no importar pdfplumber aquí)
+    Fuente("cesiones", str(RAIZ / "Cesiones de derecho" / "sesiones_derecho_extraidas.csv"),
+           cedula="cedula_autor", nombre="autor", obra="libro"),
+    Fuente("dnda", str(RAIZ / "extraer informacion DNDA-" / "autores_DNDA.xlsx"),
+           cedula="Identificación", nombre="Nombre completo",
+           campos={"nacionalidad": "Nacionalidad", "ciudad": "Ciudad"}, obra="Obra"),
+]
+
+
+def actualizar(registro, fuentes, recargar=False):
+    for fuente in fuentes:
+        if not os.path.exists(fuente.ruta):
+            print(f"⚠️ {fuente.fuente}: no existe {fuente.ruta}; se conservan los registros de la corrida anterior")
+            continue
+        try:
+            filas = registro.cargar(fuente, forzar=recargar)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"⚠️ {fuente.fuente}: {e}")
+            continue
+        if filas is None:
+            print(f"⏭️ {fuente.fuente}: sin cambios")
+        else:
+            print(f"✅ {fuente.fuente}: {filas} filas cargadas de {fuente.ruta}")
+
+
+def mostrar(autor):
+    print(f"👤 {autor['Nombre']} — cédula {autor['Cédula'] or '(sin cédula)'}")
+    for columna in [*CAMPOS.values(), "Obras", "Fuentes", "Registros", "Revisar"]:
+        if autor.get(columna):
+            print(f"   {columna}: {autor[columna]}")
+
+
+def coincidencias(autores, umbral):
+    """
+    Filas de la hoja Coincidencias: los grupos de autores que parecen la misma
+    persona y los pares con nombre casi igual pero cédulas distintas.
+    """
+    r = resolver(autores["Nombre"].tolist(), autores["Cédula"].tolist(), umbral)
+    print(f"🧩 {r.resumen()}")
+    grupos = [("mismo autor", confianza, miembros) for confianza, miembros in r.grupos()]
+    grupos += [("cédulas distintas", puntaje, [i, j]) for puntaje, i, j in sorted(r.conflictos, reverse=True)]
+    filas = []
+    for n, (tipo, confianza, miembros) in enumerate(grupos, 1):
+        for i in miembros:
+            autor = autores.iloc[i]
+            filas.append({"Grupo": n, "Tipo": tipo, "Confianza": confianza, "Cédula": autor["Cédula"],
+                          "Nombre": autor["Nombre"], "Fuentes": autor["Fuentes"], "Registros": autor["Registros"]})
+    return pd.DataFrame(filas, columns=["Grupo", "Tipo", "Confianza", "Cédula", "Nombre", "Fuentes", "Registros"])
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Registro de autores unido por cédula")
+    ap.add_argument("--bd", default=BD, help="Base SQLite del registro")
+    ap.add_argument("--salida", default=SALIDA, help="Excel con una fila por autor (y la hoja Registros)")
+    ap.add_argument("--fuente", action="append", default=[], metavar="NOMBRE=RUTA",
+                    help="Otra ruta para una fuente: " + ", ".join(f.fuente for f in FUENTES))
+    ap.add_argument("--recargar", action="store_true", help="Leer todas las fuentes aunque no hayan cambiado")
+    ap.add_argument("--buscar", action="append", default=[], metavar="CEDULA_O_NOMBRE",
+                    help="Mostrar un autor (se puede repetir); no escribe el Excel")
+    ap.add_argument("--sin-actualizar", action="store_true", help="Consultar la base sin revisar las fuentes")
+    ap.add_argument("--umbral", type=float, default=UMBRAL,
+                    help="Puntaje mínimo (0-1) para agrupar dos nombres en la hoja Coincidencias")
+    args = ap.parse_args()
+
+    fuentes = {f.fuente: f for f in FUENTES}
+    for opcion in args.fuente:
+        nombre, _, ruta = opcion.partition("=")
+        if nombre not in fuentes or not ruta:
+            ap.error(f"--fuente {opcion}: use NOMBRE=RUTA con NOMBRE en {', '.join(fuentes)}")
+        fuentes[nombre].ruta = ruta
+
+    inicio = time.time()
+    registro = RegistroAutores(args.bd, prioridad=list(fuentes))
+    try:
+        if not args.sin_actualizar:
+            actualizar(registro, fuentes.values(), args.recargar)
+
+        if args.buscar:
+            for consulta in args.buscar:
+                t = time.time()
+                autores = registro.buscar(consulta)
+                print(f"\n🔎 {consulta!r}: {len(autores)} autor(es) en {(time.time() - t) * 1000:.1f} ms")
+                for autor in autores:
+                    mostrar(autor)
+            return
+
+        autores = pd.DataFrame(registro.autores())
+        with pd.ExcelWriter(args.salida) as excel:
+            autores.to_excel(excel, sheet_name="Autores", index=False)
+            registro.registros().to_excel(excel, sheet_name="Registros", index=False)
+            if not autores.empty:
+                coincidencias(autores, args.umbral).to_excel(excel, sheet_name="Coincidencias", index=False)
+        sin_cedula = int(autores["Cédula"].isna().sum()) if not autores.empty else 0
+        print(f"📘 {len(autores)} autores ({sin_cedula} sin cédula) de {registro.total()} registros "
+              f"en {args.salida} ({time.time() - inicio:.1f} s)")
+    finally:
+        registro.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Pruebas de los módulos compartidos y de los scripts contra los servidores
+simulados (mock_*.py), sin red. Correr desde la raíz:
+
+  python -m pytest -q tests
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+from comun.scripts import cargar_script
+
+
+@pytest.fixture
+def servidor_mock():
+    """
+    servidor_mock("carpeta/mock_x.py", **opciones) arranca el mock en un puerto
+    libre de 127.0.0.1, en un hilo, y devuelve (url_base, manejador); el
+    manejador lleva los contadores del mock. Se apaga al terminar la prueba.
+    """
+    servidores = []
+
+    def arrancar(script, **opciones):
+        servidor = cargar_script(script).crear_servidor(puerto=0, **opciones)
+        threading.Thread(target=servidor.serve_forever, daemon=True).start()
+        servidores.append(servidor)
+        host, puerto = servidor.server_address[:2]
+        return f"http://{host}:{puerto}", servidor.RequestHandlerClass
+
+    yield arrancar
+    for servidor in servidores:
+        servidor.shutdown()
+        servidor.server_close()
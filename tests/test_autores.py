@@ -0,0 +1,26 @@
+import pytest
+
+from comun.autores import normalizar_id
+
+
+@pytest.mark.parametrize("valor, esperado", [
+    ("79528190", "79528190"),
+    (79528190, "79528190"),
+    (79528190.0, "79528190"),
+    ("79528190.0", "79528190"),
+    ("CC 79.528.190", "79528190"),
+    ("CC No 79528190", "79528190"),
+    ("C.C. No. 79.528.190", "79528190"),
+    ("Cédula de ciudadanía No. 1.023.456", "1023456"),
+    ("N° 1023456", "1023456"),
+    ("1234", None),
+    (None, None),
+    (float("nan"), None),
+])
+def test_normalizar_id(valor, esperado):
+    assert normalizar_id(valor) == esperado
+
+
+def test_prefijos_unen_con_el_numero_solo():
+    variantes = ["CC No 79528190", "C.C. No. 79.528.190", "cédula 79 528 190", 79528190]
+    assert {normalizar_id(v) for v in variantes} == {"79528190"}
@@ -0,0 +1,52 @@
+import os
+
+import requests
+
+from comun.scripts import cargar_script
+
+scrapper = cargar_script("librospdf-/scrapper.py")
+MOCK = "librospdf-/mock_camlibro.py"
+
+
+def sesion_iniciada(base):
+    sesion = requests.Session()
+    scrapper.login_http(sesion, base, scrapper.USER, scrapper.PASSWORD)
+    return sesion
+
+
+def test_listado_completo_lee_todas_las_paginas(servidor_mock):
+    base, manejador = servidor_mock(MOCK, titulos=250)  # 13 páginas; la paginación muestra 10
+    ids = scrapper.recorrer_listado(sesion_iniciada(base), base, hilos=4)
+    assert len(ids) == 250
+    assert ids == sorted(ids, key=int, reverse=True)
+    assert manejador.contador["paginas"] == 13
+
+
+def test_listado_incremental_para_en_los_conocidos(servidor_mock):
+    base, _ = servidor_mock(MOCK, titulos=250)
+    conocidos = frozenset(scrapper.recorrer_listado(sesion_iniciada(base), base, hilos=4))
+
+    base, manejador = servidor_mock(MOCK, titulos=250, nuevos=30)
+    ids = scrapper.recorrer_listado(sesion_iniciada(base), base, hilos=3, conocidos=conocidos)
+    assert len(set(ids) - conocidos) == 30
+    # página 1 y una tanda de 3: la página 2 ya trae títulos conocidos
+    assert manejador.contador["paginas"] == 4
+
+
+def test_corrida_incremental_descarga_solo_los_nuevos(servidor_mock, tmp_path, monkeypatch):
+    carpeta = str(tmp_path / "pdfs")
+
+    def correr(base):
+        monkeypatch.setattr("sys.argv", ["scrapper.py", "--base", base, "--login", "http",
+                                         "--carpeta", carpeta, "--hilos", "2"])
+        scrapper.main()
+
+    base, manejador = servidor_mock(MOCK, titulos=45)
+    correr(base)
+    assert manejador.contador["pdfs"] == 45
+
+    base, manejador = servidor_mock(MOCK, titulos=45, nuevos=5)
+    correr(base)
+    assert manejador.contador["paginas"] == 1
+    assert manejador.contador["pdfs"] == 5
+    assert len([n for n in os.listdir(carpeta) if n.endswith(".pdf")]) == 50
@@ -0,0 +1,19 @@
+import socket
+
+from comun import descargas
+from comun.descargas import Descargador, Tarea
+
+
+def puerto_cerrado():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_no_espera_despues_del_ultimo_intento(tmp_path, monkeypatch):
+    esperas = []
+    monkeypatch.setattr(descargas.time, "sleep", esperas.append)
+    d = Descargador(hilos=1, timeout=2, reintentos=2)
+    r = d.descargar(Tarea(f"http://127.0.0.1:{puerto_cerrado()}/x.pdf", str(tmp_path / "x.pdf")))
+    assert r.estado == "error"
+    assert esperas == [1, 2]  # 3 intentos, 2 esperas
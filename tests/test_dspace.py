@@ -0,0 +1,63 @@
+import hashlib
+import os
+
+import pandas as pd
+import pytest
+
+from comun import dspace
+from comun.bitacora import Bitacora
+from comun.dspace import ClienteDSpace, ErrorDSpace
+from comun.scripts import cargar_script
+
+MOCK = "Descargar libros web scrapping-/mock_dspace.py"
+extra = cargar_script("Descargar libros web scrapping-/extra.py")
+UUID = "0b7e6c1a-3f2d-4e5a-8b9c-1d2e3f4a5b6c"
+
+
+def test_resolver_item(servidor_mock):
+    base, manejador = servidor_mock(MOCK)
+    cliente = ClienteDSpace(base + "/server/api")
+    assert cliente.resolver_item(f"https://repo.x/handle/10656/{123}") == manejador.repo.uuid_de_handle("10656/123")
+    assert cliente.resolver_item(f"https://repo.x/entities/publication/{UUID.upper()}") == UUID
+    with pytest.raises(ErrorDSpace):
+        cliente.resolver_item("https://repo.x/browse")
+
+
+def test_bitstreams_del_bundle_original(servidor_mock, monkeypatch):
+    monkeypatch.setattr(dspace, "TAMANO_PAGINA", 2)  # obliga a seguir _links.next
+    base, manejador = servidor_mock(MOCK, max_archivos=9, sin_archivos=0)
+    cliente = ClienteDSpace(base + "/server/api")
+    bitstreams = cliente.bitstreams(UUID)
+    bundle = next(b for b in manejador.repo.lista_bundles(UUID) if b["name"] == "ORIGINAL")
+    esperados = manejador.repo.lista_bitstreams(bundle["uuid"])
+    assert len(esperados) > 2
+    assert [(b.uuid, b.nombre, b.bytes, b.checksum) for b in bitstreams] == \
+        [(e["uuid"], e["name"], e["sizeBytes"], e["checkSum"]["value"]) for e in esperados]
+    assert all(b.nombre.endswith(".pdf") and b.algoritmo == "MD5" for b in bitstreams)
+
+
+def test_nombres_de_archivo():
+    nombres = extra.NombresArchivo(ocupados=["viejo.pdf"])
+    assert nombres("libro.pdf", "aaaaaaaa-1") == "libro.pdf"
+    assert nombres("libro.pdf", "aaaaaaaa-1") == "libro.pdf"      # el mismo bitstream otra vez
+    assert nombres("Libro.PDF", "bbbbbbbb-2") == "bbbbbbbb_Libro.PDF"
+    assert nombres("viejo.pdf", "cccccccc-3") == "cccccccc_viejo.pdf"
+    assert nombres('a/b:c?.pdf', "dddddddd-4") == "a_b_c_.pdf"
+
+
+def test_descarga_por_api(servidor_mock, tmp_path):
+    base, manejador = servidor_mock(MOCK, kb=4, sin_archivos=0)
+    urls = [f"https://repo.x/handle/10656/{n}" for n in range(5)]
+    df = pd.DataFrame({" Título del libro": [f"Libro {n}" for n in range(5)], " URL repositorio": urls})
+    carpeta = tmp_path / "pdfs"
+    carpeta.mkdir()
+
+    with Bitacora(tmp_path / "bitacora.jsonl") as bitacora:
+        extra.descargar_api(df, str(carpeta), bitacora, api_base=base + "/server/api", hilos=2)
+    with Bitacora(tmp_path / "bitacora.jsonl") as bitacora:
+        archivos = [a for url in urls for a in bitacora.datos(url)["archivos"]]
+    assert sorted(archivos) == sorted(n for n in os.listdir(carpeta) if n.endswith(".pdf"))
+    for bs in manejador.repo.bitstreams.values():
+        if bs["bundleName"] == "ORIGINAL":
+            contenido = (carpeta / bs["name"]).read_bytes()
+            assert hashlib.md5(contenido).hexdigest() == bs["checkSum"]["value"]
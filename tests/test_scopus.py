@@ -0,0 +1,91 @@
+import asyncio
+import random
+
+from comun.cache_http import CacheHTTP
+from comun.scopus import ClienteScopus, HIndice, lotes
+from comun.scripts import cargar_script
+
+MOCK = "extraer datos scopus/mock_scopus.py"
+mock_scopus = cargar_script(MOCK)
+
+
+PROLIFICO = "57190000006"  # 606 documentos en el mock, h = 22
+
+
+def con_cliente(base, consulta, **opciones):
+    """Corre consulta(cliente) contra el mock y devuelve (resultado, cliente)."""
+    async def correr():
+        async with ClienteScopus("clave", base=base, tasa=1000, **opciones) as cliente:
+            return await consulta(cliente), cliente
+    return asyncio.run(correr())
+
+
+def test_lotes_sin_repetidos():
+    assert lotes(["1", "2", "1", None, "3", 4], tamano=2) == [["1", "2"], ["3", "4"]]
+
+
+def test_autores_por_lotes(servidor_mock):
+    base, manejador = servidor_mock(MOCK)
+    ids = [str(57190000000 + n) for n in range(60)]
+    datos, cliente = con_cliente(base, lambda c: c.autores(ids + ids[::-1]))
+    assert cliente.llamadas == 3  # 60 autores únicos en lotes de 25
+    assert manejador.contador["autores"] == 60
+    assert set(datos) == set(ids)
+    for author_id in ids:
+        assert datos[author_id]["document-count"] == str(len(mock_scopus.documentos(author_id)))
+
+
+def test_id_invalido_no_tumba_el_lote(servidor_mock):
+    base, _ = servidor_mock(MOCK)
+    ids = [str(57190000000 + n) for n in range(10)] + ["9000000001"]
+    datos, _ = con_cliente(base, lambda c: c.autores(ids))
+    assert "error" in datos["9000000001"]
+    assert all("error" not in datos[i] for i in ids[:-1])
+
+
+def test_h_indice_en_cualquier_orden():
+    azar = random.Random(0)
+    for _ in range(50):
+        citas = [azar.randint(0, 40) for _ in range(azar.randint(0, 80))]
+        ordenadas = sorted(citas, reverse=True)
+        calculo = HIndice()
+        for n, c in enumerate(citas):
+            calculo.agregar(c, str(n))
+        assert calculo.h == sum(1 for i, c in enumerate(ordenadas, 1) if c >= i)
+        assert len(calculo.documentos()) == calculo.h
+
+
+def test_documentos_por_cursor(servidor_mock):
+    base, manejador = servidor_mock(MOCK)
+
+    async def todos(cliente):
+        return [d async for d in cliente.documentos_autor(PROLIFICO, ordenado=False)]
+
+    documentos, _ = con_cliente(base, todos)
+    assert documentos == [(d, c) for d, c in mock_scopus.documentos(PROLIFICO)]
+    assert manejador.contador["paginas"] == 25  # ceil(606 / 25)
+
+
+def test_h_index_corta_la_paginacion(servidor_mock):
+    base, manejador = servidor_mock(MOCK)
+    h, _ = con_cliente(base, lambda c: c.h_index(PROLIFICO))
+    assert h == mock_scopus.h_index(PROLIFICO)
+    assert manejador.contador["paginas"] <= 2  # ordenado por citas: basta con los primeros h + 1
+
+    h, _ = con_cliente(base, lambda c: c.h_index(PROLIFICO, ordenado=False))
+    assert h == mock_scopus.h_index(PROLIFICO)
+
+
+def test_h_index_desde_cache_si_el_autor_no_cambio(servidor_mock, tmp_path):
+    base, manejador = servidor_mock(MOCK)
+    cache = CacheHTTP(str(tmp_path / "http.sqlite"))
+    coredata = mock_scopus.autor(PROLIFICO)["coredata"]
+    primera, _ = con_cliente(base, lambda c: c.h_index(PROLIFICO, coredata), cache=cache)
+    paginas = manejador.contador["paginas"]
+    segunda, _ = con_cliente(base, lambda c: c.h_index(PROLIFICO, coredata), cache=cache)
+    assert primera == segunda == mock_scopus.h_index(PROLIFICO)
+    assert manejador.contador["paginas"] == paginas
+
+    cambiado = dict(coredata, **{"citation-count": str(int(coredata["citation-count"]) + 1)})
+    con_cliente(base, lambda c: c.h_index(PROLIFICO, cambiado), cache=cache)
+    assert manejador.contador["paginas"] > paginas